@@ -1,10 +1,18 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import shutil
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
 import json
-from main import analyze_post
+from typing import Optional
+from main import analyze_post, analyze_post_stream
+from engines.registry import get_registry
+from utils.metrics import METRICS
+from utils.worker_pool import BoundedWorkerPool, PoolSaturated, QueueTimeout, RequestTimeout
+from utils.jobs import JobManager
+from utils.uploads import UploadTooLarge, build_upload_store
 
 app = FastAPI(title="ShieldAI API", version="2.5")
 
@@ -17,36 +25,251 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+def referenced_uploads():
+    """Uploads that queued or running analyze jobs (including recovered ones) still need."""
+    return [params["file_path"] for params in job_manager.pending_params("analyze") if "file_path" in params]
+
+# Uploads are stored content-addressed (sha256 + ext) with size cap and TTL cleanup
+UPLOAD_SETTINGS = get_registry().get_config().get("uploads", {})
+upload_store = build_upload_store(UPLOAD_SETTINGS, in_use=referenced_uploads)
+UPLOAD_DIR = upload_store.root
+
+async def store_upload(file):
+    """Streams an UploadFile into the content-addressed store (off the event loop)."""
+    try:
+        return await run_in_threadpool(upload_store.save, file.file, file.filename)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
 # Mount static files to serve images back to the frontend
 app.mount("/static", StaticFiles(directory=UPLOAD_DIR), name="static")
 
+# Inference runs on a bounded worker pool so the event loop (and "/") stays responsive
+SERVER_SETTINGS = get_registry().get_config().get("server", {})
+analysis_pool = BoundedWorkerPool(
+    max_concurrency=SERVER_SETTINGS.get("max_concurrency", 2),
+    max_queue=SERVER_SETTINGS.get("max_queue", 8),
+    queue_timeout_s=SERVER_SETTINGS.get("queue_timeout_s", 30),
+    request_timeout_s=SERVER_SETTINGS.get("request_timeout_s", 120)
+)
+RETRY_AFTER = str(SERVER_SETTINGS.get("retry_after_s", 5))
+
+async def run_analysis(fn, *args, **kwargs):
+    """Runs blocking analysis work on the pool, mapping saturation to HTTP errors."""
+    try:
+        return await analysis_pool.run(fn, *args, **kwargs)
+    except PoolSaturated:
+        raise HTTPException(status_code=429, detail="Server busy, please retry shortly.",
+                            headers={"Retry-After": RETRY_AFTER})
+    except QueueTimeout:
+        raise HTTPException(status_code=503, detail="No analysis worker became available in time.",
+                            headers={"Retry-After": RETRY_AFTER})
+    except RequestTimeout:
+        raise HTTPException(status_code=504, detail="Analysis timed out.")
+
+# Background jobs for long analyses (videos, evaluation), persisted across restarts
+def run_analyze_job(params, progress):
+    progress(0.0)
+    # Progress (and cancellation) is checked between pipeline stages
+    results = analyze_post(params["file_path"], params["claim"], media_hash=params.get("media_hash"),
+                           force_llm=params.get("force_llm", False), progress=progress)
+    results["media_url"] = f"http://localhost:8000/static/{os.path.basename(params['file_path'])}"
+    return results
+
+def run_evaluate_job(params, progress):
+    from scripts.evaluate import run_evaluation
+    return run_evaluation(progress_callback=progress)
+
+JOB_SETTINGS = get_registry().get_config().get("jobs", {})
+job_manager = JobManager(
+    db_path=JOB_SETTINGS.get("db_path", "jobs.sqlite"),
+    handlers={"analyze": run_analyze_job, "evaluate": run_evaluate_job},
+    workers=JOB_SETTINGS.get("workers", 1)
+)
+
+@app.on_event("startup")
+def warm_engines():
+    """Load every model once before accepting traffic so the first request isn't penalised."""
+    load_times = get_registry().warmup()
+    print(f"✅ Engines warmed in {sum(load_times.values()):.2f}s: {load_times}")
+
+    requeued = job_manager.recover()
+    if requeued:
+        print(f"🔁 Re-queued {requeued} unfinished job(s)")
+
 @app.get("/")
 def health_check():
-    return {"status": "online", "model": "ShieldAI v2.5 (Groq/Llama 3.3)"}
+    return {
+        "status": "online",
+        "model": "ShieldAI v2.5 (Groq/Llama 3.3)",
+        "model_load_times": get_registry().load_times,
+        "workers": analysis_pool.stats(),
+        "result_cache": get_registry().result_cache.stats() if get_registry().result_cache else None,
+        "search_cache": get_registry().search_cache.stats() if get_registry().search_cache else None,
+        "explainer": get_registry().explainer.stats(),
+        "llm": get_registry().llm.stats() if get_registry().llm else None,
+        "jobs": job_manager.counts()
+    }
+
+def cache_metrics(registry):
+    """(cache name, stats) for every cache whose engine is already loaded (scrapes never load models)."""
+    caches = []
+    for name in ("result_cache", "search_cache", "embedding_store"):
+        if registry.is_loaded(name) and registry.get(name) is not None:
+            caches.append((name, registry.get(name).stats()))
+    if registry.is_loaded("llm") and registry.llm is not None:
+        caches.append(("llm", registry.llm.stats()["cache"]))
+    if registry.is_loaded("consistency"):
+        caches.append(("clip_text", registry.consistency.text_cache.stats()))
+    return caches
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint: stage latency histograms, cache hit rates, model load times."""
+    registry = get_registry()
+    caches = cache_metrics(registry)
+    workers = analysis_pool.stats()
+    extra = [
+        ("shieldai_model_load_seconds", "gauge", "Time taken to load each engine",
+         [({"engine": name}, seconds) for name, seconds in registry.load_times.items()]),
+        ("shieldai_cache_hit_ratio", "gauge", "Cache hit rate since process start",
+         [({"cache": name}, stats["hit_rate"]) for name, stats in caches]),
+        ("shieldai_cache_hits_total", "counter", "Cache hits (fresh or stale)",
+         [({"cache": name}, stats["hits"] + stats.get("stale_hits", 0)) for name, stats in caches]),
+        ("shieldai_cache_misses_total", "counter", "Cache misses",
+         [({"cache": name}, stats["misses"]) for name, stats in caches]),
+        ("shieldai_workers", "gauge", "Analysis worker pool occupancy",
+         [({"state": "in_flight"}, workers["in_flight"]), ({"state": "queued"}, workers["queue_depth"])]),
+        ("shieldai_requests_rejected_total", "counter", "Requests rejected by the worker pool",
+         [({"reason": "saturated"}, workers["rejected"]), ({"reason": "timeout"}, workers["timeouts"])]),
+    ]
+    return PlainTextResponse(METRICS.render(extra), media_type="text/plain; version=0.0.4")
 
 @app.post("/analyze")
-async def analyze_media(file: UploadFile = File(...), claim: str = Form(...)):
+async def analyze_media(file: UploadFile = File(...), claim: str = Form(...), force_llm: bool = Form(False),
+                        include_spans: Optional[bool] = Form(None)):
     try:
-        # 1. Save File Locally
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 1. Stream the upload into the content-addressed store
+        upload = await store_upload(file)
         
-        # 2. Run Analysis Pipeline
+        # 2. Run Analysis Pipeline on the bounded worker pool
         # We reuse the exact same logic from main.py to ensure consistency
-        results = analyze_post(file_path, claim)
+        results = await run_analysis(analyze_post, upload.path, claim, media_hash=upload.sha256, force_llm=force_llm,
+                                     include_spans=include_spans)
         
         # 3. Augment results with URL for the frontend
-        results["media_url"] = f"http://localhost:8000/static/{file.filename}"
+        results["media_url"] = f"http://localhost:8000/static/{upload.name}"
         
         return results
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Server Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/stream")
+async def analyze_media_stream(file: UploadFile = File(...), claim: str = Form(...), force_llm: bool = Form(False),
+                               include_spans: Optional[bool] = Form(None)):
+    """
+    Same analysis as /analyze, streamed as NDJSON (one JSON event per line):
+    the scores as soon as the sensors finish, then explanation tokens as the LLM
+    produces them, then a final "done" event with the complete result.
+    """
+    upload = await store_upload(file)
+    media_url = f"http://localhost:8000/static/{upload.name}"
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def produce():
+        # Runs on the bounded worker pool; hands events back to the event loop
+        try:
+            for event in analyze_post_stream(upload.path, claim, media_hash=upload.sha256, force_llm=force_llm,
+                                             include_spans=include_spans):
+                if event["event"] == "done":
+                    event["result"]["media_url"] = media_url
+                loop.call_soon_threadsafe(events.put_nowait, event)
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, None)
+
+    task = asyncio.ensure_future(run_analysis(produce))
+
+    async def next_event():
+        getter = asyncio.ensure_future(events.get())
+        await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+        if getter.done():
+            return getter.result()
+        getter.cancel()
+        return events.get_nowait() if not events.empty() else None
+
+    # Errors before the first event (busy pool, undecodable media) keep their HTTP status
+    first = await next_event()
+    if first is None:
+        try:
+            await task
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Server Error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail="Analysis produced no result")
+
+    async def stream():
+        event = first
+        while event is not None:
+            yield json.dumps(event, default=str) + "\n"
+            event = await next_event()
+        await asyncio.wait({task})
+        if task.exception() is not None:
+            error = task.exception()
+            yield json.dumps({"event": "error", "detail": getattr(error, "detail", str(error))}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    kind: str = Form("analyze"), # "analyze" or "evaluate"
+    file: UploadFile = File(None),
+    claim: str = Form(None),
+    force_llm: bool = Form(False)
+):
+    """Queues a long-running analysis and returns its job id immediately."""
+    params = {}
+    if kind == "analyze":
+        if file is None or not claim:
+            raise HTTPException(status_code=422, detail="Analyze jobs need both a file and a claim.")
+        upload = await store_upload(file)
+        params = {"file_path": upload.path, "claim": claim, "media_hash": upload.sha256, "force_llm": force_llm}
+
+    try:
+        job_id = job_manager.submit(kind, params)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status, progress (0-1) and, once done, the results of a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return {"job_id": job_id, "status": "cancelled"}
+
+@app.delete("/cache")
+def clear_result_cache():
+    """Explicitly drop every cached /analyze result (e.g. after re-tuning a model)."""
+    cache = get_registry().result_cache
+    if cache is not None:
+        cache.clear()
+    return {"status": "cleared"}
+
 @app.post("/feedback")
 async def log_feedback(
     file_name: str = Form(...), 
@@ -83,7 +306,7 @@ async def trigger_evaluation():
     try:
         # Import dynamically to ensure it picks up the latest changes
         from scripts.evaluate import run_evaluation
-        metrics = run_evaluation()
+        metrics = await run_in_threadpool(run_evaluation)
         return metrics
     except Exception as e:
         print(f"Evaluation Error: {e}")
@@ -3,7 +3,10 @@ import os
 import json
 import pandas as pd
 import time
-from main import analyze_post
+from main import analyze_post_stream
+from engines.registry import get_registry
+from utils.jobs import JobManager
+from utils.uploads import UploadTooLarge, build_upload_store
 # Attempt import, handle if script not yet in path
 try:
     from scripts.evaluate import run_evaluation
@@ -15,6 +18,21 @@ except ImportError:
 # 1. Setup & Styles
 st.set_page_config(page_title="ShieldAI", page_icon="🛡️", layout="wide")
 
+@st.cache_resource(show_spinner="⏳ Loading forensic models (first run only)...")
+def warm_engines():
+    # The registry is process-wide, so reruns reuse the already loaded models
+    return get_registry().warmup()
+
+MODEL_LOAD_TIMES = warm_engines()
+
+@st.cache_resource
+def get_upload_store():
+    config = get_registry().get_config()
+    # Same upload directory as the API: never collect files its queued jobs still need
+    jobs = JobManager(db_path=config.get("jobs", {}).get("db_path", "jobs.sqlite"))
+    in_use = lambda: [p["file_path"] for p in jobs.pending_params("analyze") if "file_path" in p]
+    return build_upload_store(config.get("uploads", {}), in_use=in_use)
+
 # Custom CSS for a professional "Forensic" look
 st.markdown("""
     <style>
@@ -46,6 +64,7 @@ with st.sidebar:
 
     st.info(f"Forensic Threshold: {AI_THRESH}")
     st.info(f"Semantic Threshold: {CONS_THRESH}")
+    st.caption(f"Models loaded in {sum(MODEL_LOAD_TIMES.values()):.1f}s (once per process)")
     
     if st.button("Clear Cache"):
         for key in list(st.session_state.keys()):
@@ -69,15 +88,31 @@ if page == "Live Analysis":
         
         if st.button("RUN FORENSIC ANALYSIS"):
             if uploaded_file and user_text:
-                if not os.path.exists("uploads"): os.makedirs("uploads")
-                path = os.path.join("uploads", uploaded_file.name)
-                with open(path, "wb") as f: 
-                    f.write(uploaded_file.getbuffer())
+                try:
+                    upload = get_upload_store().save(uploaded_file, uploaded_file.name)
+                except UploadTooLarge as e:
+                    st.error(f"⚠️ {e}")
+                    st.stop()
+                path = upload.path
                 
-                with st.spinner("🔍 Executing Cross-Modal Verification..."):
-                    results = analyze_post(path, user_text)
-                    st.session_state['res'] = results
-                    st.session_state['path'] = path
+                # Stream the verdict: scores as soon as the sensors finish, then the report as it is written
+                with col2:
+                    live = st.empty()
+                    with st.spinner("🔍 Executing Cross-Modal Verification..."):
+                        events = analyze_post_stream(path, user_text, media_hash=upload.sha256)
+                        scores = next(events)
+                    report = ""
+                    for event in events:
+                        if event["event"] == "token":
+                            report += event["text"]
+                            with live.container():
+                                stats = scores["technical_stats"]
+                                st.caption(f"Scores ready in {scores['ttfb_s']:.2f}s · consistency {stats['consistency']:.2f} · AI probability {stats['ai_prob']:.2f}")
+                                st.markdown(report + " ▌")
+                        elif event["event"] == "done":
+                            st.session_state['res'] = event["result"]
+                            st.session_state['path'] = path
+                    live.empty()
             else:
                 st.warning("⚠️ Please provide both media and a claim for cross-modal verification.")
 
@@ -98,6 +133,10 @@ if page == "Live Analysis":
             else:
                 st.success("✅ LIKELY AUTHENTIC")
 
+            timings = res.get('timings', {})
+            if 'ttfb_s' in timings:
+                st.caption(f"Scores in {timings['ttfb_s']:.2f}s · first report token in {timings['first_token_s']:.2f}s · total {timings['analysis_s'] + timings['model_load_s']:.2f}s")
+
             with st.expander("📄 Forensic Evidence Report", expanded=True):
                 st.markdown(res['explanation'])
             
@@ -0,0 +1,119 @@
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def current_rss_mb():
+    """Resident set size of this process (Linux /proc; peak-so-far elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if os.uname().sysname == "Darwin" else peak / 1024
+
+class RSSSampler:
+    """Samples RSS on a background thread; `peak_mb` is the highest value seen while active."""
+
+    def __init__(self, interval_s=0.005):
+        self.interval_s = interval_s
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+def summarize(latencies_s, items, wall_s, peak_rss_mb):
+    """Latency percentiles (ms), throughput (items/s) and peak RSS for one case."""
+    latencies = np.asarray(latencies_s, dtype=np.float64) * 1000.0
+    return {
+        "calls": int(len(latencies)),
+        "items": int(items),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "throughput_per_s": round(items / wall_s, 3) if wall_s > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb, 1)
+    }
+
+def run_case(fn, inputs, batch_size=1, concurrency=1, warmup=1):
+    """
+    Times fn over `inputs`.
+      batch_size > 1  - fn receives lists of inputs (batched engine APIs)
+      concurrency > 1 - calls are issued from that many threads (server-like load)
+    The first `warmup` calls are run untimed (at least one call is always timed).
+    Latency is per call; throughput counts inputs, so single and batched modes compare directly.
+    """
+    calls = [inputs[i:i + batch_size] for i in range(0, len(inputs), batch_size)] if batch_size > 1 else list(inputs)
+    warmup = min(warmup, len(calls) - 1)
+    warm, calls = calls[:warmup], calls[warmup:]
+    for call in warm:
+        fn(call)
+
+    def timed(call):
+        start = time.perf_counter()
+        fn(call)
+        return time.perf_counter() - start
+
+    with RSSSampler() as rss:
+        start = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = list(pool.map(timed, calls))
+        else:
+            latencies = [timed(call) for call in calls]
+        wall = time.perf_counter() - start
+
+    items = sum(len(call) for call in calls) if batch_size > 1 else len(calls)
+    summary = summarize(latencies, items, wall, rss.peak_mb)
+    summary.update({"batch_size": batch_size, "concurrency": concurrency})
+    return summary
+
+# Relative change beyond which a metric counts as a regression
+DEFAULT_TOLERANCE = {"p50_ms": 0.20, "p95_ms": 0.30, "throughput_per_s": 0.20, "peak_rss_mb": 0.25}
+HIGHER_IS_BETTER = {"throughput_per_s"}
+
+def compare(current, baseline, tolerance=None):
+    """
+    Compares two benchmark reports case by case. Returns a list of regression
+    dicts (case, metric, baseline, current, change); cases missing from either
+    report are ignored. Latencies below 1 ms are too noisy to judge and are skipped.
+    """
+    tolerance = {**DEFAULT_TOLERANCE, **(tolerance or {})}
+    regressions = []
+    for name, case in current.get("cases", {}).items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        for metric, allowed in tolerance.items():
+            old, new = base.get(metric), case.get(metric)
+            if not old or new is None or (metric.endswith("_ms") and old < 1.0):
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > allowed:
+                regressions.append({
+                    "case": name, "metric": metric, "baseline": old, "current": new,
+                    "change": round(change, 4)
+                })
+    return regressions
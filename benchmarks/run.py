@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+# Add the root directory to path so we can import engines
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmarks.harness import DEFAULT_TOLERANCE, compare, current_rss_mb, run_case
+from benchmarks.synth import RESOLUTIONS, synth_image, write_media
+from engines.registry import EngineRegistry, set_registry
+from scripts.fake_serper import serve
+
+# Offline, reproducible benchmarks of the analysis pipeline:
+#   python benchmarks/run.py                                   # full run -> benchmarks/results/latest.json
+#   python benchmarks/run.py --quick --only forensics          # subset, fewer samples
+#   python benchmarks/run.py --save-baseline                   # store the current numbers as the baseline
+#   python benchmarks/run.py --compare                         # exit 1 if anything regressed vs the baseline
+# Media is synthesized locally, Serper is replaced by scripts/fake_serper.py and
+# Groq by the registry's fake LLM backend. Model weights must already be cached.
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+def offline_config(workdir, serper_url, llm_latency_s):
+    """config.json with every external service faked and every result cache off (cold numbers)."""
+    with open(os.path.join(ROOT, "config.json")) as f:
+        config = json.load(f)
+    config["search"]["endpoint"] = serper_url
+    config["search_cache"]["enabled"] = False
+    config["cache"]["enabled"] = False
+    config["embedding_store"]["enabled"] = False
+    config["llm"].update({
+        "backend": "fake", "fake_latency_s": llm_latency_s,
+        "requests_per_minute": 600000, "burst": 1000, "max_concurrency": 64
+    })
+    path = os.path.join(workdir, "config.json")
+    with open(path, "w") as f:
+        json.dump(config, f, indent=4)
+    return path
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def engine_cases(registry, samples, batch_size):
+    """(name, fn, inputs, batch_size, concurrency) for each engine on its own."""
+    fe, ce, re = registry.forensics, registry.consistency, registry.robustness
+    small = [synth_image(224, 224, seed=i) for i in range(samples)]
+    claims = [(frame, f"a photo of a city street, take {i}") for i, frame in enumerate(small)]
+    cases = []
+    for height, width in RESOLUTIONS:
+        # A handful of distinct frames, cycled: synthesis of 12 MP noise is slower than the FFT
+        frames = [synth_image(height, width, seed=i) for i in range(min(samples, 4))]
+        inputs = [frames[i % len(frames)] for i in range(samples)]
+        label = f"{width}x{height}"
+        cases.append((f"forensics.fft[{label}].single", fe.get_frequency_score, inputs, 1, 1))
+        cases.append((f"robustness.purify[{label}].single", re.purify, inputs, 1, 1))
+    cases += [
+        ("forensics.fft[224x224].batched", fe.get_frequency_scores, small, batch_size, 1),
+        ("forensics.detect_synthetic[224x224].single", fe.detect_synthetic, small, 1, 1),
+        ("forensics.detect_synthetic[224x224].batched", fe.detect_synthetic_batch, small, batch_size, 1),
+        ("consistency.clip[224x224].single", lambda pair: ce.compute_consistency(*pair), claims, 1, 1),
+        ("consistency.clip[224x224].batched", ce.compute_consistency_batch, claims, batch_size, 1),
+    ]
+    return cases
+
+def service_cases(registry, samples, concurrency):
+    """Search and explainer against the local fakes (distinct claims per case, so nothing is cached)."""
+    search, ex = registry.search, registry.explainer
+    claims = lambda case: [f"Benchmark {case} claim {i} about a flooded city" for i in range(samples)]
+    explain = lambda claim: ex.generate_verdict(None, 0.5, 0.5, "benchmark context", claim)
+    return [
+        ("search.check_context.single", search.check_context, claims("search-single"), 1, 1),
+        ("search.check_context.concurrent", search.check_context, claims("search-concurrent"), 1, concurrency),
+        ("llm.generate_verdict.single", explain, claims("llm-single"), 1, 1),
+        ("llm.generate_verdict.concurrent", explain, claims("llm-concurrent"), 1, concurrency),
+    ]
+
+def pipeline_cases(media, samples, concurrency, force_llm):
+    """End-to-end analyze_post per synthetic image and video (distinct claims per call)."""
+    from main import analyze_post
+
+    def cases_for(kind, label, path, runs):
+        claims = lambda mode: [(path, f"Benchmark {kind} {label} {mode} claim {i}") for i in range(runs)]
+        analyze = lambda item: analyze_post(item[0], item[1], force_llm=force_llm)
+        return [
+            (f"pipeline.analyze_post[{kind}:{label}].single", analyze, claims("single"), 1, 1),
+            (f"pipeline.analyze_post[{kind}:{label}].concurrent", analyze, claims("concurrent"), 1, concurrency),
+        ]
+
+    cases = []
+    for label, path in media["images"].items():
+        cases += cases_for("image", label, path, samples)
+    for label, path in media["videos"].items():
+        cases += cases_for("video", label, path, max(2, samples // 4))
+    return cases
+
+def run_benchmarks(args):
+    workdir = tempfile.mkdtemp(prefix="shieldai-bench-")
+    server = serve("127.0.0.1", 0, args.serper_latency_ms, args.serper_jitter_ms, 0.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    serper_url = f"http://127.0.0.1:{server.server_port}/search"
+    os.environ["SERPER_ENDPOINT"] = serper_url  # The env var wins over config in SearchEngine
+
+    registry = EngineRegistry(offline_config(workdir, serper_url, args.llm_latency_ms / 1000.0))
+    set_registry(registry)
+    rss_before_load = current_rss_mb()
+    load_times = registry.warmup()
+    print(f"⏳ Engines loaded in {sum(load_times.values()):.2f}s "
+          f"(RSS {rss_before_load:.0f} -> {current_rss_mb():.0f} MB)")
+
+    media = write_media(os.path.join(workdir, "media"))
+    cases = engine_cases(registry, args.samples, args.batch_size) + \
+        service_cases(registry, args.samples, args.concurrency) + \
+        pipeline_cases(media, args.samples, args.concurrency, args.force_llm)
+
+    results = {}
+    for name, fn, inputs, batch_size, concurrency in cases:
+        if args.only and not any(key in name for key in args.only):
+            continue
+        results[name] = run_case(fn, inputs, batch_size=batch_size, concurrency=concurrency)
+        r = results[name]
+        print(f"{name:<52} p50 {r['p50_ms']:>9.2f} ms | p95 {r['p95_ms']:>9.2f} | p99 {r['p99_ms']:>9.2f} | "
+              f"{r['throughput_per_s']:>8.2f}/s | RSS {r['peak_rss_mb']:.0f} MB")
+
+    server.shutdown()
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "samples": args.samples,
+            "batch_size": args.batch_size,
+            "concurrency": args.concurrency,
+            "serper_latency_ms": args.serper_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "force_llm": args.force_llm,
+            "model_load_s": load_times
+        },
+        "cases": results
+    }
+
+def write_json(path, report):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the analysis pipeline")
+    parser.add_argument("--samples", type=int, default=20, help="Inputs per case (the first call is warm-up)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4, help="Threads for the concurrent cases")
+    parser.add_argument("--serper-latency-ms", type=float, default=150)
+    parser.add_argument("--serper-jitter-ms", type=float, default=30)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--force-llm", action="store_true", help="Send every end-to-end case to the (fake) LLM")
+    parser.add_argument("--only", nargs="*", help="Run only cases whose name contains one of these")
+    parser.add_argument("--quick", action="store_true", help="5 samples per case")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Flag regressions against the baseline (exit 1)")
+    parser.add_argument("--tolerance", type=float, help="Override every relative tolerance (e.g. 0.15)")
+    args = parser.parse_args()
+    if args.quick:
+        args.samples = 5
+    # Checked up front so a missing baseline does not cost a full run
+    if args.compare and not os.path.exists(args.baseline):
+        flag = "" if args.baseline == BASELINE_PATH else f" --baseline {args.baseline}"
+        sys.exit(f"❌ No baseline at {args.baseline}. Record one first with: "
+                 f"python benchmarks/run.py --save-baseline{flag}")
+
+    report = run_benchmarks(args)
+    write_json(args.out, report)
+
+    regressions = []
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        tolerance = None
+        if args.tolerance is not None:
+            tolerance = {metric: args.tolerance for metric in DEFAULT_TOLERANCE}
+        regressions = compare(report, baseline, tolerance)
+        if baseline.get("meta", {}).get("cpu_count") != os.cpu_count():
+            print("⚠️ Baseline was recorded on a machine with a different core count")
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {args.baseline} ({baseline['meta'].get('commit')}):")
+            for r in regressions:
+                print(f"   {r['case']:<52} {r['metric']:<16} {r['baseline']} -> {r['current']} ({r['change']:+.1%})")
+        else:
+            print(f"✅ No regressions vs {args.baseline}")
+
+    # Saved after the comparison, so --compare --save-baseline never compares a run with itself
+    if args.save_baseline:
+        write_json(args.baseline, report)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import cv2
+import numpy as np
+
+# (height, width): purified default, a typical upload, a 12 MP phone photo
+RESOLUTIONS = [(224, 224), (1080, 1920), (3000, 4000)]
+
+def synth_image(height, width, seed=0):
+    """
+    BGR colour gradient + texture noise, close enough to a photo for timing the
+    engines. Shared by this suite and scripts/benchmark_frequency.py.
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = 127 + 60 * np.sin(x / 40.0) * np.cos(y / 55.0)
+    channels = [base + 25 * np.sin((x + y) / (70.0 + 20 * c)) for c in range(3)]
+    frame = np.stack(channels, axis=-1) + 20 * rng.standard_normal((height, width, 3), dtype=np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+def synth_video(path, seconds=6, fps=20, size=(320, 180), scenes=3, seed=0):
+    """Writes an MJPG .avi with `scenes` hard cuts and moving content inside each scene."""
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    total = int(seconds * fps)
+    bases = [synth_image(size[1], size[0], seed=seed + scene) for scene in range(scenes)]
+    for i in range(total):
+        frame = np.roll(bases[i * scenes // total], 2 * i, axis=1)
+        cv2.rectangle(frame, (10 + i % 100, 10), (40 + i % 100, 40), (255, 255, 255), -1)
+        noise = rng.integers(0, 4, frame.shape, dtype=np.uint8)
+        writer.write(cv2.add(frame, noise))
+    writer.release()
+    return path
+
+def write_media(directory, resolutions=RESOLUTIONS, video_seconds=(6,)):
+    """Writes the benchmark corpus. Returns {"images": {label: path}, "videos": {label: path}}."""
+    os.makedirs(directory, exist_ok=True)
+    media = {"images": {}, "videos": {}}
+    for i, (height, width) in enumerate(resolutions):
+        path = os.path.join(directory, f"synthetic_{width}x{height}.jpg")
+        cv2.imwrite(path, synth_image(height, width, seed=i))
+        media["images"][f"{width}x{height}"] = path
+    for seconds in video_seconds:
+        path = os.path.join(directory, f"synthetic_{seconds}s.avi")
+        media["videos"][f"{seconds}s"] = synth_video(path, seconds=seconds)
+    return media
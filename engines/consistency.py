@@ -1,47 +1,179 @@
 import torch
 import clip
-from PIL import Image
+from utils.cache import LRUCache, normalize_text
+from utils.media import to_pil
+from utils.metrics import span
+
+def build_prompts(text_claim):
+    """Prompt Templating (Generalization for PS 2): the claim phrased several ways."""
+    return [
+        f"a photo of {text_claim}",
+        f"a picture showing {text_claim}",
+        f"an image of {text_claim}",
+        text_claim
+    ]
+
+def normalize_claim(text_claim):
+    """
+    Cache key for a claim. CLIP's tokenizer already lower-cases and collapses
+    whitespace, so claims equal under this key produce identical text features.
+    """
+    return normalize_text(text_claim)
+
+def calibrate(similarity):
+    """
+    Scale a raw CLIP cosine similarity to a 0-1 range that's easier to threshold.
+    Raw CLIP scores are often low (0.2-0.3); we boost it for usability.
+    """
+    calibrated_score = min(max((similarity - 0.15) / (0.45 - 0.15), 0.0), 1.0)
+    return round(float(calibrated_score), 4)
 
 class ConsistencyEngine:
-    def __init__(self):
+    def __init__(self, model_name="ViT-B/32", batch_size=32, text_cache_size=4096):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model, self.preprocess = clip.load("ViT-B/32", device=self.device)
+        self.model, self.preprocess = clip.load(model_name, device=self.device)
+        self.batch_size = batch_size
+        # Normalized template features per claim; viral captions repeat a lot
+        self.text_cache = LRUCache(max_size=text_cache_size)
         print(f"✅ ConsistencyEngine initialized on {self.device}")
 
-    def compute_consistency(self, image_path, text_claim):
+    def get_text_features(self, claims):
+        """
+        Returns {normalized_claim: normalized template features [n_templates, dim]}.
+        Cached claims skip the text encoder entirely; all misses share one
+        encode_text call. Claims that cannot be tokenized are left out.
+        """
+        features, missing = {}, {}
+        for claim in claims:
+            key = normalize_claim(claim)
+            if key in features or key in missing:
+                continue
+            cached = self.text_cache.get(key)
+            if cached is not None:
+                features[key] = cached
+            else:
+                missing[key] = claim
+
+        if not missing:
+            return features
+
+        # Tokenize per claim so an over-long claim only drops itself
+        tokens, owners = [], []
+        for key, claim in missing.items():
+            try:
+                tokens.append(clip.tokenize(build_prompts(claim)))
+                owners.append(key)
+            except Exception as e:
+                print(f"Consistency Error (claim tokenization): {e}")
+
+        if not tokens:
+            return features
+
+        with torch.no_grad(), span("clip_text_encode"):
+            text_features = self.model.encode_text(torch.cat(tokens).to(self.device))
+            text_features /= text_features.norm(dim=-1, keepdim=True)
+
+        for key, claim_features in zip(owners, text_features.split([len(t) for t in tokens])):
+            self.text_cache.put(key, claim_features)
+            features[key] = claim_features
+
+        return features
+
+    def encode_image(self, image):
+        """Normalized CLIP image embedding as a float32 NumPy vector (for the embedding store)."""
+        image_input = self.preprocess(to_pil(image)).unsqueeze(0).to(self.device)
+        with torch.no_grad(), span("clip_encode"):
+            image_features = self.model.encode_image(image_input)
+            image_features /= image_features.norm(dim=-1, keepdim=True)
+        return image_features[0].float().cpu().numpy()
+
+    def score_embedding(self, image_embedding, text_claim):
+        """Calibrated consistency of a precomputed image embedding against a claim."""
+        try:
+            text_features = self.get_text_features([text_claim])[normalize_claim(text_claim)]
+            image_features = torch.as_tensor(image_embedding, device=self.device).to(text_features.dtype)
+            with torch.no_grad():
+                similarity = (image_features @ text_features.T).max().item()
+            return calibrate(similarity)
+        except Exception as e:
+            print(f"Consistency Error: {e}")
+            return 0.0
+
+    def compute_consistency(self, image, text_claim):
+        """`image` may be a path, a decoded BGR frame or a PIL image."""
         try:
             # 1. Preprocess Image
-            image = self.preprocess(Image.open(image_path)).unsqueeze(0).to(self.device)
-            
-            # 2. ENHANCED: Prompt Templating (Generalization for PS 2)
-            # We check the claim against several templates to find the best match
-            templates = [
-                f"a photo of {text_claim}",
-                f"a picture showing {text_claim}",
-                f"an image of {text_claim}",
-                text_claim
-            ]
-            
-            text_inputs = clip.tokenize(templates).to(self.device)
+            image_input = self.preprocess(to_pil(image)).unsqueeze(0).to(self.device)
+
+            # 2. Template features for the claim (served from cache when seen before)
+            text_features = self.get_text_features([text_claim])[normalize_claim(text_claim)]
 
             # 3. Compute Features
-            with torch.no_grad():
-                image_features = self.model.encode_image(image)
-                text_features = self.model.encode_text(text_inputs)
+            with torch.no_grad(), span("clip_encode"):
+                image_features = self.model.encode_image(image_input)
 
                 # Normalize features
                 image_features /= image_features.norm(dim=-1, keepdim=True)
-                text_features /= text_features.norm(dim=-1, keepdim=True)
 
                 # 4. Calculate Maximum Similarity across all templates
                 similarity = (image_features @ text_features.T).max().item()
-            
-            # 5. Calibration: Scale the score to a 0-1 range that's easier to threshold
-            # Raw CLIP scores are often low (0.2-0.3); we boost it for usability
-            calibrated_score = min(max((similarity - 0.15) / (0.45 - 0.15), 0.0), 1.0)
-            
-            return round(float(calibrated_score), 4)
+
+            # 5. Calibration
+            return calibrate(similarity)
 
         except Exception as e:
             print(f"Consistency Error: {e}")
-            return 0.0
\ No newline at end of file
+            return 0.0
+
+    def compute_consistency_batch(self, pairs, batch_size=None):
+        """
+        Batched version of compute_consistency for (image, text_claim) pairs.
+        Each chunk runs one encode_image call over the stacked images and at most
+        one encode_text call over the de-duplicated, not-yet-cached claims. Scores
+        match the single-item path; a pair that fails (bad image, over-long claim)
+        scores None without affecting the rest of the batch, so callers can tell
+        it apart from a genuine 0.0 mismatch.
+        """
+        batch_size = batch_size or self.batch_size
+        scores = [None] * len(pairs)
+
+        for start in range(0, len(pairs), batch_size):
+            chunk = list(enumerate(pairs[start:start + batch_size], start=start))
+
+            try:
+                text_features = self.get_text_features([claim for _, (_, claim) in chunk])
+            except Exception as e:
+                print(f"Consistency Batch Error: {e}")
+                continue
+
+            # 1. Preprocess images individually so one unreadable file only drops itself
+            images, valid = [], []
+            for idx, (image, text_claim) in chunk:
+                key = normalize_claim(text_claim)
+                if key not in text_features:
+                    continue
+                try:
+                    images.append(self.preprocess(to_pil(image)))
+                except Exception as e:
+                    print(f"Consistency Error (item {idx}): {e}")
+                    continue
+                valid.append((idx, key))
+
+            if not valid:
+                continue
+
+            try:
+                # 2. Compute Features (one forward pass for the whole chunk)
+                with torch.no_grad(), span("clip_encode"):
+                    image_features = self.model.encode_image(torch.stack(images).to(self.device))
+                    image_features /= image_features.norm(dim=-1, keepdim=True)
+
+                    # 3. Maximum Similarity over each pair's own templates, then calibrate
+                    for row, (idx, key) in enumerate(valid):
+                        similarity = (image_features[row] @ text_features[key].T).max().item()
+                        scores[idx] = calibrate(similarity)
+
+            except Exception as e:
+                print(f"Consistency Batch Error: {e}")
+
+        return scores
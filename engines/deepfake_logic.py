@@ -1,66 +1,96 @@
 import logging
 from transformers import pipeline
 from PIL import Image
+from utils.batching import MicroBatcher
+from utils.media import to_pil
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "dima806/deepfake_vs_real_image_detection"
+
 class DeepfakeDetector:
     """
     Detects AI-generated media using a pre-trained Vision Transformer (ViT).
     Model: dima806/deepfake_vs_real_image_detection
+
+    Concurrent callers should use submit(): requests arriving within a few
+    milliseconds of each other share one batched forward pass.
     """
-    
-    def __init__(self):
+
+    def __init__(self, model_name=DEFAULT_MODEL, max_batch_size=16, max_wait_ms=5):
         self.pipe = None
         try:
             logger.info("⏳ Loading Deepfake Detection Model (ViT)...")
             # Uses a robust pre-trained model from Hugging Face
-            self.pipe = pipeline("image-classification", model="dima806/deepfake_vs_real_image_detection")
+            self.pipe = pipeline("image-classification", model=model_name)
             logger.info("✅ Deepfake Model Loaded Successfully")
         except Exception as e:
             logger.error(f"Failed to load Deepfake Model: {e}")
 
+        self.batcher = MicroBatcher(
+            self.detect_deepfake_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="deepfake-batcher"
+        )
+
+    def close(self):
+        """Stops the micro-batching thread (it holds the model) after the queued images."""
+        self.batcher.close()
+
+    def submit(self, image):
+        """Queues an image (path / frame / PIL) for micro-batched inference. Returns a Future."""
+        return self.batcher.submit(image)
+
+    def _parse_predictions(self, preds):
+        """
+        The pipeline returns a list of labels/scores per image
+        Example: [{'label': 'fake', 'score': 0.99}, {'label': 'real', 'score': 0.01}]
+        """
+        fake_score = 0.0
+        for p in preds:
+            label = p['label'].lower()
+            if 'fake' in label or 'ai' in label:
+                fake_score = p['score']
+
+        # If the model only gave 'real' score, infer fake
+        if fake_score == 0.0:
+            for p in preds:
+                if 'real' in p['label'].lower():
+                    fake_score = 1.0 - p['score']
+
+        return {'fake_probability': round(float(fake_score), 4), 'method': 'ViT-B/16'}
+
+    def detect_deepfake_batch(self, images):
+        """Runs a list of images through the ViT in one forward pass."""
+        if not self.pipe:
+            return [self._heuristic_fallback(image) for image in images]
+
+        try:
+            pil_images = [to_pil(image).convert("RGB") for image in images]
+            batch_preds = self.pipe(pil_images, batch_size=len(pil_images))
+            return [self._parse_predictions(preds) for preds in batch_preds]
+        except Exception as e:
+            # One bad image must not fail its neighbours: retry them individually
+            logger.error(f"Batch Inference Error: {e}")
+            return [self.detect_deepfake(image) for image in images]
+
     def detect_deepfake(self, image: Image.Image):
         """
         Returns dictionary with:
         - fake_probability: 0.0 to 1.0
         - label: 'fake' or 'real'
         """
-        results = {'fake_probability': 0.0, 'method': 'ViT-B/16'}
-        
         if not self.pipe:
             return self._heuristic_fallback(image)
 
         try:
-            # The pipeline returns a list of labels/scores
-            # Example: [{'label': 'fake', 'score': 0.99}, {'label': 'real', 'score': 0.01}]
-            preds = self.pipe(image)
-            
-            fake_score = 0.0
-            for p in preds:
-                label = p['label'].lower()
-                if 'fake' in label or 'ai' in label:
-                    fake_score = p['score']
-                elif 'real' in label:
-                    # If label is real, fake_score is (1 - real_score)
-                    # But usually we just look for the fake label directly
-                    pass
-            
-            # If the model only gave 'real' score, infer fake
-            if fake_score == 0.0:
-                 for p in preds:
-                    if 'real' in p['label'].lower():
-                        fake_score = 1.0 - p['score']
-
-            results['fake_probability'] = round(float(fake_score), 4)
-
+            return self._parse_predictions(self.pipe(to_pil(image).convert("RGB")))
         except Exception as e:
             logger.error(f"Inference Error: {e}")
             return self._heuristic_fallback(image)
-            
-        return results
 
     def _heuristic_fallback(self, image):
         # ... (keep existing simple fallback)
@@ -1,38 +1,220 @@
 import cv2
 import numpy as np
+import scipy.fft
+from utils.media import to_gray
+from utils.metrics import span
+
+# Normalizer for the mean log-magnitude spectrum (the higher denominator we discussed for robustness)
+SPECTRUM_NORM = 210.0
+
+def fuse_signals(sig_fft, sig_dl):
+    """Weighted Fusion (Deliverable #6: Robustness): Math 30%, DL 70%"""
+    return round((sig_fft * 0.3) + (sig_dl * 0.7), 4)
+
+def spectrum_summary(spectrum):
+    """
+    get_tiled_spectrum without the per-tile grids (tile_scores, anomaly_map):
+    the aggregate score, grid shape, flagged tiles and stats. Small enough to
+    keep with every stored reading, whatever the resolution.
+    """
+    return {k: v for k, v in spectrum.items() if k not in ("tile_scores", "anomaly_map")}
+
+def _tile_starts(length, tile):
+    """Tile offsets covering the full axis; the last tile is aligned to the border."""
+    starts = list(range(0, length - tile + 1, tile))
+    if starts and starts[-1] + tile < length:
+        starts.append(length - tile)
+    return starts
 
 class ForensicsEngine:
-    def __init__(self):
-        # Initialize your DL model here if you have one
-        # self.dl_model = load_model(...) 
-        pass
-
-    def get_frequency_score(self, image_path):
-        """Math Sensor: Detects high-frequency patterns (FFT)"""
-        img = cv2.imread(image_path, 0)
+    def __init__(self, analysis_size=224, fft_workers=-1, tiled_min_pixels=4_000_000,
+                 tile_batch=32, anomaly_z=3.0, deepfake_detector=None, deepfake_timeout_s=30):
+        # Deep Learning sensor (DeepfakeDetector, micro-batched); None = math sensor only
+        self.deepfake = deepfake_detector
+        self.deepfake_timeout_s = deepfake_timeout_s
+        self.analysis_size = analysis_size
+        self.fft_workers = fft_workers
+        # Images above this many pixels also get a per-tile spectral map (report only)
+        self.tiled_min_pixels = tiled_min_pixels
+        self.tile_batch = tile_batch
+        self.anomaly_z = anomaly_z
+
+    def _prepare(self, image):
+        """Grayscale float32 frame at the fixed analysis size (None if unreadable)."""
+        img = to_gray(image)
+        if img is None:
+            return None
+        size = self.analysis_size
+        if img.shape != (size, size):
+            interpolation = cv2.INTER_AREA if img.shape[0] * img.shape[1] > size * size else cv2.INTER_LINEAR
+            img = cv2.resize(img, (size, size), interpolation=interpolation)
+        return img.astype(np.float32)
+
+    def _spectrum_means(self, stack, window=None):
+        """
+        Mean of 20*log(|FFT|+1) over the full spectrum for each image in [B, H, W].
+        Uses a real-input float32 FFT (half the spectrum); Hermitian symmetry means
+        every column except DC (and Nyquist for even widths) appears twice in the
+        full spectrum, so weighting them by 2 gives the exact full-spectrum mean.
+        """
+        height, width = stack.shape[-2:]
+        if window is not None:
+            stack = stack * window
+        spectrum = scipy.fft.rfft2(stack, axes=(-2, -1), workers=self.fft_workers)
+        log_mag = np.abs(spectrum)
+        del spectrum
+        np.log1p(log_mag, out=log_mag)
+
+        weights = np.full(log_mag.shape[-1], 2.0, dtype=np.float32)
+        weights[0] = 1.0
+        if width % 2 == 0:
+            weights[-1] = 1.0
+
+        column_sums = log_mag.sum(axis=-2, dtype=np.float64)
+        return 20.0 * (column_sums @ weights) / (height * width)
+
+    def get_frequency_scores(self, images):
+        """
+        Vectorized Math Sensor: scores a list of images with one batched FFT call.
+
+        Score equivalence: every image is first brought to analysis_size x analysis_size
+        (224 by default, the size analyze_post's purification already produces).
+        For inputs of that size the score equals the legacy full-resolution complex FFT
+        score (legacy_frequency_score) up to float32 rounding (~1e-8). For other sizes it
+        equals the legacy score of the resized image; this is deliberate, since the
+        legacy mean grows by roughly 10*ln(H*W)/210 with pixel count and so scored the
+        same content higher on larger uploads. Thresholds were tuned on the purified
+        224 px path and need no recalibration.
+        """
+        scores = [0.0] * len(images)
+        prepared = [(i, self._prepare(image)) for i, image in enumerate(images)]
+        valid = [(i, img) for i, img in prepared if img is not None]
+        if not valid:
+            return scores
+
+        with span("fft"):
+            means = self._spectrum_means(np.stack([img for _, img in valid]))
+        for (i, _), mean in zip(valid, means):
+            scores[i] = min(max(float(mean / SPECTRUM_NORM), 0.0), 1.0)
+        return scores
+
+    def get_frequency_score(self, image):
+        """
+        Math Sensor: Detects high-frequency patterns (FFT). Takes a path or decoded frame.
+        Always scored at analysis_size, whatever the resolution, so the score (and the
+        fused ai_prob) does not depend on the upload size; the resize also bounds memory.
+        """
+        return self.get_frequency_scores([image])[0]
+
+    def get_tiled_spectrum(self, image, tile_size=None, window=False):
+        """
+        Tiled Math Sensor for panoramas / 8K screenshots.
+        Streams fixed-size tiles through the float32 FFT in small batches, so peak
+        memory depends on tile_size * tile_batch rather than on the resolution.
+        window=True applies a 2-D Hann window (less edge leakage, lower absolute scores).
+        Tile scores come from native-resolution pixels, so they are only comparable with
+        each other (for the anomaly map), not with get_frequency_score; the verdict
+        never uses them.
+
+        Returns the aggregate score plus a per-tile score grid and a robust z-score
+        anomaly map (tiles far from the image's median spectrum are flagged).
+        """
+        img = to_gray(image)
+        if img is None:
+            return None
+
+        tile = tile_size or self.analysis_size
+        rows, cols = _tile_starts(img.shape[0], tile), _tile_starts(img.shape[1], tile)
+        if not rows or not cols:
+            # Smaller than one tile: a single resized tile is the whole analysis
+            rows, cols, img = [0], [0], cv2.resize(img, (tile, tile))
+
+        hann = np.outer(np.hanning(tile), np.hanning(tile)).astype(np.float32) if window else None
+        positions = [(y, x) for y in rows for x in cols]
+        means = np.empty(len(positions), dtype=np.float64)
+
+        with span("fft_tiled"):
+            for start in range(0, len(positions), self.tile_batch):
+                batch = positions[start:start + self.tile_batch]
+                stack = np.stack([img[y:y + tile, x:x + tile] for y, x in batch]).astype(np.float32)
+                means[start:start + len(batch)] = self._spectrum_means(stack, window=hann)
+
+        tile_scores = np.clip(means / SPECTRUM_NORM, 0.0, 1.0).reshape(len(rows), len(cols))
+
+        # Robust z-score against the image's own typical tile (median / MAD)
+        median = np.median(tile_scores)
+        mad = 1.4826 * np.median(np.abs(tile_scores - median))
+        anomaly = (tile_scores - median) / (mad + 1e-6)
+        flagged = np.argwhere(np.abs(anomaly) > self.anomaly_z)
+
+        return {
+            "score": round(float(tile_scores.mean()), 4),
+            "tile_size": tile,
+            "windowed": bool(window),
+            "grid": [len(rows), len(cols)],
+            "tile_scores": np.round(tile_scores, 4).tolist(),
+            "anomaly_map": np.round(anomaly, 2).tolist(),
+            "flagged_tiles": flagged.tolist(),
+            "stats": {
+                "median": round(float(median), 4),
+                "max": round(float(tile_scores.max()), 4),
+                "std": round(float(tile_scores.std()), 4)
+            }
+        }
+
+    def legacy_frequency_score(self, image):
+        """Original full-resolution complex128 FFT sensor (kept for benchmarks and equivalence checks)."""
+        img = to_gray(image)
         if img is None: return 0.0
-        
+
         # FFT Analysis
         dft = np.fft.fft2(img)
         dft_shift = np.fft.fftshift(dft)
         mag_spec = 20 * np.log(np.abs(dft_shift) + 1)
-        
+
         # Normalize and return a score between 0 and 1
-        # Using the higher denominator 210.0 we discussed for robustness
-        score = np.mean(mag_spec) / 210.0
+        score = np.mean(mag_spec) / SPECTRUM_NORM
         return min(max(float(score), 0.0), 1.0)
 
-    def detect_synthetic(self, image_path):
+    def _dl_score(self, result):
+        # The heuristic fallback means the ViT is offline: keep the math-only behaviour
+        if result is None or result.get('method') == 'heuristic_fallback':
+            return 0.0
+        return result['fake_probability']
+
+    def get_deepfake_score(self, image):
+        """Deep Learning Sensor: ViT fake probability via the shared micro-batcher."""
+        if self.deepfake is None:
+            return 0.0
+        try:
+            # Includes the micro-batching wait: that is the latency this request sees
+            with span("deepfake_vit"):
+                result = self.deepfake.submit(image).result(timeout=self.deepfake_timeout_s)
+        except Exception as e:
+            print(f"Deepfake sensor error: {e}")
+            return 0.0
+        return self._dl_score(result)
+
+    def fuse(self, sig_fft, sig_dl):
+        return fuse_signals(sig_fft, sig_dl)
+
+    def analyze_signals(self, image):
+        """Individual sensor readings plus the fused AI probability."""
+        sig_fft = self.get_frequency_score(image)
+        sig_dl = self.get_deepfake_score(image)
+        return {"fft": round(sig_fft, 4), "deepfake": round(sig_dl, 4), "ai_prob": self.fuse(sig_fft, sig_dl)}
+
+    def detect_synthetic(self, image):
         """Unified Sensor: Fuses Math and Deep Learning signals"""
-        # This is where the error was happening!
-        sig_fft = self.get_frequency_score(image_path) 
-        
-        # Placeholder for your Deep Learning score
-        # If you don't have a DL model yet, use 0.0 or sig_fft
-        sig_dl = 0.0 
-        
-        # Weighted Fusion (Deliverable #6: Robustness)
-        # Trusting Math 30% and DL 70% (or adjust as needed)
-        final_prob = (sig_fft * 0.3) + (sig_dl * 0.7)
-        
-        return round(final_prob, 4)
\ No newline at end of file
+        return self.analyze_signals(image)["ai_prob"]
+
+    def detect_synthetic_batch(self, images):
+        """Batched Unified Sensor: one vectorized FFT call and one ViT forward pass for all images."""
+        fft_scores = self.get_frequency_scores(images)
+        if self.deepfake is None:
+            dl_scores = [0.0] * len(images)
+        else:
+            with span("deepfake_vit"):
+                results = self.deepfake.detect_deepfake_batch(images)
+            dl_scores = [self._dl_score(r) for r in results]
+        return [self.fuse(f, d) for f, d in zip(fft_scores, dl_scores)]
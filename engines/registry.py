@@ -0,0 +1,339 @@
+import json
+import os
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from engines.forensics import ForensicsEngine
+from engines.search import SearchEngine
+from engines.robustness import RobustnessEngine
+from utils.explainer import Explainer, DEFAULT_MODEL as DEFAULT_REASONER
+from utils.llm_client import FakeBackend, GroqBackend, LLMClient
+from utils.metrics import span
+from utils.embedding_store import EmbeddingStore
+from utils.result_cache import ResultCache
+from utils.search_cache import SearchCache
+
+CONFIG_PATH = "config.json"
+_UNSET = object()
+
+# Config sections each engine is built from: when one changes on disk, the engine
+# is rebuilt on next use, so results never carry a config version the engines don't run.
+# The worker pools are sized once per process and are not rebuilt.
+ENGINE_SECTIONS = {
+    "consistency": ("model_settings",),
+    "deepfake": ("deepfake",),
+    "forensics": ("forensics", "deepfake"),
+    "search": ("search",),
+    "search_cache": ("search_cache",),
+    "llm": ("llm", "model_settings"),
+    "explainer": ("model_settings", "explainer"),
+    "embedding_store": ("embedding_store",),
+    "result_cache": ("cache",),
+}
+# Engines holding a reference to another engine are rebuilt along with it
+ENGINE_DEPENDENCIES = {"forensics": ("deepfake",), "search": ("search_cache",), "explainer": ("llm",)}
+
+
+def stale_engines(previous, config):
+    """Engines whose config sections differ between two configs, plus the engines holding them."""
+    stale = {name for name, sections in ENGINE_SECTIONS.items()
+             if any(previous.get(s) != config.get(s) for s in sections)}
+    while True:
+        dependents = {name for name, deps in ENGINE_DEPENDENCIES.items() if stale.intersection(deps)}
+        if dependents <= stale:
+            return stale
+        stale |= dependents
+
+
+class EngineRegistry:
+    """
+    Process-wide home for the analysis engines.
+    Engines are built lazily on first use and then shared by every caller
+    (API requests, Streamlit reruns, batch scripts), so CLIP & co. load once.
+    """
+
+    def __init__(self, config_path=CONFIG_PATH, factories=None):
+        """factories: overrides / additions to the default engine builders (tests, offline tools)."""
+        self.config_path = config_path
+        self.factories = {
+            "robustness": RobustnessEngine,
+            "consistency": self._build_consistency,
+            "deepfake": self._build_deepfake,
+            "forensics": self._build_forensics,
+            "search": self._build_search,
+            "search_cache": self._build_search_cache,
+            "llm": self._build_llm,
+            "explainer": self._build_explainer,
+            "embedding_store": self._build_embedding_store,
+            "result_cache": self._build_result_cache,
+            "stage_pool": self._build_stage_pool,
+            "decode_pool": self._build_decode_pool,
+            **(factories or {})
+        }
+        self.load_times = {}
+        self._engines = {}
+        self._locks = {name: threading.Lock() for name in self.factories}
+        self._config_lock = threading.Lock()
+        self._config = None
+        self._config_mtime = None
+
+    def _build_consistency(self):
+        # Model libraries (torch / CLIP, transformers) are imported on first build, not at import time
+        from engines.consistency import ConsistencyEngine
+        settings = self.get_config().get('model_settings', {})
+        return ConsistencyEngine(
+            model_name=settings.get('clip_model', 'ViT-B/32'),
+            batch_size=settings.get('clip_batch_size', 32),
+            text_cache_size=settings.get('text_cache_size', 4096)
+        )
+
+    def _build_deepfake(self):
+        settings = self.get_config().get('deepfake', {})
+        if not settings.get('enabled', True):
+            return None
+        from engines.deepfake_logic import DeepfakeDetector, DEFAULT_MODEL
+        return DeepfakeDetector(
+            model_name=settings.get('model', DEFAULT_MODEL),
+            max_batch_size=settings.get('max_batch_size', 16),
+            max_wait_ms=settings.get('max_wait_ms', 5)
+        )
+
+    def _build_forensics(self):
+        settings = self.get_config().get('forensics', {})
+        return ForensicsEngine(
+            analysis_size=settings.get('analysis_size', 224),
+            fft_workers=settings.get('fft_workers', -1),
+            tiled_min_pixels=settings.get('tiled_min_pixels', 4_000_000),
+            tile_batch=settings.get('tile_batch', 32),
+            anomaly_z=settings.get('anomaly_z', 3.0),
+            deepfake_detector=self.get("deepfake"),
+            deepfake_timeout_s=self.get_config().get('deepfake', {}).get('timeout_s', 30)
+        )
+
+    def _build_search(self):
+        settings = self.get_config().get('search', {})
+        return SearchEngine(
+            endpoint=settings.get('endpoint'),
+            query_timeout_s=settings.get('query_timeout_s', 4.0),
+            overall_timeout_s=settings.get('overall_timeout_s', 6.0),
+            max_workers=settings.get('max_workers', 8),
+            cache=self.get("search_cache")
+        )
+
+    def _build_search_cache(self):
+        settings = self.get_config().get('search_cache', {})
+        if not settings.get('enabled', True):
+            return None
+        return SearchCache(
+            path=settings.get('path', 'cache/search.sqlite'),
+            memory_entries=settings.get('memory_entries', 1024),
+            ttl_s=settings.get('ttl_s', 21600),
+            stale_ttl_s=settings.get('stale_ttl_s', 86400)
+        )
+
+    def _build_explainer(self):
+        settings = self.get_config().get('model_settings', {})
+        return Explainer(
+            model_id=settings.get('reasoner_model', DEFAULT_REASONER),
+            routing=self.get_config().get('explainer'),
+            llm=self.get("llm")
+        )
+
+    def _build_llm(self):
+        settings = self.get_config().get('llm', {})
+        if settings.get('backend', 'groq') == 'fake':
+            # Offline runs (tests, benchmarks): no network, configurable latency
+            backend = FakeBackend(latency_s=settings.get('fake_latency_s', 0.5))
+        else:
+            api_key = os.getenv("GROQ_API_KEY")
+            if not api_key:
+                return None
+            model_id = self.get_config().get('model_settings', {}).get('reasoner_model', DEFAULT_REASONER)
+            backend = GroqBackend(api_key, model_id)
+        return LLMClient(
+            backend,
+            requests_per_minute=settings.get('requests_per_minute', 30),
+            burst=settings.get('burst', 5),
+            max_concurrency=settings.get('max_concurrency', 4),
+            max_retries=settings.get('max_retries', 4),
+            backoff_base_s=settings.get('backoff_base_s', 0.5),
+            backoff_max_s=settings.get('backoff_max_s', 8.0),
+            acquire_timeout_s=settings.get('acquire_timeout_s', 60),
+            cache_size=settings.get('cache_size', 512)
+        )
+
+    def _build_result_cache(self):
+        settings = self.get_config().get('cache', {})
+        if not settings.get('enabled', True):
+            return None
+        return ResultCache(
+            path=settings.get('path', 'cache/results.sqlite'),
+            memory_entries=settings.get('memory_entries', 256),
+            ttl_s=settings.get('ttl_s', 86400)
+        )
+
+    def _build_stage_pool(self):
+        # Shared by every analysis: independent pipeline stages run here concurrently
+        settings = self.get_config().get('pipeline', {})
+        return ThreadPoolExecutor(max_workers=settings.get('stage_workers', 8), thread_name_prefix="stage")
+
+    def _build_decode_pool(self):
+        # Long-video segments decode in separate processes (cv2 decoding scales with cores).
+        # "spawn" keeps the workers free of the parent's threads and loaded models.
+        workers = self.get_config().get('video', {}).get('decode_workers') or os.cpu_count() or 1
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _build_embedding_store(self):
+        settings = self.get_config().get('embedding_store', {})
+        if not settings.get('enabled', True):
+            return None
+        return EmbeddingStore(
+            path=settings.get('path', 'cache/embeddings'),
+            dim=settings.get('dim', 512),
+            capacity=settings.get('capacity', 10000)
+        )
+
+    def get_config(self):
+        """
+        Returns config.json, re-reading it only when the file changes on disk.
+        Engines built from a section that changed are dropped and rebuilt on next use.
+        """
+        with span("config_load"):
+            mtime = os.path.getmtime(self.config_path)
+            stale = set()
+            with self._config_lock:
+                if self._config is None or mtime != self._config_mtime:
+                    previous = self._config
+                    with open(self.config_path, 'r') as f:
+                        self._config = json.load(f)
+                    self._config_mtime = mtime
+                    if previous is not None:
+                        stale = stale_engines(previous, self._config)
+                config = self._config
+            # Outside the config lock: builders hold their engine lock while reading the config
+            if stale:
+                self._drop_engines(stale)
+            return config
+
+    def _drop_engines(self, names):
+        """Forgets the given engines (rebuilt on next use) and closes their threads / pools."""
+        dropped = []
+        for name in sorted(names):
+            with self._locks[name]:
+                engine = self._engines.pop(name, _UNSET)
+            if engine is _UNSET:
+                continue
+            dropped.append(name)
+            close = getattr(engine, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Error closing {name}: {e}")
+        if dropped:
+            print(f"♻️ config.json changed: rebuilding {', '.join(dropped)} on next use")
+        return dropped
+
+    def get(self, name):
+        """Returns the shared engine instance, loading it on first use (thread-safe)."""
+        engine = self._engines.get(name, _UNSET)
+        if engine is not _UNSET:
+            return engine
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            engine = self._engines.get(name, _UNSET)
+            if engine is _UNSET:
+                start = time.perf_counter()
+                nested_before = self.total_load_time()
+                engine = self._engines[name] = self.factories[name]()
+                # Exclude engines loaded as dependencies (recorded under their own name)
+                nested = self.total_load_time() - nested_before
+                # Accumulated across rebuilds, so total_load_time never goes backwards
+                self.load_times[name] = round(self.load_times.get(name, 0.0) + time.perf_counter() - start - nested, 4)
+        # The local instance: a concurrent config reload may already have dropped the entry
+        return engine
+
+    def warmup(self, names=None):
+        """Eagerly loads engines (e.g. at server startup). Returns per-engine load times."""
+        for name in names or self.factories:
+            self.get(name)
+        return dict(self.load_times)
+
+    def is_loaded(self, name):
+        return name in self._engines
+
+    def total_load_time(self):
+        return round(sum(self.load_times.values()), 4)
+
+    # Convenience accessors
+    @property
+    def robustness(self):
+        return self.get("robustness")
+
+    @property
+    def consistency(self):
+        return self.get("consistency")
+
+    @property
+    def deepfake(self):
+        return self.get("deepfake")
+
+    @property
+    def forensics(self):
+        return self.get("forensics")
+
+    @property
+    def search(self):
+        return self.get("search")
+
+    @property
+    def search_cache(self):
+        return self.get("search_cache")
+
+    @property
+    def llm(self):
+        return self.get("llm")
+
+    @property
+    def explainer(self):
+        return self.get("explainer")
+
+    @property
+    def embedding_store(self):
+        return self.get("embedding_store")
+
+    @property
+    def result_cache(self):
+        return self.get("result_cache")
+
+    @property
+    def stage_pool(self):
+        return self.get("stage_pool")
+
+    @property
+    def decode_pool(self):
+        return self.get("decode_pool")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide EngineRegistry, creating it on first call."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EngineRegistry()
+    return _registry
+
+
+def set_registry(registry):
+    """Replaces the process-wide registry (e.g. one built from an offline benchmark config)."""
+    global _registry
+    with _registry_lock:
+        _registry = registry
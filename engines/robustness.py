@@ -1,31 +1,43 @@
+import os
 import cv2
 import numpy as np
+from utils.media import decode_image
+from utils.metrics import span
 
 class RobustnessEngine:
     def __init__(self):
         print("✅ RobustnessEngine initialized (Defense Layer)")
 
-    def purify_image(self, image_path):
+    def purify(self, image):
         """
-        Applies a Gaussian Blur and Resizing to 'wash out' 
+        Applies a Gaussian Blur and Resizing to 'wash out'
         potential adversarial noise (perturbations).
+        Works in memory: takes a path / frame / PIL image, returns a BGR frame (or None).
         """
-        try:
-            img = cv2.imread(image_path)
-            if img is None:
-                return None
-                
+        img = decode_image(image)
+        if img is None:
+            return None
+
+        with span("purify"):
             # 1. Apply slight Gaussian Blur to remove pixel-level noise
             purified = cv2.GaussianBlur(img, (3, 3), 0)
-            
+
             # 2. Standardize size to break scale-dependent attacks
-            purified = cv2.resize(purified, (224, 224))
-            
-            # Save back to a temporary 'clean' file
-            clean_path = image_path.replace(".jpg", "_clean.jpg")
+            return cv2.resize(purified, (224, 224))
+
+    def purify_image(self, image_path):
+        """File-based wrapper around purify() that writes a '<name>_clean<ext>' copy."""
+        try:
+            purified = self.purify(image_path)
+            if purified is None:
+                return None
+
+            # Save back to a 'clean' file next to the original (any extension)
+            stem, ext = os.path.splitext(image_path)
+            clean_path = f"{stem}_clean{ext or '.jpg'}"
             cv2.imwrite(clean_path, purified)
-            
+
             return clean_path
         except Exception as e:
             print(f"Purification error: {e}")
-            return image_path # Fallback to original
\ No newline at end of file
+            return image_path # Fallback to original
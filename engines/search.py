@@ -1,33 +1,68 @@
+import contextvars
 import requests
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from utils.metrics import span
 
 load_dotenv()
 
+SERPER_ENDPOINT = "https://google.serper.dev/search"
+
 class SearchEngine:
-    def __init__(self):
+    def __init__(self, endpoint=None, query_timeout_s=4.0, overall_timeout_s=6.0, max_workers=8, cache=None):
         # Using Serper.dev or Google Custom Search API is standard for 2026 hackathons
-        self.api_key = os.getenv("SERPER_API_KEY") 
+        self.api_key = os.getenv("SERPER_API_KEY")
+        # A local stand-in (scripts/fake_serper.py) can replace Serper for offline load tests
+        self.endpoint = os.getenv("SERPER_ENDPOINT") or endpoint or SERPER_ENDPOINT
+        self.query_timeout_s = query_timeout_s
+        self.overall_timeout_s = overall_timeout_s
+        # Optional SearchCache: repeated claims produce the same query strings
+        self.cache = cache
 
-    def execute_google_search(self, query):
-        """Standard API call to fetch real-time global context."""
-        if not self.api_key:
-            return "Search API key missing. Ground truth verification disabled."
-        
-        url = "https://google.serper.dev/search"
-        payload = {"q": query}
+        # Pooled keep-alive connections shared by every request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+
+    def close(self):
+        """Releases the query threads and pooled connections (the cache is closed by its owner)."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _is_enabled(self):
+        # The key is only mandatory for the real Serper API
+        return bool(self.api_key) or self.endpoint != SERPER_ENDPOINT
+
+    def fetch_snippets(self, query):
+        """One search call; raises on network/HTTP errors or timeout."""
         headers = {
-            'X-API-KEY': self.api_key,
+            'X-API-KEY': self.api_key or "local",
             'Content-Type': 'application/json'
         }
-        
+        # Only the network call is timed: cache hits are not Serper queries
+        with span("serper_query"):
+            response = self.session.post(self.endpoint, json={"q": query}, headers=headers,
+                                         timeout=self.query_timeout_s)
+        response.raise_for_status()
+        results = response.json()
+        # Combine snippets into a single context string
+        snippets = [item.get('snippet', '') for item in results.get('organic', [])[:3]]
+        return " ".join(snippets)
+
+    def execute_google_search(self, query):
+        """Standard API call to fetch real-time global context."""
+        if not self._is_enabled():
+            return "Search API key missing. Ground truth verification disabled."
+
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            results = response.json()
-            # Combine snippets into a single context string
-            snippets = [item.get('snippet', '') for item in results.get('organic', [])[:3]]
-            return " ".join(snippets)
+            if self.cache is not None:
+                return self.cache.fetch(query, self.fetch_snippets, endpoint=self.endpoint)
+            return self.fetch_snippets(query)
         except Exception as e:
             return f"Search failed: {str(e)}"
 
@@ -46,10 +81,22 @@ class SearchEngine:
             f"{claim} fake or real scam",
             f"official website for {claim}"
         ]
-        
-        combined_results = ""
-        for q in queries:
-            combined_results += self.execute_google_search(q) + " "
+
+        # Issue all queries concurrently; whatever finishes before the overall
+        # deadline is used, the rest count as failed (partial results)
+        # Each query runs in the caller's context so its span lands in the request trace
+        futures = [self._executor.submit(contextvars.copy_context().run, self.execute_google_search, q)
+                   for q in queries]
+        done, _ = wait(futures, timeout=self.overall_timeout_s)
+
+        parts = []
+        failed_queries = 0
+        for future in futures:
+            text = future.result() if future in done else "Search failed: deadline exceeded"
+            if text.startswith(("Search failed", "Search API key missing")):
+                failed_queries += 1
+            parts.append(text)
+        combined_results = " ".join(parts) + " "
 
         # 2026 Hackathon Trick: Look for 'Urgency' and 'Reward' patterns in text
         scam_patterns = ["winners selected", "claim now", "fill the form", "randomly selected", "limited time"]
@@ -58,5 +105,7 @@ class SearchEngine:
         return {
             "raw_text": combined_results,
             "is_suspicious_text": is_suspicious_text,
-            "source_count": len(combined_results.split())
-        }
\ No newline at end of file
+            "source_count": len(combined_results.split()),
+            "failed_queries": failed_queries,
+            "partial": 0 < failed_queries < len(queries)
+        }
@@ -13,6 +13,7 @@ function App() {
   const [claim, setClaim] = useState('');
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState(null);
+  const [streaming, setStreaming] = useState(false);
   const [error, setError] = useState(null);
   const [feedbackSent, setFeedbackSent] = useState(false);
 
@@ -31,16 +32,53 @@ function App() {
     formData.append('file', file);
     formData.append('claim', claim);
 
+    // Streamed analysis: scores arrive first, then the report token by token (NDJSON)
+    const startedAt = performance.now();
+    setStreaming(true);
     try {
-      const response = await axios.post('http://localhost:8000/analyze', formData, {
-        headers: { 'Content-Type': 'multipart/form-data' }
+      const response = await fetch('http://localhost:8000/analyze/stream', {
+        method: 'POST',
+        body: formData
       });
-      setResult(response.data);
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      const handleEvent = (event) => {
+        if (event.event === 'scores') {
+          setResult({
+            is_misinfo: event.is_misinfo,
+            technical_stats: event.technical_stats,
+            explanation: '',
+            ttfb_ms: Math.round(performance.now() - startedAt)
+          });
+          setLoading(false);
+        } else if (event.event === 'token') {
+          setResult((prev) => ({ ...prev, explanation: prev.explanation + event.text }));
+        } else if (event.event === 'done') {
+          setResult((prev) => ({ ...event.result, ttfb_ms: prev?.ttfb_ms }));
+        } else if (event.event === 'error') {
+          setError(`Analysis Failed: ${event.detail}`);
+        }
+      };
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+      }
+      if (buffer.trim()) handleEvent(JSON.parse(buffer));
     } catch (err) {
       console.error(err);
       setError("Analysis Failed. Ensure the Backend API is running.");
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -213,7 +251,7 @@ function App() {
             {/* RIGHT COLUMN: Results Zone */}
             <section>
               {result ? (
-                <VerdictCard result={result} />
+                <VerdictCard result={result} streaming={streaming} />
               ) : (
                 <div style={{
                   height: '100%',
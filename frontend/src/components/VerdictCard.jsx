@@ -21,12 +21,14 @@ ChartJS.register(
     Legend
 );
 
-const VerdictCard = ({ result }) => {
+const VerdictCard = ({ result, streaming = false }) => {
     const [expanded, setExpanded] = useState(false);
 
     if (!result) return null;
 
-    const { is_misinfo, technical_stats, explanation } = result;
+    const { is_misinfo, technical_stats, explanation, ttfb_ms } = result;
+    // Keep the report open while it is still being written
+    const showReport = expanded || streaming;
 
     // Design Logic
     const theme = is_misinfo
@@ -91,6 +93,11 @@ const VerdictCard = ({ result }) => {
                         <p style={{ margin: 0, color: 'var(--text-secondary)', fontSize: '0.9rem' }}>
                             Confidence Score: <b>{is_misinfo ? (technical_stats.ai_prob * 100).toFixed(1) : (technical_stats.consistency * 100).toFixed(1)}%</b>
                         </p>
+                        {ttfb_ms !== undefined && (
+                            <p style={{ margin: 0, color: 'var(--text-secondary)', fontSize: '0.8rem' }}>
+                                First result in {(ttfb_ms / 1000).toFixed(2)}s
+                            </p>
+                        )}
                     </div>
                 </div>
             </div>
@@ -111,7 +118,7 @@ const VerdictCard = ({ result }) => {
                             <div key={step} style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
                                 <div style={{ width: '8px', height: '8px', borderRadius: '50%', background: 'var(--accent-black)' }}></div>
                                 <span style={{ fontSize: '0.9rem', fontWeight: 500 }}>{step}</span>
-                                {i === 3 && <span style={{ marginLeft: 'auto', fontSize: '0.8rem', color: 'var(--safe-green)' }}>COMPLETED</span>}
+                                {i === 3 && <span style={{ marginLeft: 'auto', fontSize: '0.8rem', color: streaming ? 'var(--text-secondary)' : 'var(--safe-green)' }}>{streaming ? 'EXPLAINING...' : 'COMPLETED'}</span>}
                             </div>
                         ))}
                     </div>
@@ -135,10 +142,10 @@ const VerdictCard = ({ result }) => {
                     }}
                 >
                     <span>📄 View Evidence Report</span>
-                    {expanded ? <ChevronUp size={20} /> : <ChevronDown size={20} />}
+                    {showReport ? <ChevronUp size={20} /> : <ChevronDown size={20} />}
                 </button>
 
-                {expanded && (
+                {showReport && (
                     <motion.div
                         initial={{ height: 0 }}
                         animate={{ height: 'auto' }}
@@ -148,6 +155,7 @@ const VerdictCard = ({ result }) => {
                             {explanation.split('\n').map((line, i) => (
                                 <p key={i} style={{ marginBottom: '0.5rem' }}>{line}</p>
                             ))}
+                            {streaming && <span style={{ color: 'var(--text-secondary)' }}>▍</span>}
                         </div>
                     </motion.div>
                 )}
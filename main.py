@@ -1,91 +1,528 @@
-import json
+import copy
 import os
-import cv2
+import time
 import numpy as np
-from engines.consistency import ConsistencyEngine
-from engines.forensics import ForensicsEngine
-from engines.search import SearchEngine
-from engines.robustness import RobustnessEngine
-from utils.explainer import Explainer
+from engines.forensics import fuse_signals, spectrum_summary
+from engines.registry import get_registry
+from utils.embedding_store import media_key
+from utils.dag import StageGraph
+from utils.media import decode_image
+from utils.metrics import METRICS, span, tracing
+from utils.result_cache import config_version
+from utils.uploads import file_sha256
+from utils.timeline import build_timeline
+from utils.video_processor import decode_segments, probe_video, sample_keyframes
+from utils.explainer import is_degraded
 
 def load_config():
-    with open('config.json', 'r') as f:
-        return json.load(f)
+    return get_registry().get_config()
 
-def analyze_post(image_path, text, use_defense=True):
-    # 1. Load Settings and Initialize Engines
-    config = load_config()
-    t = config['thresholds']
-    
-    re = RobustnessEngine()
-    ce = ConsistencyEngine()
-    fe = ForensicsEngine()
-    se = SearchEngine()
-    ex = Explainer()
-
-    # 2. Check if the file is a video
-    is_video = image_path.lower().endswith(('.mp4', '.mov', '.avi'))
-    
-    if is_video:
-        # VIDEO LOGIC: Extract 3 key frames
-        cap = cv2.VideoCapture(image_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frame_indices = [0, total_frames // 2, max(0, total_frames - 1)] if total_frames > 0 else [0]
-        
-        f_scores = []
-        c_scores = []
-        
-        for idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
-            if ret:
-                temp_path = f"temp_frame_{idx}.jpg"
-                cv2.imwrite(temp_path, frame)
-                
-                # Analyze frame
-                f_scores.append(fe.detect_synthetic(temp_path))
-                # FIX 1: Updated method name here
-                c_scores.append(ce.compute_consistency(temp_path, text))
-                
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-        
-        cap.release()
+def add_video_stages(graph, registry, config, image_path, text):
+    """
+    VIDEO LOGIC: scene-aware keyframes (under a frame budget), decoded in memory
+    and sent to each engine as one batch.
+    """
+    ce = registry.consistency
+    fe = registry.forensics
+    settings = config.get('video', {})
+
+    def decode():
+        with span("decode"):
+            return sample_keyframes(
+                image_path,
+                frame_budget=settings.get('frame_budget', 8),
+                max_probes=settings.get('max_probes', 300),
+                probe_size=tuple(settings.get('probe_size', (64, 36))),
+                scene_threshold=settings.get('scene_threshold', 0.12)
+            )
+
+    def fuse(keyframes, f_scores, c_scores):
         f_score = max(f_scores) if f_scores else 0.0
-        c_score = sum(c_scores) / len(c_scores) if c_scores else 0.0
-        analysis_path = image_path 
-        search_context = se.check_context(text)
-    
+        # Keyframes CLIP could not score (None) are left out of the mean
+        scored = [c for c in c_scores if c is not None]
+        c_score = sum(scored) / len(scored) if scored else 0.0
+        extras = {"keyframes": [
+            {"index": k.index, "timestamp_s": k.timestamp_s, "ai_prob": f,
+             "consistency": None if c is None else round(c, 4)}
+            for k, f, c in zip(keyframes, f_scores, c_scores)
+        ]}
+        return c_score, f_score, extras
+
+    graph.add("decode", decode)
+    graph.add("forensics", lambda keyframes: fe.detect_synthetic_batch([k.frame for k in keyframes]) if keyframes else [], ["decode"])
+    graph.add("consistency", lambda keyframes: ce.compute_consistency_batch([(k.frame, text) for k in keyframes]), ["decode"])
+    graph.add("fuse", fuse, ["decode", "forensics", "consistency"])
+
+def cascade_exit(cascade, sig_fft, c_score):
+    """
+    Early-exit reason from the cheap signals: "synthetic" (spectral score alone
+    is decisive), "ooc" (CLIP consistency alone is decisive) or None.
+    c_score may be a callable, evaluated only when the spectral check passes.
+    """
+    if not cascade.get('enabled', False):
+        return None
+    synthetic_fft_min = cascade.get('synthetic_fft_min')
+    if synthetic_fft_min is not None and sig_fft >= synthetic_fft_min:
+        return "synthetic"
+    c_score = c_score() if callable(c_score) else c_score
+    if c_score is not None and c_score <= cascade.get('ooc_consistency_max', 0.10):
+        return "ooc"
+    return None
+
+def validate_cascade(config):
+    """
+    A "synthetic" exit must never be looser than the verdict threshold, otherwise
+    it would settle (and report) as synthetic an image whose score passes.
+    """
+    synthetic_fft_min = config.get('cascade', {}).get('synthetic_fft_min')
+    ai_prob_max = config['thresholds']['ai_prob_max']
+    if synthetic_fft_min is not None and synthetic_fft_min <= ai_prob_max:
+        raise ValueError(f"cascade.synthetic_fft_min ({synthetic_fft_min}) must be above "
+                         f"thresholds.ai_prob_max ({ai_prob_max})")
+
+def exit_ai_prob(sig_fft):
+    """
+    ai_prob on an early exit that skipped the ViT: the spectral-only fused score
+    (a lower bound on the fused scale, whatever the exit reason).
+    build_verdict counts a "synthetic" exit as AI-generated regardless.
+    """
+    return fuse_signals(sig_fft, 0.0)
+
+def add_long_video_stages(graph, registry, config, image_path, text):
+    """
+    LONG VIDEO LOGIC: the file is split into time segments that are decoded in
+    parallel on the process pool, and the sampled frames are scored in batches
+    as segments arrive. Scores are aggregated into a per-segment timeline with
+    robust statistics and flagged time ranges (see utils.timeline).
+    """
+    ce = registry.consistency
+    fe = registry.forensics
+    settings = config.get('video', {})
+    batch_size = settings.get('batch_size', 32)
+
+    def score():
+        frames, segments, batch = [], [], []
+
+        def flush(chunk):
+            keyframes = [k for _, k in chunk]
+            probs = fe.detect_synthetic_batch([k.frame for k in keyframes])
+            scores = ce.compute_consistency_batch([(k.frame, text) for k in keyframes])
+            for (segment, k), f, c in zip(chunk, probs, scores):
+                frames.append({"segment": segment, "index": k.index, "timestamp_s": k.timestamp_s,
+                               "ai_prob": f, "consistency": None if c is None else round(c, 4)})
+
+        decoded = decode_segments(
+            image_path, registry.decode_pool,
+            segment_s=settings.get('segment_s', 60),
+            every_s=settings.get('sample_every_s', 2.0),
+            max_side=settings.get('max_side', 448)
+        )
+        while True:
+            with span("decode"):  # Time spent waiting on the decode workers
+                segment = next(decoded, None)
+            if segment is None:
+                break
+            start_s, end_s, keyframes = segment
+            segments.append({"start_s": start_s, "end_s": end_s})
+            batch.extend((len(segments) - 1, k) for k in keyframes)
+            # Frames are dropped once scored, so memory stays bounded by the decode window
+            while len(batch) >= batch_size:
+                flush(batch[:batch_size])
+                del batch[:batch_size]
+        if batch:
+            flush(batch)
+        return frames, segments
+
+    def fuse(scored):
+        frames, segments = scored
+        timeline = build_timeline(
+            frames, segments,
+            threshold=config['thresholds']['ai_prob_max'],
+            trim=settings.get('trim', 0.1),
+            min_frames=settings.get('min_flag_frames', 2),
+            max_gap_s=2 * settings.get('sample_every_s', 2.0)
+        )
+        return timeline["consistency"], timeline["ai_prob"], {"timeline": timeline}
+
+    graph.add("decode_score", score)
+    graph.add("fuse", fuse, ["decode_score"])
+
+def add_image_stages(graph, registry, config, image_path, text, use_defense=True):
+    """
+    IMAGE LOGIC: decode once, share the frame across every stage, entirely in memory.
+    Results are content-addressed in the embedding store, so a re-shared image
+    (any filename) skips all vision inference (every model stage becomes a no-op).
+
+    With the decision cascade enabled, a "gate" stage looks at the cheap signals
+    first (spectral score, then CLIP consistency). When they already decide the
+    verdict, the deepfake ViT (and downstream the search and LLM) are skipped; the
+    price is that the ViT no longer overlaps with CLIP + FFT on that path.
+    """
+    re = registry.robustness
+    ce = registry.consistency
+    fe = registry.forensics
+    store = registry.embedding_store
+    variant = f"{'purified' if use_defense else 'raw'}:{config_version(config)}"
+    cascade = config.get('cascade', {})
+    validate_cascade(config)
+
+    def decode():
+        with span("decode"):
+            frame = decode_image(image_path)
+        if frame is None:
+            raise ValueError(f"Could not decode image: {os.path.basename(image_path)}")
+        return frame
+
+    def lookup(frame):
+        # The variant separates purified/raw and config versions
+        if store is None:
+            return None, None
+        key = media_key(frame, variant)
+        return key, store.get(key)
+
+    def spectral_map(frame, hit):
+        # Large uploads get a per-tile anomaly map of the original resolution
+        if hit[1] is None and frame.shape[0] * frame.shape[1] > fe.tiled_min_pixels:
+            return fe.get_tiled_spectrum(frame)
+        return None
+
+    def purify(frame, hit):
+        if hit[1] is not None:
+            return None
+        return re.purify(frame) if use_defense else frame
+
+    def consistency(analysis_frame, hit):
+        if hit[1] is not None:
+            return hit[1][0]
+        try:
+            return ce.encode_image(analysis_frame)
+        except Exception as e:
+            print(f"Consistency Error: {e}")
+            return None
+
+    def gate(embedding, sig_fft, hit):
+        """Returns the early-exit reason ("synthetic" / "ooc") or None to run every sensor."""
+        if hit[1] is not None:
+            sig_fft = hit[1][1].get('fft', 0.0)
+        return cascade_exit(cascade, sig_fft,
+                            lambda: ce.score_embedding(embedding, text) if embedding is not None else None)
+
+    def deepfake(frame, hit, exit_reason=None):
+        if hit[1] is not None or exit_reason is not None:
+            return None
+        return fe.get_deepfake_score(frame)
+
+    def fuse(hit, embedding, sig_fft, sig_dl, spectrum, exit_reason):
+        key, cached = hit
+        cascade_stats = {}
+        if exit_reason is not None:
+            fft = cached[1].get('fft', 0.0) if cached is not None else sig_fft
+            cascade_stats = {"cascade_exit": exit_reason, "fft": round(fft, 4)}
+        if cached is not None:
+            # Every reading (ViT included) is stored, so a hit reports the full fused score
+            scores = cached[1]
+            extras = {k: v for k, v in scores.items() if k not in ('ai_prob', 'fft', 'deepfake')}
+            return ce.score_embedding(embedding, text), scores['ai_prob'], {**extras, **cascade_stats}
+
+        extras = {'spectral_map': spectrum} if spectrum is not None else {}
+        if exit_reason is not None:
+            ai_prob = exit_ai_prob(sig_fft)
+            extras.update(cascade_stats, skipped_stages=["deepfake"])
+            c_score = ce.score_embedding(embedding, text) if embedding is not None else 0.0
+            return c_score, ai_prob, extras  # Incomplete signals: not stored
+
+        signals = {"fft": round(sig_fft, 4), "deepfake": round(sig_dl, 4), "ai_prob": fe.fuse(sig_fft, sig_dl)}
+        if embedding is None:
+            return 0.0, signals['ai_prob'], extras
+
+        if key is not None:
+            # Only the map's summary is stored: the store rewrites its index on every put
+            stored = {'spectral_map': spectrum_summary(spectrum)} if spectrum is not None else {}
+            try:
+                store.put(key, embedding, {**signals, **stored})
+            except Exception as e:
+                print(f"Embedding store error: {e}")
+        return ce.score_embedding(embedding, text), signals['ai_prob'], extras
+
+    graph.add("decode", decode)
+    graph.add("lookup", lookup, ["decode"])
+    graph.add("spectral_map", spectral_map, ["decode", "lookup"])
+    graph.add("purify", purify, ["decode", "lookup"])
+    graph.add("consistency", consistency, ["purify", "lookup"])
+    graph.add("forensics", lambda frame, hit: None if hit[1] is not None else fe.get_frequency_score(frame), ["purify", "lookup"])
+    graph.add("gate", gate, ["consistency", "forensics", "lookup"])
+    if cascade.get('enabled', False):
+        # The ViT waits for the gate so an early exit can skip it
+        graph.add("deepfake", deepfake, ["purify", "lookup", "gate"])
+    else:
+        graph.add("deepfake", deepfake, ["purify", "lookup"])
+    graph.add("fuse", fuse, ["lookup", "consistency", "forensics", "deepfake", "spectral_map", "gate"])
+
+def build_sensor_graph(registry, config, image_path, text, use_defense=True):
+    """
+    Stage graph of everything except the explainer:
+      decode -> purify -> {consistency, forensics} -> gate -> deepfake -> fuse
+      claim  -> search
+    With the cascade enabled, deepfake and search wait for the gate (and are
+    skipped on an early exit); otherwise both overlap with CLIP + FFT.
+    The final "sensors" stage yields (c_score, f_score, extras, short_context).
+    """
+    graph = StageGraph()
+
+    if image_path.lower().endswith(('.mp4', '.mov', '.avi')):
+        long_video_min_s = config.get('video', {}).get('long_video_min_s')
+        if long_video_min_s is not None and probe_video(image_path).duration_s >= long_video_min_s:
+            add_long_video_stages(graph, registry, config, image_path, text)
+        else:
+            add_video_stages(graph, registry, config, image_path, text)
     else:
-        # IMAGE LOGIC
-        analysis_path = re.purify_image(image_path) if use_defense else image_path
-        # FIX 2: Updated method name here
-        c_score = ce.compute_consistency(analysis_path, text)
-        f_score = fe.detect_synthetic(analysis_path)
-        search_context = se.check_context(text)
-
-    # 3. ADVANCED DECISION LOGIC
+        add_image_stages(graph, registry, config, image_path, text, use_defense)
+
+    if "gate" in graph.stages and config.get('cascade', {}).get('enabled', False):
+        # Cascade: the search waits for the cheap signals and is skipped on an early exit
+        graph.add("search", lambda exit_reason: None if exit_reason else registry.search.check_context(text), ["gate"])
+    else:
+        # The web search only needs the claim, so it overlaps with all of the vision work
+        graph.add("search", lambda: registry.search.check_context(text))
+
+    def sensors(fused, search_context):
+        c_score, f_score, extras = fused
+        if search_context is None:
+            extras = {**extras, "skipped_stages": extras.get("skipped_stages", []) + ["search"]}
+            return c_score, f_score, extras, ""
+        # Before sending to explainer, truncate the search results
+        short_context = str(search_context)[:800] # Limit to 800 characters
+        return c_score, f_score, extras, short_context
+
+    graph.add("sensors", sensors, ["fuse", "search"])
+    return graph
+
+def run_sensors(registry, config, image_path, text, use_defense=True):
+    """
+    Runs the vision sensors and the web search concurrently (everything except the explainer).
+    Returns (c_score, f_score, extras, short_context, stage_timings).
+    """
+    run = build_sensor_graph(registry, config, image_path, text, use_defense).run(registry.stage_pool)
+    return (*run["sensors"], run.summary())
+
+def build_verdict(config, c_score, f_score, extras):
+    """ADVANCED DECISION LOGIC: thresholds on the sensor scores. Returns (is_misinfo, technical_stats)."""
+    t = config['thresholds']
     consistency_fail = c_score < t['consistency_min']
-    ai_generated = f_score > t['ai_prob_max']
+    # A "synthetic" cascade exit may have skipped the ViT, so its ai_prob can be a lower bound
+    ai_generated = f_score > t['ai_prob_max'] or extras.get('cascade_exit') == "synthetic"
     is_misinfo = consistency_fail or ai_generated
 
-    # Before sending to explainer, truncate the search results
-    short_context = str(search_context)[:800] # Limit to 800 characters
+    technical_stats = {
+        "consistency": round(c_score, 4),
+        "ai_prob": round(f_score, 4),
+        "verdict_type": "Synthetic" if ai_generated else "OOC" if consistency_fail else "Clear",
+        "skipped_stages": [],
+        **extras
+    }
+    return is_misinfo, technical_stats
 
-    # 4. Generate Verdict
-    explanation = ex.generate_verdict(
-        analysis_path, c_score, f_score, short_context, text 
+def route_explanation(ex, c_score, f_score, technical_stats, force_llm=False):
+    """
+    Picks the explanation source (clear-cut cases and cascade exits get a local report)
+    and records it, plus a skipped LLM call, in technical_stats.
+    """
+    exit_reason = technical_stats.get("cascade_exit")
+    source = ex.route(c_score, f_score, force_llm, decided=exit_reason is not None)
+    technical_stats["explanation_source"] = source
+    if source == "local":
+        technical_stats["skipped_stages"] = technical_stats.get("skipped_stages", []) + ["llm"]
+    return source
+
+def local_explanation(ex, c_score, f_score, short_context, text, technical_stats):
+    exit_reason = technical_stats.get("cascade_exit")
+    return ex.local_report(
+        c_score, f_score, short_context, text,
+        synthetic=True if exit_reason == "synthetic" else None,
+        mismatch=True if exit_reason == "ooc" else None,
+        spectral=technical_stats.get("fft") if exit_reason == "synthetic" else None
     )
 
-    return {
-        "is_misinfo": is_misinfo,
-        "explanation": explanation,
-        "technical_stats": {
-            "consistency": round(c_score, 4),
-            "ai_prob": round(f_score, 4),
-            "verdict_type": "Synthetic" if ai_generated else "OOC" if consistency_fail else "Clear"
+def run_pipeline(registry, config, image_path, text, use_defense=True, force_llm=False, progress=None):
+    """
+    Runs every sensor plus the explainer as one stage graph.
+    Returns (verdict, stage_timings); the verdict carries no caching or timing fields.
+    progress(fraction) is called between stages and may raise to abort the run.
+    """
+    ex = registry.explainer
+
+    def explain(sensors):
+        c_score, f_score, extras, short_context = sensors
+        is_misinfo, technical_stats = build_verdict(config, c_score, f_score, extras)
+
+        # Generate Verdict (clear-cut cases get a local report, ambiguous ones go to the LLM)
+        source = route_explanation(ex, c_score, f_score, technical_stats, force_llm)
+        if source == "local":
+            explanation = local_explanation(ex, c_score, f_score, short_context, text, technical_stats)
+        else:
+            explanation = ex.generate_verdict(
+                image_path, c_score, f_score, short_context, text 
+            )
+        return {
+            "is_misinfo": is_misinfo,
+            "explanation": explanation,
+            "technical_stats": technical_stats
         }
-    }
+
+    graph = build_sensor_graph(registry, config, image_path, text, use_defense)
+    graph.add("explain", explain, ["sensors"])
+    run = graph.run(registry.stage_pool, progress)
+    return run["explain"], run.summary()
+
+def lookup_result(registry, config, image_path, text, use_defense, media_hash, force_llm=False):
+    """
+    Whole-result cache lookup (dropped automatically when config.json changes).
+    Returns (cache_key, cached, media_hash); cache_key is None when caching is disabled.
+    With force_llm, a cached local report counts as a miss.
+    """
+    cache = registry.result_cache
+    if cache is None:
+        return None, None, media_hash
+    version = config_version(config)
+    cache.ensure_version(version)
+    media_hash = media_hash or file_sha256(image_path)
+    cache_key = cache.make_key(media_hash, text, use_defense, version)
+    cached = cache.get(cache_key)
+    if cached is not None and force_llm and cached[0]["technical_stats"].get("explanation_source") == "local":
+        cached = None
+    return cache_key, cached, media_hash
+
+def store_result(registry, cache_key, result):
+    # Don't pin a degraded (LLM offline) explanation for the whole TTL
+    if cache_key is not None and not is_degraded(result['explanation']):
+        registry.result_cache.put(cache_key, result)
+
+def add_timings(result, registry, start_time, load_before, cached, media_hash):
+    """Separates one-off model loading from the steady-state analysis cost."""
+    total_time = time.perf_counter() - start_time
+    model_load_time = min(registry.total_load_time() - load_before, total_time)
+
+    result.update({
+        "cache_hit": cached is not None,
+        "cache_age_s": round(cached[1], 1) if cached is not None else 0.0,
+        "media_hash": media_hash,
+        "timings": {
+            "model_load_s": round(model_load_time, 4),
+            "analysis_s": round(total_time - model_load_time, 4)
+        }
+    })
+    return result
+
+def add_spans(result, config, trace, include_spans=None, mode="sync"):
+    """
+    Records the request latency histogram and, when enabled (argument or
+    telemetry.include_spans), copies the request's timing spans into technical_stats.
+    """
+    total = time.perf_counter() - trace.origin
+    METRICS.observe("shieldai_analysis_seconds", total, "End-to-end analysis latency in seconds",
+                    cache_hit=str(result["cache_hit"]).lower(), mode=mode)
+    if include_spans is None:
+        include_spans = config.get('telemetry', {}).get('include_spans', False)
+    if include_spans:
+        # A fresh dict: the cached result must not carry this request's spans
+        result["technical_stats"] = {**result["technical_stats"], "spans": list(trace.spans)}
+    return result
+
+def analyze_post(image_path, text, use_defense=True, media_hash=None, force_llm=False, include_spans=None,
+                 progress=None):
+    """
+    Full analysis of one post, served from the result cache when the same
+    (media, claim, config version) was analysed before.
+    media_hash: SHA-256 of the uploaded file when the caller already has it
+    (the upload store computes it while streaming); computed here otherwise.
+    force_llm: always have the LLM write the report, even for clear-cut scores.
+    include_spans: add per-stage timing spans to technical_stats (default: config telemetry.include_spans).
+    progress: progress(fraction) callback run between pipeline stages (background jobs);
+    an exception it raises, e.g. JobCancelled, stops the analysis and propagates.
+    """
+    with tracing() as trace:
+        # 1. Load Settings and Fetch Shared Engines (loaded once per process)
+        start_time = time.perf_counter()
+        registry = get_registry()
+        load_before = registry.total_load_time()
+        config = registry.get_config()
+
+        # 2. Whole-result cache
+        cache_key, cached, media_hash = lookup_result(registry, config, image_path, text, use_defense, media_hash, force_llm)
+        stages = None
+        if cached is not None:
+            result = copy.deepcopy(cached[0])
+        else:
+            result, stages = run_pipeline(registry, config, image_path, text, use_defense, force_llm, progress)
+            store_result(registry, cache_key, result)
+
+    # 3. Timings (per-stage timings and the critical path when the pipeline ran)
+    result = add_timings(result, registry, start_time, load_before, cached, media_hash)
+    if stages is not None:
+        result["timings"]["pipeline"] = stages
+    return add_spans(result, config, trace, include_spans)
+
+def analyze_post_stream(image_path, text, use_defense=True, media_hash=None, force_llm=False, include_spans=None):
+    """
+    Streaming variant of analyze_post. Yields events as soon as they are ready:
+      {"event": "scores", "is_misinfo", "technical_stats", "ttfb_s"}  once the sensors finish
+      {"event": "token", "text"}                                       explanation chunks from the LLM
+      {"event": "done", "result"}                                      the full analyze_post result
+    Timings gain ttfb_s (time to the scores event) and first_token_s. Spans, when
+    included, are only on the final result.
+    """
+    with tracing() as trace:
+        yield from _stream_events(image_path, text, use_defense, media_hash, force_llm, include_spans, trace)
+
+def _stream_events(image_path, text, use_defense, media_hash, force_llm, include_spans, trace):
+    start_time = time.perf_counter()
+    registry = get_registry()
+    load_before = registry.total_load_time()
+    config = registry.get_config()
+
+    cache_key, cached, media_hash = lookup_result(registry, config, image_path, text, use_defense, media_hash, force_llm)
+    if cached is not None:
+        result = copy.deepcopy(cached[0])
+        ttfb = time.perf_counter() - start_time
+        yield {"event": "scores", "is_misinfo": result["is_misinfo"],
+               "technical_stats": result["technical_stats"], "ttfb_s": round(ttfb, 4)}
+        first_token = time.perf_counter() - start_time
+        yield {"event": "token", "text": result["explanation"]}
+    else:
+        c_score, f_score, extras, short_context, stages = run_sensors(registry, config, image_path, text, use_defense)
+        is_misinfo, technical_stats = build_verdict(config, c_score, f_score, extras)
+        ex = registry.explainer
+        source = route_explanation(ex, c_score, f_score, technical_stats, force_llm)
+        ttfb = time.perf_counter() - start_time
+        yield {"event": "scores", "is_misinfo": is_misinfo,
+               "technical_stats": technical_stats, "ttfb_s": round(ttfb, 4)}
+
+        if source == "local":
+            tokens = [local_explanation(ex, c_score, f_score, short_context, text, technical_stats)]
+        else:
+            tokens = ex.stream_verdict(image_path, c_score, f_score, short_context, text)
+        chunks, first_token = [], None
+        for chunk in tokens:
+            if first_token is None:
+                first_token = time.perf_counter() - start_time
+            chunks.append(chunk)
+            yield {"event": "token", "text": chunk}
+
+        result = {"is_misinfo": is_misinfo, "explanation": "".join(chunks), "technical_stats": technical_stats}
+        store_result(registry, cache_key, result)
+        explain_s = time.perf_counter() - start_time - ttfb
+        stages["stages"]["explain"] = {"start_s": round(ttfb, 4), "duration_s": round(explain_s, 4)}
+        stages["critical_path"].append("explain")
+        stages["critical_path_s"] = round(stages["critical_path_s"] + explain_s, 4)
+        stages["sum_of_stages_s"] = round(stages["sum_of_stages_s"] + explain_s, 4)
+
+    result = add_timings(result, registry, start_time, load_before, cached, media_hash)
+    if cached is None:
+        result["timings"]["pipeline"] = stages
+    result["timings"]["ttfb_s"] = round(ttfb, 4)
+    result["timings"]["first_token_s"] = round(first_token or ttfb, 4)
+    yield {"event": "done", "result": add_spans(result, config, trace, include_spans, mode="stream")}
+
 def general_decision_logic(f_score, c_score, search_data, claim):
     # Thresholds (Tuned for 2026 Generalization)
     AI_THRESH = 0.50
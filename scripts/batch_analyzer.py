@@ -1,6 +1,7 @@
 import os
 import pandas as pd
 from main import analyze_post
+from engines.registry import get_registry
 import time
 
 def run_batch_test(folder_path):
@@ -8,6 +9,10 @@ def run_batch_test(folder_path):
     files = [f for f in os.listdir(folder_path) if f.endswith(('.jpg', '.jpeg', '.png'))]
     
     print(f"🔬 Starting Batch Forensic Analysis on {len(files)} samples...")
+
+    # Load models up front so per-image times reflect steady-state latency only
+    load_times = get_registry().warmup()
+    print(f"⏳ Model load time: {sum(load_times.values()):.2f}s {load_times}")
     print("-" * 50)
     
     for filename in files:
@@ -1,12 +1,22 @@
-import os
+import argparse
+import hashlib
 import json
-import pandas as pd
-import numpy as np
-import cv2
+import multiprocessing
+import os
 import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import numpy as np
 # Ensure we can import from parent directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from main import analyze_post
+from main import build_verdict, cascade_exit, exit_ai_prob, local_explanation, validate_cascade
+from engines.forensics import fuse_signals
+from engines.registry import get_registry
+from utils.cache import SQLiteCache, normalize_text
+from utils.explainer import is_degraded
+from utils.media import decode_image
+from utils.uploads import file_sha256
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
 # Configuration
@@ -18,123 +28,308 @@ DATA_DIRS = {
 
 METRICS_FILE = "evaluation_metrics.json"
 
-def add_noise(image_path):
-    """Adds random noise to an image for robustness testing."""
-    img = cv2.imread(image_path)
-    if img is None: return None
-    row, col, ch = img.shape
-    mean = 0
-    var = 0.1
-    sigma = var**0.5
-    gauss = np.random.normal(mean, sigma, (row, col, ch))
-    gauss = gauss.reshape(row, col, ch)
-    noisy = img + gauss * 50 # Amplify noise for visibility
-    noisy_path = image_path.replace(".jpg", "_noisy.jpg")
-    cv2.imwrite(noisy_path, noisy)
-    return noisy_path
+# Cached sensor outputs live for a month: they only change with the models or sensor settings
+FEATURE_TTL_S = 30 * 86400
 
-def evaluate_explanation_quality(explanation):
-    """Heuristic check for explanation quality."""
-    score = 0
-    if len(explanation) > 50: score += 0.4
-    if "RISK" in explanation or "SAFE" in explanation or "Likely" in explanation: score += 0.3
-    if "consistency" in explanation.lower() or "ai" in explanation.lower() or "context" in explanation.lower(): score += 0.3
-    return min(score, 1.0)
-
-def run_evaluation():
-    y_true = []
-    y_pred = []
-    ex_qualities = []
-    robustness_passed = 0
-    total_robustness_tests = 0
-    
-    results = []
+Sample = namedtuple("Sample", ["path", "label_type", "claim", "is_misinfo", "sha256"])
 
-    print("🚀 Starting Quantitative Evaluation...")
-
-    # 1. Iterate through datasets
-    for label_type, folder in DATA_DIRS.items():
+def collect_samples(data_dirs=DATA_DIRS, limit=None):
+    """Every image (with its .txt claim when present) in the dataset folders; `limit` caps each class."""
+    samples = []
+    for label_type, folder in data_dirs.items():
         if not os.path.exists(folder):
             print(f"⚠️ Skipping missing folder: {folder}")
             continue
-            
-        files = [f for f in os.listdir(folder) if f.endswith(('.jpg', '.png'))]
-        # Limit to 5 samples per category for speed during hackathon demo
-        files = files[:5] 
-        
-        for filename in files:
+
+        files = sorted(f for f in os.listdir(folder) if f.endswith(('.jpg', '.png')))
+        for filename in files[:limit]:
             img_path = os.path.join(folder, filename)
-            
+
             # Construct Claim
-            txt_path = img_path.replace('.jpg', '.txt').replace('.png', '.txt')
+            txt_path = img_path.rsplit('.', 1)[0] + ".txt"
             if os.path.exists(txt_path):
                 with open(txt_path, 'r') as f:
                     claim = f.read().strip()
             else:
                 claim = f"A photo of {filename}" # Fallback
-            
+
             # Ground Truth
-            is_misinfo_gt = True if label_type in ["MISMATCHED", "AI_GEN"] else False
-            y_true.append(int(is_misinfo_gt))
-
-            # --- NORMAL RUN ---
-            report = analyze_post(img_path, claim)
-            is_misinfo_pred = report['is_misinfo']
-            y_pred.append(int(is_misinfo_pred))
-            
-            # Explanation Quality
-            ex_qualities.append(evaluate_explanation_quality(report['explanation']))
-
-            # --- ROBUSTNESS RUN (Randomly 50% change) ---
-            if np.random.rand() > 0.5:
-                total_robustness_tests += 1
-                noisy_path = add_noise(img_path)
-                if noisy_path:
-                    report_noisy = analyze_post(noisy_path, claim)
-                    # Robustness = Prediction shouldn't flip just because of noise
-                    if report_noisy['is_misinfo'] == is_misinfo_pred:
-                        robustness_passed += 1
-                    try:
-                        os.remove(noisy_path)
-                    except: pass
-
-            results.append({
-                "File": filename,
-                "Type": label_type,
-                "GroundTruth": "Misinfo" if is_misinfo_gt else "Real",
-                "Prediction": "Misinfo" if is_misinfo_pred else "Real",
-                "Correct": is_misinfo_gt == is_misinfo_pred
-            })
-            print(f"Verified {filename} ({label_type}) -> {'✅' if is_misinfo_gt == is_misinfo_pred else '❌'}")
-
-    # 2. Calculate Metrics
-    if not y_true:
+            is_misinfo_gt = label_type in ["MISMATCHED", "AI_GEN"]
+            samples.append(Sample(img_path, label_type, claim, is_misinfo_gt, file_sha256(img_path)))
+    return samples
+
+def add_noise(frame, seed):
+    """Adds random noise to a decoded frame for robustness testing (in memory, reproducible per seed)."""
+    rng = np.random.default_rng(seed)
+    gauss = rng.normal(0, 0.1 ** 0.5, frame.shape)
+    return np.clip(frame + gauss * 50, 0, 255).astype(np.uint8) # Amplify noise for visibility
+
+def sample_seed(sample, seed):
+    return int(hashlib.sha256(f"{seed}:{sample.sha256}".encode()).hexdigest()[:8], 16)
+
+def in_robustness_set(sample, fraction, seed):
+    """Deterministic stand-in for the old coin flip: the same samples are noised on every run."""
+    return sample_seed(sample, seed) / 0xFFFFFFFF < fraction
+
+def feature_version(config, use_defense):
+    """
+    Fingerprint of everything that changes the raw sensor outputs. Thresholds,
+    the cascade and the explainer are applied afterwards, so they are excluded:
+    changing them re-scores the cached features without re-running any model.
+    """
+    relevant = {
+        "clip": config.get("model_settings", {}).get("clip_model"),
+        "deepfake": config.get("deepfake", {}).get("model"),
+        "deepfake_enabled": config.get("deepfake", {}).get("enabled", True),
+        "forensics": config.get("forensics"),
+        "use_defense": use_defense
+    }
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def feature_key(sample, variant, version):
+    return f"features:{version}:{sample.sha256}:{variant}:{normalize_text(sample.claim)}"
+
+def _init_worker(threads):
+    # Split the cores between workers instead of every process using all of them
+    import torch
+    torch.set_num_threads(threads)
+
+def extract_features(jobs, use_defense=True):
+    """
+    Raw sensor outputs for a chunk of (path, claim, noise_seed) jobs, noise_seed
+    None meaning the clean image. Runs in a worker process (or inline): every
+    model call is batched over the chunk. Returns one dict per job
+    ({"consistency", "fft", "deepfake"}) or None when the image cannot be decoded
+    or CLIP cannot score it.
+    """
+    registry = get_registry()
+    ce, fe, re = registry.consistency, registry.forensics, registry.robustness
+
+    frames, valid = [], []
+    for i, (path, claim, noise_seed) in enumerate(jobs):
+        frame = decode_image(path)
+        if frame is None:
+            continue
+        if noise_seed is not None:
+            frame = add_noise(frame, noise_seed)
+        frames.append(re.purify(frame) if use_defense else frame)
+        valid.append(i)
+
+    results = [None] * len(jobs)
+    if not frames:
+        return results
+    consistency = ce.compute_consistency_batch([(frame, jobs[i][1]) for frame, i in zip(frames, valid)])
+    fft = fe.get_frequency_scores(frames)  # One vectorized FFT over the chunk
+    if fe.deepfake is None:
+        deepfake = [0.0] * len(frames)
+    else:
+        deepfake = [fe._dl_score(r) for r in fe.deepfake.detect_deepfake_batch(frames)]
+    for i, c, f, d in zip(valid, consistency, fft, deepfake):
+        if c is None:
+            continue
+        results[i] = {"consistency": round(c, 4), "fft": round(f, 4), "deepfake": round(d, 4)}
+    return results
+
+def compute_features(samples, config, cache, settings, refresh=False, progress_callback=None):
+    """
+    Returns {(sample index, "clean" | "noisy"): features}, serving cached
+    features and extracting the rest in a process pool (one model copy per
+    worker; workers <= 1 runs inline on the already loaded engines).
+    """
+    use_defense = settings.get("use_defense", True)
+    version = feature_version(config, use_defense)
+    fraction, seed = settings.get("robustness_fraction", 0.5), settings.get("seed", 0)
+
+    features, todo = {}, []
+    for i, sample in enumerate(samples):
+        variants = [("clean", None)]
+        if in_robustness_set(sample, fraction, seed):
+            variants.append(("noisy", sample_seed(sample, seed)))
+        for variant, noise_seed in variants:
+            hit = None if (cache is None or refresh) else cache.get(feature_key(sample, variant, version))
+            if hit is not None:
+                features[(i, variant)] = hit[0]
+            else:
+                todo.append(((i, variant), (sample.path, sample.claim, noise_seed)))
+    stats = {"cached": len(features), "extracted": len(todo)}
+    print(f"🧮 Features: {stats['cached']} cached, {stats['extracted']} to extract")
+
+    chunk_size = settings.get("chunk_size", 16)
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    workers = min(settings.get("workers") or os.cpu_count() or 1, len(chunks))
+
+    def store(chunk, results):
+        for (key, job), result in zip(chunk, results):
+            if result is None:
+                print(f"⚠️ Could not score {job[0]}")
+                continue
+            features[key] = result
+            if cache is not None:
+                cache.put(feature_key(samples[key[0]], key[1], version), result, ttl_s=FEATURE_TTL_S, tag=version)
+
+    done = 0
+    if workers <= 1:
+        for chunk in chunks:
+            store(chunk, extract_features([job for _, job in chunk], use_defense))
+            done += 1
+            if progress_callback:
+                progress_callback(done / len(chunks))
+    elif chunks:
+        # "spawn": each worker starts clean and loads its own copy of the models
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(max(1, (os.cpu_count() or 1) // workers),))
+        try:
+            futures = {pool.submit(extract_features, [job for _, job in chunk], use_defense): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                store(futures[future], future.result())
+                done += 1
+                if progress_callback:
+                    progress_callback(done / len(chunks))
+        finally:
+            # An aborted run (progress_callback raised) drops the chunks not yet started
+            pool.shutdown(wait=True, cancel_futures=True)
+    return features, stats
+
+def predict(config, features):
+    """Replays the decision logic of analyze_post on cached sensor outputs. Returns (is_misinfo, technical_stats)."""
+    c_score, sig_fft = features["consistency"], features["fft"]
+    exit_reason = cascade_exit(config.get('cascade', {}), sig_fft, c_score)
+    if exit_reason is not None:
+        f_score = exit_ai_prob(sig_fft)
+        # As in analyze_post on a cold image: the ViT and the search were skipped
+        extras = {"cascade_exit": exit_reason, "fft": round(sig_fft, 4), "skipped_stages": ["deepfake", "search"]}
+    else:
+        f_score, extras = fuse_signals(sig_fft, features["deepfake"]), {}
+    return build_verdict(config, c_score, f_score, extras)
+
+def evaluate_explanation_quality(explanation):
+    """Heuristic check for explanation quality."""
+    score = 0
+    if len(explanation) > 50: score += 0.4
+    if "RISK" in explanation or "SAFE" in explanation or "Likely" in explanation: score += 0.3
+    if "consistency" in explanation.lower() or "ai" in explanation.lower() or "context" in explanation.lower(): score += 0.3
+    return min(score, 1.0)
+
+def explain_samples(samples, verdicts, cache, use_llm, llm_workers=4):
+    """
+    Explanation per sample. Without the LLM, the local templated report (no
+    network); with it, the same search + LLM path as analyze_post, cached by
+    (media, claim, scores, reasoner model) so re-scoring costs no API calls.
+    """
+    registry = get_registry()
+    ex = registry.explainer
+    reasoner = registry.get_config().get('model_settings', {}).get('reasoner_model')
+
+    def explain(i):
+        sample, (_, stats) = samples[i], verdicts[i]
+        c_score, f_score = stats["consistency"], stats["ai_prob"]
+        if not use_llm:
+            return local_explanation(ex, c_score, f_score, "", sample.claim, stats)
+
+        key = f"explanation:{reasoner}:{sample.sha256}:{normalize_text(sample.claim)}:{c_score}:{f_score}"
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None:
+            return hit[0]
+        short_context = str(registry.search.check_context(sample.claim))[:800]
+        text = ex.generate_verdict(sample.path, c_score, f_score, short_context, sample.claim)
+        if cache is not None and not is_degraded(text):
+            cache.put(key, text, ttl_s=FEATURE_TTL_S)
+        return text
+
+    indices = sorted(verdicts)
+    if not use_llm:
+        return {i: explain(i) for i in indices}
+    # LLM calls are I/O bound; the shared client enforces the rate limit
+    with ThreadPoolExecutor(max_workers=llm_workers) as pool:
+        return dict(zip(indices, pool.map(explain, indices)))
+
+def run_evaluation(progress_callback=None, limit=None, workers=None, use_llm=None, refresh=False,
+                   data_dirs=None, metrics_file=METRICS_FILE):
+    """
+    Evaluates the full dataset from cached per-sample sensor outputs.
+    progress_callback(fraction) is called as feature chunks finish (used by the
+    job API; it may raise to abort the run). Only samples without cached
+    features touch the models; thresholds, cascade settings and explanation
+    scoring are re-applied to the cached features on every run.
+    """
+    start = time.perf_counter()
+    config = get_registry().get_config()
+    validate_cascade(config)
+    settings = dict(config.get("evaluation", {}))
+    if workers is not None:
+        settings["workers"] = workers
+    use_llm = settings.get("use_llm", False) if use_llm is None else use_llm
+    cache_path = settings.get("feature_cache", "cache/eval_features.sqlite")
+    cache = SQLiteCache(cache_path, default_ttl_s=FEATURE_TTL_S) if cache_path else None
+
+    print("🚀 Starting Quantitative Evaluation...")
+
+    # 1. Collect the dataset (no per-class cap unless asked for)
+    samples = collect_samples(data_dirs or DATA_DIRS, limit=limit)
+    if not samples:
         return {"error": "No data found"}
 
-    acc = accuracy_score(y_true, y_pred)
-    prec = precision_score(y_true, y_pred, zero_division=0)
-    rec = recall_score(y_true, y_pred, zero_division=0)
-    f1 = f1_score(y_true, y_pred, zero_division=0)
-    
-    robustness_score = robustness_passed / total_robustness_tests if total_robustness_tests > 0 else 0
-    avg_ex_quality = np.mean(ex_qualities) if ex_qualities else 0
+    # 2. Sensor outputs: cached, or extracted in parallel
+    features, feature_stats = compute_features(samples, config, cache, settings, refresh, progress_callback)
+    features_s = time.perf_counter() - start
+
+    # 3. Decisions from features (cheap: no model calls)
+    verdicts = {i: predict(config, features[(i, "clean")]) for i in range(len(samples)) if (i, "clean") in features}
+    y_true = [int(samples[i].is_misinfo) for i in verdicts]
+    y_pred = [int(is_misinfo) for is_misinfo, _ in verdicts.values()]
+
+    # Robustness = Prediction shouldn't flip just because of noise
+    robustness_checks = [
+        predict(config, features[(i, "noisy")])[0] == verdicts[i][0]
+        for i in verdicts if (i, "noisy") in features
+    ]
 
+    # 4. Explanation quality (LLM optional)
+    explain_start = time.perf_counter()
+    explanations = explain_samples(samples, verdicts, cache, use_llm, settings.get("llm_workers", 4))
+    ex_qualities = [evaluate_explanation_quality(text) for text in explanations.values()]
+    explanations_s = time.perf_counter() - explain_start
+
+    for i, (is_misinfo_pred, _) in verdicts.items():
+        sample = samples[i]
+        print(f"Verified {os.path.basename(sample.path)} ({sample.label_type}) -> "
+              f"{'✅' if sample.is_misinfo == is_misinfo_pred else '❌'}")
+
+    # 5. Calculate Metrics
     metrics = {
-        "accuracy": round(acc, 4),
-        "precision": round(prec, 4),
-        "recall": round(rec, 4),
-        "f1_score": round(f1, 4),
-        "robustness": round(robustness_score, 4),
-        "explanation_quality": round(avg_ex_quality, 4)
+        "accuracy": round(accuracy_score(y_true, y_pred), 4),
+        "precision": round(precision_score(y_true, y_pred, zero_division=0), 4),
+        "recall": round(recall_score(y_true, y_pred, zero_division=0), 4),
+        "f1_score": round(f1_score(y_true, y_pred, zero_division=0), 4),
+        "robustness": round(float(np.mean(robustness_checks)), 4) if robustness_checks else 0,
+        "explanation_quality": round(float(np.mean(ex_qualities)), 4) if ex_qualities else 0,
+        "samples": len(verdicts),
+        "robustness_tests": len(robustness_checks),
+        "explanation_source": "llm" if use_llm else "local",
+        "features": feature_stats,
+        "timings": {
+            "features_s": round(features_s, 2),
+            "explanations_s": round(explanations_s, 2),
+            "total_s": round(time.perf_counter() - start, 2)
+        }
     }
 
     # Save to file
-    with open(METRICS_FILE, 'w') as f:
-        json.dump(metrics, f, indent=4)
-        
+    if metrics_file:
+        with open(metrics_file, 'w') as f:
+            json.dump(metrics, f, indent=4)
+
+    if progress_callback:
+        progress_callback(1.0)
     print("\n📊 Evaluation Complete!")
     print(json.dumps(metrics, indent=2))
     return metrics
 
 if __name__ == "__main__":
-    run_evaluation()
+    parser = argparse.ArgumentParser(description="Dataset evaluation from cached sensor outputs")
+    parser.add_argument("--workers", type=int, help="Feature-extraction processes (default: config, else all cores)")
+    parser.add_argument("--limit", type=int, help="Cap samples per class")
+    parser.add_argument("--llm", action="store_true", help="Score LLM explanations (search + Groq) instead of local reports")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached features and re-run the models")
+    args = parser.parse_args()
+    run_evaluation(limit=args.limit, workers=args.workers, use_llm=args.llm or None, refresh=args.refresh)
@@ -0,0 +1,59 @@
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for google.serper.dev, for offline tests and load tests:
+#   python scripts/fake_serper.py --latency-ms 300 --fail-rate 0.1
+#   SERPER_ENDPOINT=http://127.0.0.1:8765/search python api.py
+
+def make_handler(latency_ms, jitter_ms, fail_rate):
+    class FakeSerperHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length) or b"{}").get("q", "")
+
+            time.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000.0)
+            if random.random() < fail_rate:
+                self.send_error(503, "Simulated upstream failure")
+                return
+
+            body = json.dumps({
+                "searchParameters": {"q": query},
+                "organic": [
+                    {"title": f"Result {i + 1}", "snippet": f"Snippet {i + 1} about {query}."}
+                    for i in range(3)
+                ]
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep load tests quiet
+
+    return FakeSerperHandler
+
+def serve(host="127.0.0.1", port=8765, latency_ms=200, jitter_ms=50, fail_rate=0.0):
+    server = ThreadingHTTPServer((host, port), make_handler(latency_ms, jitter_ms, fail_rate))
+    print(f"🧪 Fake Serper on http://{host}:{server.server_port}/search "
+          f"(latency {latency_ms}±{jitter_ms} ms, fail rate {fail_rate})")
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Serper search API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency_ms, args.jitter_ms, args.fail_rate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,72 @@
+# Stand-in engines for pipeline tests that must run without the model libraries
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from engines.forensics import fuse_signals
+
+class StubRobustness:
+    def purify(self, frame):
+        return frame
+
+class StubConsistency:
+    """CLIP stand-in: the claim "unrelated" scores as out of context."""
+    def encode_image(self, frame):
+        return np.ones(4, dtype=np.float32)
+
+    def score_embedding(self, embedding, text):
+        return 0.05 if text == "unrelated" else 0.8
+
+class StubForensics:
+    tiled_min_pixels = 4_000_000
+
+    def __init__(self, fft=0.7, deepfake=0.99):
+        self.fft, self.deepfake = fft, deepfake
+        self.vit_calls = 0
+
+    def get_frequency_score(self, frame):
+        return self.fft
+
+    def get_deepfake_score(self, frame):
+        self.vit_calls += 1
+        return self.deepfake
+
+    def get_tiled_spectrum(self, frame):
+        return {"score": self.fft, "grid": [2, 2], "tile_scores": [[self.fft] * 2] * 2,
+                "anomaly_map": [[0.0] * 2] * 2, "flagged_tiles": []}
+
+    def fuse(self, sig_fft, sig_dl):
+        return fuse_signals(sig_fft, sig_dl)
+
+class StubSearch:
+    def __init__(self):
+        self.calls = 0
+
+    def check_context(self, text):
+        self.calls += 1
+        return {"raw_text": f"context for {text}"}
+
+class StubRegistry:
+    """Duck-typed EngineRegistry: stub sensors, real explainer / caches when given."""
+    def __init__(self, store=None, config=None, explainer=None, result_cache=None):
+        self.robustness = StubRobustness()
+        self.consistency = StubConsistency()
+        self.forensics = StubForensics()
+        self.search = StubSearch()
+        self.embedding_store = store
+        self.config = config
+        self.explainer = explainer
+        self.result_cache = result_cache
+        self.stage_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stage")
+
+    def get_config(self):
+        return self.config
+
+    def total_load_time(self):
+        return 0.0
+
+def image(tmp_path, name="post.jpg"):
+    """Writes a small random test image and returns its path."""
+    path = str(tmp_path / name)
+    cv2.imwrite(path, np.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype=np.uint8))
+    return path
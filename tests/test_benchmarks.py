@@ -0,0 +1,38 @@
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import compare, run_case
+from benchmarks.synth import synth_image, synth_video
+from utils.video_processor import probe_video
+
+def test_run_case_single_and_batched():
+    calls = []
+    single = run_case(lambda x: (calls.append(x), time.sleep(0.002)), list(range(6)))
+    assert single["calls"] == 5 and single["items"] == 5  # First call is warm-up
+    assert single["p50_ms"] >= 2.0 and single["p50_ms"] <= single["p95_ms"] <= single["p99_ms"]
+    assert single["peak_rss_mb"] > 0 and len(calls) == 6
+
+    batched = run_case(lambda batch: time.sleep(0.002), list(range(10)), batch_size=4, concurrency=2)
+    assert batched["calls"] == 2 and batched["items"] == 6  # Batches [4:8] and [8:10]
+    assert batched["throughput_per_s"] > single["throughput_per_s"]
+
+def test_compare_flags_regressions_only_beyond_tolerance():
+    baseline = {"cases": {
+        "fft": {"p50_ms": 10.0, "p95_ms": 12.0, "throughput_per_s": 100.0, "peak_rss_mb": 300.0},
+        "purify": {"p50_ms": 0.2, "p95_ms": 0.3, "throughput_per_s": 5000.0, "peak_rss_mb": 300.0}
+    }}
+    current = {"cases": {
+        "fft": {"p50_ms": 11.0, "p95_ms": 20.0, "throughput_per_s": 70.0, "peak_rss_mb": 310.0},
+        "purify": {"p50_ms": 0.6, "p95_ms": 0.9, "throughput_per_s": 4900.0, "peak_rss_mb": 300.0},
+        "new_case": {"p50_ms": 1.0}
+    }}
+    regressions = compare(current, baseline)
+    assert {(r["case"], r["metric"]) for r in regressions} == {("fft", "p95_ms"), ("fft", "throughput_per_s")}
+    assert compare(current, baseline, {"p95_ms": 1.0, "throughput_per_s": 0.5}) == []
+
+def test_synthetic_media(tmp_path):
+    assert synth_image(120, 160).shape == (120, 160, 3)
+    path = synth_video(str(tmp_path / "clip.avi"), seconds=2, fps=10)
+    assert probe_video(path).frame_count == 20
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import LRUCache
+from utils.result_cache import ResultCache
+
+def test_lru_eviction_order():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")      # 'a' is now most recently used
+    cache.put("c", 3)   # evicts 'b'
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_lru_counters():
+    cache = LRUCache(max_size=4)
+    cache.put("claim", "features")
+    cache.get("claim")
+    cache.get("other")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_result_cache_keeps_its_own_copy(tmp_path):
+    cache = ResultCache(path=str(tmp_path / "results.sqlite"))
+    cache.ensure_version("v1")
+    result = {"is_misinfo": True, "technical_stats": {"ai_prob": 0.9}}
+    cache.put("key", result)
+    # The caller decorates its result after storing it (add_timings, media_url)
+    result["timings"] = {"analysis_s": 1.0}
+    result["technical_stats"]["spans"] = []
+
+    cached, _ = cache.get("key")
+    assert cached == {"is_misinfo": True, "technical_stats": {"ai_prob": 0.9}}
+
+if __name__ == "__main__":
+    test_lru_eviction_order()
+    test_lru_counters()
+    print("🚀 LRU Cache is WORKING CORRECTLY!")
@@ -0,0 +1,80 @@
+import sys
+import os
+import copy
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.forensics import fuse_signals
+from main import build_sensor_graph, build_verdict
+from utils.embedding_store import EmbeddingStore
+from stubs import StubRegistry, image
+
+CONFIG = {
+    "thresholds": {"consistency_min": 0.30, "ai_prob_max": 0.50},
+    "cascade": {"enabled": True, "ooc_consistency_max": 0.10, "synthetic_fft_min": None}
+}
+
+def run(registry, path, text, config=CONFIG):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        c_score, f_score, extras, context = build_sensor_graph(registry, config, path, text).run(pool)["sensors"]
+    return c_score, f_score, extras, context
+
+def test_ooc_exit_skips_the_vit_and_search(tmp_path):
+    registry = StubRegistry()
+    c_score, f_score, extras, context = run(registry, image(tmp_path), "unrelated")
+
+    assert registry.forensics.vit_calls == 0 and registry.search.calls == 0
+    assert extras["cascade_exit"] == "ooc" and extras["skipped_stages"] == ["deepfake", "search"]
+    assert f_score == fuse_signals(0.7, 0.0) and context == ""
+    is_misinfo, stats = build_verdict(CONFIG, c_score, f_score, extras)
+    assert is_misinfo and stats["verdict_type"] == "OOC" and stats["skipped_stages"] == ["deepfake", "search"]
+
+def test_no_exit_runs_every_sensor(tmp_path):
+    registry = StubRegistry()
+    c_score, f_score, extras, context = run(registry, image(tmp_path), "a city street")
+
+    assert registry.forensics.vit_calls == 1 and registry.search.calls == 1
+    assert "cascade_exit" not in extras and "skipped_stages" not in extras
+    assert f_score == fuse_signals(0.7, 0.99) and "context for" in context
+
+def test_cache_hit_replays_the_cascade_with_the_stored_vit_reading(tmp_path):
+    store = EmbeddingStore(path=str(tmp_path / "embeddings"), dim=4, capacity=16)
+    registry = StubRegistry(store)
+    path = image(tmp_path)
+    run(registry, path, "a city street")  # Cold: every reading goes into the store
+    assert len(store) == 1
+
+    c_score, f_score, extras, _ = run(registry, path, "unrelated")
+    assert registry.forensics.vit_calls == 1  # Not re-run on the hit
+    assert extras["cascade_exit"] == "ooc" and extras["skipped_stages"] == ["search"]
+    # The stored ViT reading is kept, so the image still reads as synthetic
+    assert f_score == fuse_signals(0.7, 0.99)
+    assert build_verdict(CONFIG, c_score, f_score, extras)[1]["verdict_type"] == "Synthetic"
+
+def test_exits_are_not_stored_as_complete_readings(tmp_path):
+    store = EmbeddingStore(path=str(tmp_path / "embeddings"), dim=4, capacity=16)
+    run(StubRegistry(store), image(tmp_path), "unrelated")
+    assert len(store) == 0
+
+def test_disabled_cascade_overlaps_the_vit_and_search(tmp_path):
+    config = copy.deepcopy(CONFIG)
+    config["cascade"]["enabled"] = False
+    registry = StubRegistry()
+    graph = build_sensor_graph(registry, config, image(tmp_path), "unrelated")
+    assert "gate" not in graph.stages["deepfake"].deps and graph.stages["search"].deps == ()
+
+    _, f_score, extras, _ = run(registry, image(tmp_path), "unrelated", config)
+    assert registry.forensics.vit_calls == 1 and "cascade_exit" not in extras
+    assert f_score == fuse_signals(0.7, 0.99)
+
+def test_store_keeps_only_the_spectral_map_summary(tmp_path):
+    store = EmbeddingStore(path=str(tmp_path / "embeddings"), dim=4, capacity=16)
+    registry = StubRegistry(store)
+    registry.forensics.tiled_min_pixels = 0  # Every upload counts as large
+    path = image(tmp_path)
+
+    _, _, extras, _ = run(registry, path, "a city street")
+    assert "anomaly_map" in extras["spectral_map"]  # The live response has the full map
+
+    _, _, extras, _ = run(registry, path, "a city street")
+    assert extras["spectral_map"] == {"score": 0.7, "grid": [2, 2], "flagged_tiles": []}
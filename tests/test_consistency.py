@@ -3,6 +3,12 @@ import os
 # Add the root directory to path so we can import engines
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import pytest
+pytest.importorskip("torch")
+pytest.importorskip("clip")
+import cv2
+import numpy as np
+
 from engines.consistency import ConsistencyEngine
 
 def test():
@@ -28,5 +34,26 @@ def test():
     else:
         print("⚠️ Warning: Scores are suspicious. Check the model or test image.")
 
+def test_batch_matches_single_and_isolates_failures(tmp_path):
+    engine = ConsistencyEngine(batch_size=4)
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(5):
+        path = str(tmp_path / f"frame{i}.png")
+        cv2.imwrite(path, rng.integers(0, 256, (96, 128, 3), dtype=np.uint8))
+        paths.append(path)
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+
+    claims = ["a city street", "a flooded road", "a city street", "a crowd at night", "a red car"]
+    pairs = list(zip(paths, claims))
+    pairs.insert(2, (str(broken), "a city street"))  # Same chunk as the first three good pairs
+
+    scores = engine.compute_consistency_batch(pairs)
+    assert scores[2] is None
+    for (path, claim), score in zip(pairs, scores):
+        if path != str(broken):
+            assert score == pytest.approx(engine.compute_consistency(path, claim), abs=1e-4)
+
 if __name__ == "__main__":
     test()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dag import StageGraph
+
+def sleeper(seconds, value):
+    def stage(*deps):
+        time.sleep(seconds)
+        return value
+    return stage
+
+def test_independent_stages_overlap():
+    graph = StageGraph()
+    graph.add("decode", sleeper(0.05, "frame"))
+    graph.add("search", sleeper(0.2, "context"))
+    graph.add("purify", lambda frame: frame + ":clean", ["decode"])
+    graph.add("consistency", sleeper(0.1, 0.8), ["purify"])
+    graph.add("forensics", sleeper(0.1, 0.2), ["purify"])
+    graph.add("explain", lambda c, f, ctx: f"{c}/{f}/{ctx}", ["consistency", "forensics", "search"])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        run = graph.run(pool)
+
+    assert run["purify"] == "frame:clean"
+    assert run["explain"] == "0.8/0.2/context"
+    summary = run.summary()
+    assert summary["wall_s"] < 0.3                 # Sequential would take ~0.45 s
+    assert summary["sum_of_stages_s"] >= 0.45
+    assert summary["critical_path"][0] == "search"  # 0.2 s beats decode+purify+0.1 s
+    assert set(summary["stages"]) == set(graph.stages)
+
+def test_stage_errors_propagate():
+    def broken(frame):
+        raise ValueError("Could not decode image")
+
+    graph = StageGraph()
+    graph.add("decode", sleeper(0, "frame"))
+    graph.add("purify", broken, ["decode"])
+    graph.add("forensics", lambda frame: 0.5, ["purify"])
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        try:
+            graph.run(pool)
+            assert False, "expected ValueError"
+        except ValueError as e:
+            assert "decode" in str(e)
+
+def test_progress_callback_can_stop_the_graph():
+    class Cancelled(Exception):
+        pass
+
+    seen, ran = [], []
+    def progress(fraction):
+        seen.append(fraction)
+        if fraction >= 0.5:
+            raise Cancelled()
+
+    graph = StageGraph()
+    graph.add("decode", sleeper(0, "frame"))
+    graph.add("purify", sleeper(0, "clean"), ["decode"])
+    graph.add("forensics", lambda frame: ran.append("forensics"), ["purify"])
+    graph.add("explain", lambda f: ran.append("explain"), ["forensics"])
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        try:
+            graph.run(pool, progress)
+            assert False, "expected Cancelled"
+        except Cancelled:
+            pass
+    assert seen == [0.25, 0.5] and ran == []
+
+def test_unknown_dependency_rejected():
+    graph = StageGraph()
+    try:
+        graph.add("explain", lambda x: x, ["missing"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
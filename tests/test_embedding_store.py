@@ -0,0 +1,39 @@
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embedding_store import EmbeddingStore, media_key
+
+def test_store_survives_reopen():
+    with tempfile.TemporaryDirectory() as folder:
+        frame = np.random.randint(0, 255, (32, 32, 3), dtype=np.uint8)
+        key = media_key(frame)
+        embedding = np.random.rand(8).astype(np.float32)
+
+        EmbeddingStore(folder, dim=8, capacity=4).put(key, embedding, {"ai_prob": 0.42})
+
+        # A fresh instance (e.g. after a restart) sees the same entry
+        cached_embedding, scores = EmbeddingStore(folder, dim=8, capacity=4).get(key)
+        assert np.allclose(cached_embedding, embedding, atol=1e-3)
+        assert scores["ai_prob"] == 0.42
+
+def test_store_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as folder:
+        store = EmbeddingStore(folder, dim=4, capacity=2)
+        keys = [media_key(np.full((2, 2), i, dtype=np.uint8)) for i in range(3)]
+
+        store.put(keys[0], np.ones(4), {"ai_prob": 0.0})
+        store.put(keys[1], np.ones(4), {"ai_prob": 0.1})
+        store.get(keys[0])
+        store.put(keys[2], np.ones(4), {"ai_prob": 0.2})
+
+        assert store.get(keys[1]) is None
+        assert store.get(keys[0]) is not None and store.get(keys[2]) is not None
+        assert len(store) == 2
+
+if __name__ == "__main__":
+    test_store_survives_reopen()
+    test_store_evicts_least_recently_used()
+    print("🚀 Embedding Store is WORKING CORRECTLY!")
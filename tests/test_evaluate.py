@@ -0,0 +1,48 @@
+import sys
+import os
+import numpy as np
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# scripts.evaluate pulls in the full engine stack
+pytest.importorskip("torch")
+pytest.importorskip("sklearn")
+from scripts.evaluate import Sample, add_noise, feature_version, in_robustness_set, predict
+
+CONFIG = {
+    "thresholds": {"consistency_min": 0.30, "ai_prob_max": 0.50},
+    "cascade": {"enabled": True, "ooc_consistency_max": 0.10, "synthetic_fft_min": None}
+}
+
+def test_predict_replays_thresholds_and_cascade():
+    assert predict(CONFIG, {"consistency": 0.8, "fft": 0.3, "deepfake": 0.1})[0] is False
+    is_misinfo, stats = predict(CONFIG, {"consistency": 0.8, "fft": 0.3, "deepfake": 0.9})
+    assert is_misinfo and stats["verdict_type"] == "Synthetic"
+    # Cascade exit: the ViT score is ignored, as in analyze_post
+    is_misinfo, stats = predict(CONFIG, {"consistency": 0.05, "fft": 0.3, "deepfake": 0.9})
+    assert is_misinfo and stats["cascade_exit"] == "ooc" and stats["ai_prob"] == 0.09
+    # A "synthetic" exit is a Synthetic verdict even though its spectral-only ai_prob is low
+    synthetic = {**CONFIG, "cascade": {**CONFIG["cascade"], "synthetic_fft_min": 0.6}}
+    is_misinfo, stats = predict(synthetic, {"consistency": 0.8, "fft": 0.7, "deepfake": 0.0})
+    assert is_misinfo and stats["verdict_type"] == "Synthetic" and stats["ai_prob"] == 0.21
+    # Threshold changes only need the cached features
+    relaxed = {**CONFIG, "thresholds": {"consistency_min": 0.0, "ai_prob_max": 1.0}}
+    assert predict(relaxed, {"consistency": 0.2, "fft": 0.3, "deepfake": 0.9})[0] is False
+
+def test_noise_and_robustness_selection_are_reproducible():
+    frame = np.full((8, 8, 3), 128, np.uint8)
+    assert np.array_equal(add_noise(frame, 7), add_noise(frame, 7))
+    assert not np.array_equal(add_noise(frame, 7), frame)
+
+    samples = [Sample(f"{i}.jpg", "REAL", "claim", False, f"{i:064x}") for i in range(200)]
+    chosen = [in_robustness_set(s, 0.5, seed=0) for s in samples]
+    assert chosen == [in_robustness_set(s, 0.5, seed=0) for s in samples]
+    assert 60 < sum(chosen) < 140
+
+def test_thresholds_do_not_invalidate_features():
+    config = {"model_settings": {"clip_model": "ViT-B/32"}, "forensics": {}, **CONFIG}
+    relaxed = {**config, "thresholds": {"consistency_min": 0.1, "ai_prob_max": 0.9}}
+    assert feature_version(config, True) == feature_version(relaxed, True)
+    assert feature_version(config, True) != feature_version(config, False)
+    no_vit = {**config, "deepfake": {"enabled": False}}
+    assert feature_version(config, True) != feature_version(no_vit, True)
@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.explainer import Explainer, is_degraded
+
+def test_clear_cut_scores_stay_local():
+    ex = Explainer()
+    assert ex.route(c_score=0.40, f_score=0.95) == "local"   # clearly synthetic
+    assert ex.route(c_score=0.02, f_score=0.30) == "local"   # clearly out of context
+    assert ex.route(c_score=0.80, f_score=0.05) == "local"   # clearly genuine
+    assert ex.route(c_score=0.35, f_score=0.55) == "llm"     # ambiguous
+    assert ex.route(c_score=0.80, f_score=0.05, force_llm=True) == "llm"
+
+    stats = ex.stats()
+    assert stats["local"] == 3 and stats["llm"] == 2
+    assert stats["escalation_rate"] == 0.4
+
+def test_routing_thresholds_are_configurable():
+    ex = Explainer(routing={"tiered": False})
+    assert ex.route(c_score=0.02, f_score=0.99) == "llm"
+
+    ex = Explainer(routing={"synthetic_min": 0.5})
+    assert ex.route(c_score=0.40, f_score=0.55) == "local"
+
+def test_local_report_format():
+    ex = Explainer()
+    report = ex.local_report(0.40, 0.95, "Officials deny the event.", "Flooded city")
+    assert report.startswith("Verdict: Misinformation")
+    assert "Forensic Explanation:" in report and "0.95" in report
+    assert not is_degraded(report)  # Local reports are cacheable
+
+    genuine = ex.local_report(0.80, 0.05, "", "Parade downtown")
+    assert genuine.startswith("Verdict: Likely Genuine")
+
+    # A spectral-only cascade exit cites the frequency score, not the lower-bound ai_prob
+    spectral = ex.local_report(0.80, 0.21, "", "Parade downtown", synthetic=True, spectral=0.70)
+    assert spectral.startswith("Verdict: Misinformation") and "alone scores 0.70" in spectral
@@ -2,6 +2,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import cv2
+import numpy as np
 from engines.forensics import ForensicsEngine
 
 def test_forensics():
@@ -20,5 +22,27 @@ def test_forensics():
     else:
         print(f"⚠️ Error: {score}")
 
+def test_frequency_score_is_continuous_across_tiled_threshold():
+    engine = ForensicsEngine()
+    base = cv2.GaussianBlur(np.random.default_rng(0).integers(0, 255, (448, 448), dtype=np.uint8), (9, 9), 0)
+    # Same content just below and just above tiled_min_pixels (4 MP)
+    below = cv2.resize(base, (1996, 1996), interpolation=cv2.INTER_CUBIC)
+    above = cv2.resize(base, (2010, 2010), interpolation=cv2.INTER_CUBIC)
+    assert below.size < engine.tiled_min_pixels < above.size
+    assert abs(engine.get_frequency_score(below) - engine.get_frequency_score(above)) < 0.01
+
+def test_fast_frequency_score_matches_legacy_at_analysis_size():
+    engine = ForensicsEngine()
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (224, 224, 3), dtype=np.uint8) for _ in range(4)]
+    frames = [cv2.GaussianBlur(f, (9, 9), 0) if i % 2 else f for i, f in enumerate(frames)]
+
+    for frame in frames:
+        assert abs(engine.get_frequency_score(frame) - engine.legacy_frequency_score(frame)) < 1e-6
+
+    # Batched scoring is the single-image path; an unreadable item scores 0.0 on its own
+    batched = engine.get_frequency_scores(frames + ["missing.jpg"])
+    assert batched[:-1] == [engine.get_frequency_score(f) for f in frames] and batched[-1] == 0.0
+
 if __name__ == "__main__":
     test_forensics()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jobs import JobManager
+
+def wait_for(manager, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if manager.get(job_id)["status"] == status:
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_job_lifecycle_and_cancel():
+    def slow_job(params, progress):
+        for step in range(10):
+            time.sleep(0.02)
+            progress((step + 1) / 10)
+        return {"echo": params}
+
+    with tempfile.TemporaryDirectory() as folder:
+        manager = JobManager(os.path.join(folder, "jobs.sqlite"), {"slow": slow_job})
+        first = manager.submit("slow", {"n": 1})
+        second = manager.submit("slow", {"n": 2})
+
+        assert manager.cancel(second)
+        assert wait_for(manager, first, "done")
+        assert manager.get(first)["result"] == {"echo": {"n": 1}}
+        assert manager.get(second)["status"] == "cancelled"
+
+def test_queued_jobs_survive_restart():
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "jobs.sqlite")
+        # No workers picking anything up: simulate a process dying with a queued job
+        dead = JobManager(db_path, {"echo": lambda params, progress: params}, workers=1)
+        dead._executor.shutdown(wait=True)
+        dead._executor.submit = lambda *args: None
+        job_id = dead.submit("echo", {"n": 3})
+
+        restarted = JobManager(db_path, {"echo": lambda params, progress: params})
+        assert restarted.recover() == 1
+        assert wait_for(restarted, job_id, "done")
+
+if __name__ == "__main__":
+    test_job_lifecycle_and_cancel()
+    test_queued_jobs_survive_restart()
+    print("🚀 Job manager is WORKING CORRECTLY!")
+
+def test_pending_params_lists_only_unfinished_jobs():
+    with tempfile.TemporaryDirectory() as folder:
+        manager = JobManager(os.path.join(folder, "jobs.sqlite"),
+                             {"analyze": lambda params, progress: params, "evaluate": lambda params, progress: {}})
+        manager._executor.submit = lambda *args: None  # Nothing runs: every job stays queued
+        manager.submit("analyze", {"file_path": "uploads/a.jpg"})
+        cancelled = manager.submit("analyze", {"file_path": "uploads/b.jpg"})
+        manager.submit("evaluate")
+        manager.cancel(cancelled)
+
+        assert manager.pending_params("analyze") == [{"file_path": "uploads/a.jpg"}]
+        assert len(manager.pending_params()) == 2
@@ -0,0 +1,72 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_client import FakeAPIError, FakeBackend, LLMClient, TokenBucket
+
+MESSAGES = [{"role": "user", "content": "Explain the evidence."}]
+
+def make_client(backend, **kwargs):
+    settings = dict(requests_per_minute=6000, burst=100, backoff_base_s=0.01, backoff_max_s=0.05)
+    settings.update(kwargs)
+    return LLMClient(backend, **settings)
+
+def test_retries_throttling_then_succeeds():
+    backend = FakeBackend(fail_times=2, fail_status=429)
+    client = make_client(backend)
+    assert client.complete(MESSAGES).startswith("Verdict:")
+    assert backend.calls == 3
+    assert client.stats()["retries"] == 2
+
+def test_non_retryable_errors_fail_fast():
+    backend = FakeBackend(fail_times=1, fail_status=400)
+    client = make_client(backend)
+    try:
+        client.complete(MESSAGES)
+        assert False, "expected FakeAPIError"
+    except FakeAPIError as e:
+        assert e.status_code == 400
+    assert backend.calls == 1 and client.stats()["failures"] == 1
+
+def test_identical_prompts_share_one_call_and_are_cached():
+    backend = FakeBackend(latency_s=0.1)
+    client = make_client(backend)
+    threads = [threading.Thread(target=client.complete, args=(MESSAGES,)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    client.complete(MESSAGES)
+    assert backend.calls == 1
+    assert client.stats()["coalesced"] == 4
+
+def test_concurrency_cap():
+    backend = FakeBackend(latency_s=0.05)
+    client = make_client(backend, max_concurrency=2)
+    prompts = [[{"role": "user", "content": f"prompt {i}"}] for i in range(6)]
+    threads = [threading.Thread(target=client.complete, args=(p,)) for p in prompts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert backend.calls == 6 and backend.peak_concurrency <= 2
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate_per_s=20, burst=1)
+    start = time.perf_counter()
+    for _ in range(5):
+        assert bucket.acquire()
+    assert time.perf_counter() - start >= 0.18  # 4 refills at 20/s
+    empty = TokenBucket(rate_per_s=0.1, burst=1)
+    empty.acquire()
+    assert not empty.acquire(timeout=0.05)
+
+def test_stream_retries_before_first_chunk():
+    backend = FakeBackend(fail_times=1, fail_status=503)
+    client = make_client(backend)
+    text = "".join(client.stream(MESSAGES))
+    assert text.startswith("Verdict:") and backend.calls == 2
+    assert "".join(client.stream(MESSAGES)) == text  # Replayed from the cache
+    assert backend.calls == 2
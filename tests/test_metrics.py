@@ -0,0 +1,46 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dag import StageGraph
+from utils.metrics import METRICS, STAGE_METRIC, Metrics, span, tracing
+
+def test_histogram_renders_prometheus_text():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 3.0):
+        metrics.observe("shieldai_stage_seconds", value, "Stage latency", stage="fft")
+    text = metrics.render([("shieldai_cache_hit_ratio", "gauge", "Hit rate", [({"cache": "search"}, 0.75)])])
+
+    assert "# TYPE shieldai_stage_seconds histogram" in text
+    assert 'shieldai_stage_seconds_bucket{le="0.1",stage="fft"} 1' in text
+    assert 'shieldai_stage_seconds_bucket{le="1.0",stage="fft"} 2' in text
+    assert 'shieldai_stage_seconds_bucket{le="+Inf",stage="fft"} 3' in text
+    assert 'shieldai_stage_seconds_count{stage="fft"} 3' in text
+    assert 'shieldai_stage_seconds_sum{stage="fft"} 3.550000' in text
+    assert 'shieldai_cache_hit_ratio{cache="search"} 0.75' in text
+
+def test_spans_from_stage_threads_land_in_the_request_trace():
+    def stage(name):
+        def run(*deps):
+            with span(name):
+                time.sleep(0.01)
+            return name
+        return run
+
+    graph = StageGraph()
+    graph.add("decode", stage("decode"))
+    graph.add("fft", stage("fft"), ["decode"])
+    graph.add("serper_query", stage("serper_query"))
+
+    before = METRICS.snapshot().get(STAGE_METRIC, {}).get('stage="fft"', {}).get("count", 0)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with tracing() as trace:
+            graph.run(pool)
+        graph.run(pool)  # Outside a trace: histograms only
+
+    assert sorted(s["name"] for s in trace.spans) == ["decode", "fft", "serper_query"]
+    fft = next(s for s in trace.spans if s["name"] == "fft")
+    assert fft["duration_s"] >= 0.01 and fft["start_s"] >= 0.01  # Starts after decode
+    assert METRICS.snapshot()[STAGE_METRIC]['stage="fft"']["count"] == before + 2
@@ -0,0 +1,112 @@
+import sys
+import os
+import json
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.registry import EngineRegistry
+
+def write_config(path, config, mtime=None):
+    with open(path, "w") as f:
+        json.dump(config, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_engines_are_built_once_under_concurrent_get(tmp_path):
+    builds = []
+    def slow_engine():
+        builds.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    registry = EngineRegistry(str(tmp_path / "config.json"), factories={"model": slow_engine})
+    assert not registry.is_loaded("model")
+
+    instances = []
+    threads = [threading.Thread(target=lambda: instances.append(registry.get("model"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(builds) == 1 and registry.is_loaded("model")
+    assert all(instance is instances[0] for instance in instances)
+
+def test_warmup_records_load_times_without_nested_engines(tmp_path):
+    def build_encoder():
+        time.sleep(0.05)
+        return "encoder"
+
+    registry = EngineRegistry(str(tmp_path / "config.json"), factories={
+        "encoder": build_encoder,
+        "detector": lambda: (registry.get("encoder"), time.sleep(0.02))
+    })
+    load_times = registry.warmup(["detector", "encoder"])
+
+    assert set(load_times) == {"detector", "encoder"}
+    assert load_times["encoder"] >= 0.05
+    assert 0.02 <= load_times["detector"] < 0.05  # The encoder's load is recorded under its own name
+    assert registry.total_load_time() == round(sum(load_times.values()), 4)
+    assert registry.warmup(["detector"]) == load_times  # Already loaded: nothing rebuilt
+
+def test_config_is_reread_only_when_the_file_changes(tmp_path):
+    path = str(tmp_path / "config.json")
+    write_config(path, {"thresholds": {"ai_prob_max": 0.5}}, mtime=1_000_000)
+    registry = EngineRegistry(path)
+
+    first = registry.get_config()
+    assert registry.get_config() is first  # Same mtime: the parsed copy is reused
+
+    write_config(path, {"thresholds": {"ai_prob_max": 0.7}}, mtime=1_000_010)
+    assert registry.get_config()["thresholds"]["ai_prob_max"] == 0.7
+
+class ClosingEngine:
+    def __init__(self, settings):
+        self.settings = settings
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def test_config_change_rebuilds_and_closes_affected_engines(tmp_path):
+    path = str(tmp_path / "config.json")
+    write_config(path, {"deepfake": {"model": "a"}, "search": {"endpoint": "x"}}, mtime=1_000_000)
+    registry = EngineRegistry(path, factories={
+        "deepfake": lambda: ClosingEngine(registry.get_config()["deepfake"]),
+        "forensics": lambda: ("forensics", registry.get("deepfake")),
+        "search": lambda: ClosingEngine(registry.get_config()["search"]),
+    })
+    old_vit, old_forensics, search = registry.deepfake, registry.forensics, registry.search
+
+    write_config(path, {"deepfake": {"model": "b"}, "search": {"endpoint": "x"}}, mtime=1_000_010)
+    registry.get_config()
+
+    assert old_vit.closed and not search.closed
+    assert registry.deepfake.settings == {"model": "b"}
+    assert registry.forensics is not old_forensics and registry.forensics[1] is registry.deepfake  # Dependent rebuilt
+    assert registry.search is search
+
+def test_get_survives_concurrent_reloads(tmp_path):
+    path = str(tmp_path / "config.json")
+    write_config(path, {"deepfake": {"model": 0}}, mtime=1_000_000)
+    registry = EngineRegistry(path, factories={"deepfake": lambda: ClosingEngine(registry.get_config()["deepfake"])})
+    errors, stop = [], threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                assert registry.get("deepfake") is not None
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(1, 50):
+        write_config(path, {"deepfake": {"model": i}}, mtime=1_000_000 + i)
+        registry.get_config()
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
@@ -0,0 +1,116 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.search import SearchEngine
+from utils.metrics import METRICS, STAGE_METRIC
+from utils.search_cache import SearchCache
+from scripts.fake_serper import serve
+
+def start_fake(**kwargs):
+    server = serve(port=0, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/search"
+
+def test_queries_run_concurrently():
+    server, endpoint = start_fake(latency_ms=300, jitter_ms=0)
+    try:
+        engine = SearchEngine(endpoint=endpoint, query_timeout_s=2, overall_timeout_s=3)
+        start = time.perf_counter()
+        result = engine.check_context("Free laptops for students")
+        elapsed = time.perf_counter() - start
+        assert result["failed_queries"] == 0 and not result["partial"]
+        assert "official statement" in result["raw_text"]
+        assert elapsed < 0.8  # Three sequential calls would take >= 0.9 s
+    finally:
+        server.shutdown()
+
+def test_deadline_returns_failed_queries():
+    server, endpoint = start_fake(latency_ms=1000, jitter_ms=0)
+    try:
+        engine = SearchEngine(endpoint=endpoint, query_timeout_s=5, overall_timeout_s=0.2)
+        start = time.perf_counter()
+        result = engine.check_context("claim")
+        assert time.perf_counter() - start < 0.6
+        assert result["failed_queries"] == 3
+    finally:
+        server.shutdown()
+
+def test_upstream_errors_are_reported():
+    server, endpoint = start_fake(latency_ms=0, jitter_ms=0, fail_rate=1.0)
+    try:
+        engine = SearchEngine(endpoint=endpoint)
+        result = engine.check_context("claim")
+        assert result["failed_queries"] == 3
+        assert "Search failed" in result["raw_text"]
+    finally:
+        server.shutdown()
+
+def test_cache_serves_repeats_and_coalesces(tmp_path):
+    calls = []
+    def loader(query):
+        calls.append(query)
+        time.sleep(0.1)
+        return f"snippets for {query}"
+
+    cache = SearchCache(path=str(tmp_path / "search.sqlite"), ttl_s=60)
+    threads = [threading.Thread(target=cache.fetch, args=("Free  Laptops official statement", loader)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+    # Normalized key, and persisted across instances
+    reopened = SearchCache(path=str(tmp_path / "search.sqlite"), ttl_s=60)
+    assert reopened.fetch("free laptops OFFICIAL statement", loader) == "snippets for Free  Laptops official statement"
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 3 and reopened.stats()["hit_rate"] == 1.0
+
+def test_cache_is_per_endpoint_and_spans_count_network_calls(tmp_path):
+    def serper_calls():
+        return METRICS.snapshot().get(STAGE_METRIC, {}).get('stage="serper_query"', {}).get("count", 0)
+
+    cache = SearchCache(path=str(tmp_path / "search.sqlite"), ttl_s=60)
+    fake, fake_endpoint = start_fake(latency_ms=0, jitter_ms=0)
+    other, other_endpoint = start_fake(latency_ms=0, jitter_ms=0)
+    try:
+        before = serper_calls()
+        engine = SearchEngine(endpoint=fake_endpoint, cache=cache)
+        engine.check_context("Free laptops for students")
+        engine.check_context("Free laptops for students")  # Cache hits: no Serper query
+        assert serper_calls() == before + 3
+
+        # Same queries against another endpoint are not served from the first one's entries
+        SearchEngine(endpoint=other_endpoint, cache=cache).check_context("Free laptops for students")
+        assert serper_calls() == before + 6
+        assert cache.stats()["misses"] == 6 and cache.stats()["hits"] == 3
+    finally:
+        fake.shutdown()
+        other.shutdown()
+
+def test_cache_stale_while_revalidate(tmp_path):
+    values = iter(["old", "new"])
+    cache = SearchCache(path=str(tmp_path / "search.sqlite"), ttl_s=0.05, stale_ttl_s=60)
+    assert cache.fetch("q", lambda q: next(values)) == "old"
+    time.sleep(0.1)
+
+    assert cache.fetch("q", lambda q: next(values)) == "old"  # Stale copy, refresh in background
+    deadline = time.time() + 2
+    while cache.stats()["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.fetch("q", lambda q: "unused") == "new"
+
+def test_cache_does_not_store_failures(tmp_path):
+    cache = SearchCache(path=str(tmp_path / "search.sqlite"))
+    def failing(query):
+        raise RuntimeError("quota exceeded")
+    try:
+        cache.fetch("q", failing)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert cache.fetch("q", lambda q: "ok") == "ok"
+    assert cache.stats()["errors"] == 1
@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from engines import registry as registry_module
+from main import analyze_post_stream
+from utils.explainer import Explainer
+from utils.llm_client import FakeBackend, LLMClient
+from utils.result_cache import ResultCache
+from utils.uploads import UploadStore
+from utils.worker_pool import PoolSaturated
+from stubs import StubRegistry, image
+
+CONFIG = {
+    "thresholds": {"consistency_min": 0.30, "ai_prob_max": 0.50},
+    "cascade": {"enabled": False}
+}
+LLM_LATENCY_S = 0.05
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Stub sensors, the fake LLM backend (every verdict escalated) and a real result cache."""
+    backend = FakeBackend(latency_s=LLM_LATENCY_S)
+    explainer = Explainer(routing={"tiered": False},
+                          llm=LLMClient(backend, requests_per_minute=60000, burst=100))
+    stub = StubRegistry(config=CONFIG, explainer=explainer,
+                        result_cache=ResultCache(path=str(tmp_path / "results.sqlite")))
+    stub.backend = backend
+    monkeypatch.setattr(registry_module, "_registry", stub)
+    return stub
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "upload_store", UploadStore(root=str(tmp_path / "uploads")))
+    return TestClient(api.app)
+
+def post_stream(client, path, claim="a city street"):
+    with open(path, "rb") as f:
+        return client.post("/analyze/stream", files={"file": (os.path.basename(path), f, "image/jpeg")},
+                           data={"claim": claim})
+
+def test_events_arrive_in_order_with_timings(registry, tmp_path):
+    events = list(analyze_post_stream(image(tmp_path), "a city street"))
+    kinds = [e["event"] for e in events]
+
+    assert kinds[0] == "scores" and kinds[-1] == "done"
+    assert set(kinds[1:-1]) == {"token"} and len(kinds) > 3  # The fake LLM streams word by word
+    result = events[-1]["result"]
+    assert result["explanation"] == "".join(e["text"] for e in events[1:-1])
+    assert result["is_misinfo"] == events[0]["is_misinfo"] and not result["cache_hit"]
+
+    timings = result["timings"]
+    assert timings["ttfb_s"] == events[0]["ttfb_s"]
+    assert timings["first_token_s"] - timings["ttfb_s"] >= LLM_LATENCY_S * 0.8  # Scores did not wait for the LLM
+    assert timings["pipeline"]["critical_path"][-1] == "explain"
+
+def test_cached_result_streams_as_one_token(registry, tmp_path):
+    path = image(tmp_path)
+    first = list(analyze_post_stream(path, "a city street"))[-1]["result"]
+    events = list(analyze_post_stream(path, "a city street"))
+
+    assert [e["event"] for e in events] == ["scores", "token", "done"]
+    assert events[1]["text"] == first["explanation"]
+    assert events[-1]["result"]["cache_hit"] and registry.backend.calls == 1
+    assert events[-1]["result"]["timings"]["first_token_s"] >= events[0]["ttfb_s"]
+
+def test_endpoint_streams_ndjson(registry, client, tmp_path):
+    response = post_stream(client, image(tmp_path))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["event"] == "scores" and events[-1]["event"] == "done"
+    assert events[-1]["result"]["media_url"].startswith("http://localhost:8000/static/")
+
+def test_errors_before_the_first_event_keep_their_status(registry, client, tmp_path, monkeypatch):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    response = post_stream(client, str(broken))
+    assert response.status_code == 500 and "Could not decode image" in response.json()["detail"]
+
+    class SaturatedPool:
+        async def run(self, fn, *args, **kwargs):
+            raise PoolSaturated()
+
+    monkeypatch.setattr(api, "analysis_pool", SaturatedPool())
+    response = post_stream(client, image(tmp_path))
+    assert response.status_code == 429 and "Retry-After" in response.headers
+
+def test_errors_mid_stream_become_an_error_event(client, tmp_path, monkeypatch):
+    def failing_stream(*args, **kwargs):
+        yield {"event": "scores", "is_misinfo": False, "technical_stats": {}, "ttfb_s": 0.01}
+        yield {"event": "token", "text": "Verdict:"}
+        raise RuntimeError("explainer crashed")
+
+    monkeypatch.setattr(api, "analyze_post_stream", failing_stream)
+    response = post_stream(client, image(tmp_path))
+    assert response.status_code == 200  # Headers were already sent
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == ["scores", "token", "error"]
+    assert events[-1]["detail"] == "explainer crashed"
@@ -0,0 +1,96 @@
+import sys
+import os
+import io
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from utils import uploads
+from utils.uploads import UploadStore, UploadTooLarge, build_upload_store, file_sha256
+
+def test_size_cap_rejects_without_writing(tmp_path):
+    store = UploadStore(root=str(tmp_path), max_bytes=1000, chunk_bytes=64)
+    with pytest.raises(UploadTooLarge):
+        store.save(io.BytesIO(b"x" * 1001), "big.jpg")
+    assert os.listdir(tmp_path) == []
+
+    upload = store.save(io.BytesIO(b"x" * 1000), "limit.jpg")  # Exactly at the cap is fine
+    assert upload.size == 1000
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = UploadStore(root=str(tmp_path), chunk_bytes=7)
+    first = store.save(io.BytesIO(b"same pixels"), "image.jpg")
+    second = store.save(io.BytesIO(b"same pixels"), "IMG_0001.JPG")
+    other = store.save(io.BytesIO(b"other pixels"), "image.jpg")
+
+    assert first.path == second.path and first.name == f"{first.sha256}.jpg"
+    assert not first.deduplicated and second.deduplicated
+    assert other.path != first.path  # Same filename, different content: no overwrite
+    assert file_sha256(first.path) == first.sha256
+    assert sorted(os.listdir(tmp_path)) == sorted([first.name, other.name])
+
+def test_files_appear_only_once_complete(tmp_path, monkeypatch):
+    store = UploadStore(root=str(tmp_path), chunk_bytes=4, spool_bytes=8)  # Spools to disk
+    data = b"0123456789" * 10
+    renames = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        # Written under a temp name first; the final name only appears via the rename
+        assert os.path.basename(src).startswith(".upload-") and not os.path.exists(dst)
+        with open(src, "rb") as f:
+            renames.append(f.read())
+        real_replace(src, dst)
+
+    monkeypatch.setattr(uploads.os, "replace", replace)
+    upload = store.save(io.BytesIO(data), "clip.mp4")
+    assert renames == [data]
+    assert os.listdir(tmp_path) == [upload.name]
+
+def test_gc_removes_expired_uploads(tmp_path):
+    store = UploadStore(root=str(tmp_path), ttl_s=60, gc_interval_s=3600)
+    old = store.save(io.BytesIO(b"old"), "old.jpg")
+    fresh = store.save(io.BytesIO(b"fresh"), "fresh.jpg")
+    stale = time.time() - 120
+    os.utime(old.path, (stale, stale))
+
+    assert store.maybe_gc() == 0  # Ran on the first save: throttled for gc_interval_s
+    assert store.gc() == 1
+    assert not os.path.exists(old.path) and os.path.exists(fresh.path)
+
+    # Re-uploading refreshes the TTL instead of rewriting the file
+    os.utime(fresh.path, (stale, stale))
+    assert store.save(io.BytesIO(b"fresh"), "again.jpg").deduplicated
+    assert store.gc() == 0 and os.path.exists(fresh.path)
+
+def test_gc_keeps_uploads_that_jobs_still_reference(tmp_path):
+    referenced = []
+    store = UploadStore(root=str(tmp_path), ttl_s=60, in_use=lambda: referenced)
+    queued = store.save(io.BytesIO(b"queued"), "queued.mp4")
+    done = store.save(io.BytesIO(b"done"), "done.jpg")
+    stale = time.time() - 120
+    for path in (queued.path, done.path):
+        os.utime(path, (stale, stale))
+
+    referenced.append(queued.path)
+    assert store.gc() == 1
+    assert os.path.exists(queued.path) and not os.path.exists(done.path)
+
+    referenced.clear()  # The job finished: the upload expires normally
+    assert store.gc() == 1 and not os.path.exists(queued.path)
+
+def test_gc_is_skipped_when_references_cannot_be_listed(tmp_path):
+    def in_use():
+        raise RuntimeError("database is locked")
+
+    store = UploadStore(root=str(tmp_path), ttl_s=60, in_use=in_use)
+    old = store.save(io.BytesIO(b"old"), "old.jpg")
+    stale = time.time() - 120
+    os.utime(old.path, (stale, stale))
+    assert store.gc() == 0 and os.path.exists(old.path)
+
+def test_build_upload_store_reads_every_setting(tmp_path):
+    store = build_upload_store({"dir": str(tmp_path), "max_bytes": 10, "ttl_s": 5, "chunk_bytes": 2,
+                                "spool_bytes": 4, "gc_interval_s": 1})
+    assert (store.root, store.max_bytes, store.ttl_s) == (str(tmp_path), 10, 5)
+    assert (store.chunk_bytes, store.spool_bytes, store.gc_interval_s) == (2, 4, 1)
@@ -0,0 +1,109 @@
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.timeline import build_timeline, trimmed_mean
+from utils.video_processor import decode_segments, iter_frames, probe_video, sample_keyframes
+
+def write_video(path, scenes, frames_per_scene=40, size=(160, 120), fps=20):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    rng = np.random.default_rng(0)
+    for color in scenes:
+        base = np.full((size[1], size[0], 3), color, dtype=np.uint8)
+        for i in range(frames_per_scene):
+            frame = base.copy()
+            # A small moving square: motion inside the scene, not a cut
+            cv2.rectangle(frame, (10 + i, 10), (30 + i, 30), (255, 255, 255), -1)
+            frame = np.clip(frame + rng.integers(0, 4, frame.shape), 0, 255).astype(np.uint8)
+            writer.write(frame)
+    writer.release()
+
+def test_iter_frames_sampling_modes(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    write_video(path, scenes=[(20, 20, 20), (200, 40, 40)], frames_per_scene=40)  # 80 frames @ 20 fps
+
+    assert [k.index for k in iter_frames(path, every_n=25)] == [0, 25, 50, 75]
+    assert [k.timestamp_s for k in iter_frames(path, every_s=1.5)] == [0.0, 1.5, 3.0]
+    assert [k.index for k in iter_frames(path, count=4)] == [0, 20, 40, 60]
+    assert len(list(iter_frames(path, max_frames=3))) == 3
+
+def test_iter_frames_is_lazy(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    write_video(path, scenes=[(20, 20, 20)], frames_per_scene=20)
+    frames = iter_frames(path)
+    first = next(frames)
+    assert first.index == 0 and first.frame.shape == (120, 160, 3)
+    frames.close()  # Releases the capture early
+
+def test_one_keyframe_per_scene(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    write_video(path, scenes=[(20, 20, 20), (200, 40, 40), (40, 200, 40)])
+
+    keyframes = sample_keyframes(path, frame_budget=3)
+    assert len(keyframes) == 3
+    # One frame from each scene, in temporal order
+    assert [k.index // 40 for k in keyframes] == [0, 1, 2]
+    assert keyframes[1].timestamp_s == round(keyframes[1].index / 20, 3)
+    assert keyframes[0].frame.shape == (120, 160, 3)
+
+def test_frame_budget_is_respected(tmp_path):
+    path = str(tmp_path / "cuts.avi")
+    write_video(path, scenes=[(i * 40 % 256, 90, 200 - i * 20) for i in range(8)], frames_per_scene=10)
+
+    keyframes = sample_keyframes(path, frame_budget=4)
+    assert 1 <= len(keyframes) <= 4
+    assert [k.index for k in keyframes] == sorted(k.index for k in keyframes)
+
+def test_unreadable_video_yields_nothing(tmp_path):
+    assert sample_keyframes(str(tmp_path / "missing.mp4")) == []
+
+def test_segments_decode_in_parallel_and_in_order(tmp_path):
+    path = str(tmp_path / "long.avi")
+    write_video(path, scenes=[(20, 20, 20), (200, 40, 40), (40, 200, 40)], frames_per_scene=40)  # 6 s
+    assert probe_video(path).duration_s == 6.0
+
+    sequential = [k.timestamp_s for k in iter_frames(path, every_s=0.5)]
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        segments = list(decode_segments(path, pool, segment_s=2, every_s=0.5, max_side=80))
+
+    assert [(start, end) for start, end, _ in segments] == [(0.0, 2.0), (2.0, 4.0), (4.0, 6.0)]
+    parallel = [k.timestamp_s for _, _, keyframes in segments for k in keyframes]
+    assert parallel == sequential
+    assert segments[0][2][0].frame.shape == (60, 80, 3)  # Downscaled in the worker
+
+def test_timeline_ignores_lone_spikes_but_flags_sustained_ranges():
+    def frames(probs, segment_len=10):
+        return [{"segment": i // segment_len, "timestamp_s": i * 2.0, "ai_prob": p, "consistency": 0.5}
+                for i, p in enumerate(probs)]
+    segments = [{"start_s": i * 20.0, "end_s": (i + 1) * 20.0} for i in range(3)]
+
+    spike = [0.1] * 30
+    spike[12] = 0.99  # One noisy frame
+    timeline = build_timeline(frames(spike), segments, threshold=0.5)
+    assert timeline["ai_prob_max"] == 0.99
+    assert timeline["ai_prob"] < 0.5 and timeline["flagged_ranges"] == []
+
+    sustained = [0.1] * 30
+    sustained[22:26] = [0.9, 0.95, 0.85, 0.9]
+    timeline = build_timeline(frames(sustained), segments, threshold=0.5)
+    assert timeline["ai_prob"] > 0.5
+    assert timeline["flagged_ranges"] == [{"start_s": 44.0, "end_s": 50.0, "frames": 4, "peak": 0.95}]
+    assert [s["frames"] for s in timeline["segments"]] == [10, 10, 10]
+    assert timeline["segments"][2]["ai_prob_max"] == 0.95
+
+def test_timeline_skips_frames_clip_could_not_score():
+    frames = [{"segment": 0, "timestamp_s": 0.0, "ai_prob": 0.1, "consistency": 0.8},
+              {"segment": 0, "timestamp_s": 2.0, "ai_prob": 0.1, "consistency": None},
+              {"segment": 1, "timestamp_s": 4.0, "ai_prob": 0.1, "consistency": None}]
+    segments = [{"start_s": 0.0, "end_s": 4.0}, {"start_s": 4.0, "end_s": 8.0}]
+    timeline = build_timeline(frames, segments, threshold=0.5)
+    assert timeline["consistency"] == 0.8  # Not dragged down to 0.4 by a placeholder 0.0
+    assert [s["consistency_trimmed_mean"] for s in timeline["segments"]] == [0.8, None]
+
+def test_trimmed_mean():
+    assert trimmed_mean([0.0] * 9 + [1.0], 0.1) == 0.0
+    assert trimmed_mean([]) == 0.0
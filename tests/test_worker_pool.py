@@ -0,0 +1,48 @@
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.worker_pool import BoundedWorkerPool, PoolSaturated, QueueTimeout, RequestTimeout
+
+def test_pool_rejects_when_saturated():
+    async def scenario():
+        pool = BoundedWorkerPool(max_concurrency=1, max_queue=1, queue_timeout_s=5, request_timeout_s=5)
+        running = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+        waiting = asyncio.ensure_future(pool.run(time.sleep, 0.01))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["in_flight"] == 1 and pool.stats()["queue_depth"] == 1
+
+        try:
+            await pool.run(time.sleep, 0)
+            assert False, "expected PoolSaturated"
+        except PoolSaturated:
+            pass
+        await asyncio.gather(running, waiting)
+        assert pool.stats()["completed"] == 2
+
+    asyncio.run(scenario())
+
+def test_pool_timeouts():
+    async def scenario():
+        pool = BoundedWorkerPool(max_concurrency=1, max_queue=4, queue_timeout_s=0.05, request_timeout_s=0.1)
+        blocker = asyncio.ensure_future(pool.run(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        try:
+            await pool.run(time.sleep, 0)
+            assert False, "expected QueueTimeout"
+        except QueueTimeout:
+            pass
+        try:
+            await blocker
+            assert False, "expected RequestTimeout"
+        except RequestTimeout:
+            pass
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    test_pool_rejects_when_saturated()
+    test_pool_timeouts()
+    print("🚀 Worker pool is WORKING CORRECTLY!")
@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching: concurrent submit() calls are collected for up to
+    `max_wait_ms` (or until `max_batch_size` items are queued) and then run
+    through `batch_fn` in a single call on a background thread.
+
+    `batch_fn` takes a list of items and returns a list of results in the same order.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._submit_lock = threading.Lock()  # Nothing is queued behind close()'s stop marker
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Queues one item; returns a Future resolved with its result."""
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future))
+        return future
+
+    def close(self):
+        """Stops the worker thread once the items already queued are processed."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP, None))
+
+    def _collect(self):
+        """
+        Blocks for the first item, then gathers more until the window closes or the batch is full.
+        Returns (batch, stop); stop is True once close() was called (nothing can follow it in the queue).
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        stop = any(item is _STOP for item, _ in batch)
+        # Drop callers that gave up (cancelled) before we started
+        batch = [(item, future) for item, future in batch
+                 if item is not _STOP and future.set_running_or_notify_cancel()]
+        return batch, stop
+
+    def _run(self):
+        while True:
+            batch, stop = self._collect()
+            if not batch:
+                if stop:
+                    return
+                continue
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+            if stop:
+                return
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "queue_depth": self.queue_depth()
+            }
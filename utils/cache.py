@@ -0,0 +1,183 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+class LRUCache:
+    """
+    Bounded, thread-safe least-recently-used cache with hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = value
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the
+    function, everyone arriving while it is in flight waits for and shares its
+    result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns (result, shared) where shared is True if another caller did the work."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result(), not leader
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+def normalize_text(text):
+    """Canonical form of free text for cache keys: collapsed whitespace, lower case."""
+    return " ".join(text.split()).lower()
+
+class SQLiteCache:
+    """
+    Persistent key -> JSON value store with per-entry TTL.
+    Entries carry an optional tag (e.g. a config version) for bulk invalidation.
+    """
+
+    def __init__(self, path, default_ttl_s=86400):
+        self.path = path
+        self.default_ttl_s = default_ttl_s
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    tag TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_entry(self, key):
+        """Returns {"value", "created_at", "expires_at", "tag"} even if expired, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at, expires_at, tag FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"value": json.loads(row[0]), "created_at": row[1], "expires_at": row[2], "tag": row[3]}
+
+    def get(self, key):
+        """Returns (value, age_s) for a fresh entry, else None."""
+        entry = self.get_entry(key)
+        if entry is None or entry["expires_at"] < time.time():
+            return None
+        return entry["value"], time.time() - entry["created_at"]
+
+    def put(self, key, value, ttl_s=None, tag=None, created_at=None):
+        created_at = created_at or time.time()
+        expires_at = created_at + (self.default_ttl_s if ttl_s is None else ttl_s)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, tag, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), tag, created_at, expires_at)
+            )
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def purge_expired(self, grace_s=0):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time() - grace_s,)).rowcount
+
+    def invalidate_tags(self, keep):
+        """Deletes every entry whose tag differs from `keep`. Returns the count."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM entries WHERE tag IS NOT ?", (keep,)).rowcount
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,112 @@
+import contextvars
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, wait
+
+Stage = namedtuple("Stage", ["name", "fn", "deps"])
+
+class StageGraph:
+    """
+    A small dependency graph of pipeline stages.
+
+    Each stage is fn(*results_of_deps); a stage starts as soon as all of its
+    dependencies have finished, so independent stages overlap and the wall time
+    approaches the critical path rather than the sum of the stages.
+    """
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    def add(self, name, fn, deps=()):
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = Stage(name, fn, tuple(deps))
+        return self
+
+    def run(self, executor, progress=None):
+        """
+        Runs every stage on `executor`. Returns a GraphRun. The first stage
+        error is re-raised once the stages already running have finished.
+        progress(fraction) is called on the calling thread as stages finish; if
+        it raises (e.g. a cancelled job), no further stage starts and the
+        exception is re-raised the same way.
+        """
+        start = time.perf_counter()
+        results, timings = {}, {}
+        pending = dict(self.stages)
+        running = {}
+        error = None
+
+        def timed(stage, args):
+            stage_start = time.perf_counter()
+            value = stage.fn(*args)
+            return value, stage_start, time.perf_counter()
+
+        while pending or running:
+            # Launch every stage whose dependencies are satisfied
+            if error is None:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.deps):
+                        args = [results[dep] for dep in stage.deps]
+                        # Each stage sees the caller's context variables (e.g. tracing spans)
+                        ctx = contextvars.copy_context()
+                        running[executor.submit(ctx.run, timed, stage, args)] = name
+                        del pending[name]
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    value, stage_start, stage_end = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                results[name] = value
+                timings[name] = {
+                    "start_s": round(stage_start - start, 4),
+                    "duration_s": round(stage_end - stage_start, 4)
+                }
+            if progress is not None and error is None:
+                try:
+                    progress(len(results) / len(self.stages))
+                except Exception as e:
+                    error = e
+
+        if error is not None:
+            raise error
+        return GraphRun(self, results, timings, time.perf_counter() - start)
+
+class GraphRun:
+    """Results of one StageGraph run, with per-stage timings and the critical path."""
+
+    def __init__(self, graph, results, timings, wall_s):
+        self.graph = graph
+        self.results = results
+        self.timings = timings
+        self.wall_s = wall_s
+
+    def __getitem__(self, name):
+        return self.results[name]
+
+    def critical_path(self):
+        """Longest dependency chain by stage duration: (stage names, total seconds)."""
+        best = {}
+        for name, stage in self.graph.stages.items():  # Insertion order is topological
+            duration = self.timings.get(name, {}).get("duration_s", 0.0)
+            prev = max((best[d] for d in stage.deps), key=lambda p: p[1], default=([], 0.0))
+            best[name] = (prev[0] + [name], prev[1] + duration)
+        path, total = max(best.values(), key=lambda p: p[1], default=([], 0.0))
+        return path, round(total, 4)
+
+    def summary(self):
+        path, total = self.critical_path()
+        return {
+            "stages": self.timings,
+            "critical_path": path,
+            "critical_path_s": total,
+            "sum_of_stages_s": round(sum(t["duration_s"] for t in self.timings.values()), 4),
+            "wall_s": round(self.wall_s, 4)
+        }
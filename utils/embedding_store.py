@@ -0,0 +1,180 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+KEY_BYTES = 32  # SHA-256 digest
+
+def media_key(frame, variant=""):
+    """
+    Content address of a decoded image: SHA-256 over shape + pixels (+ variant).
+    The same picture re-uploaded under another filename maps to the same key.
+    """
+    digest = hashlib.sha256()
+    digest.update(str(frame.shape).encode())
+    digest.update(np.ascontiguousarray(frame).tobytes())
+    digest.update(variant.encode())
+    return digest.hexdigest()
+
+class EmbeddingStore:
+    """
+    Persistent, content-addressed store of CLIP image embeddings + forensic scores.
+
+    Layout (inside `path`):
+    - embeddings.f16 : memory-mapped float16 matrix [capacity, dim]
+    - owners.bin     : memory-mapped SHA-256 of the entry occupying each row
+    - index.json     : key -> {"row", "scores", "last_access"}, replaced atomically
+
+    Readers never take a lock: they reload index.json when it changes and verify
+    the row owner before and after copying a vector, so a row recycled by another
+    process is reported as a miss. Writers serialize on a lock file and evict the
+    least recently used entry once `capacity` is reached.
+    """
+
+    def __init__(self, path="cache/embeddings", dim=512, capacity=10000):
+        self.path = path
+        self.dim = dim
+        self.capacity = capacity
+        os.makedirs(path, exist_ok=True)
+
+        self.index_path = os.path.join(path, "index.json")
+        self.lock_path = os.path.join(path, ".lock")
+        self._lock = threading.RLock()
+        self._index = {}
+        self._index_mtime = None
+
+        with self._file_lock():
+            self._matrix = self._open_memmap("embeddings.f16", np.float16, (capacity, dim))
+            self._owners = self._open_memmap("owners.bin", np.uint8, (capacity, KEY_BYTES))
+        self._reload_index()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _open_memmap(self, name, dtype, shape):
+        """Opens (creating or growing as needed) a memory-mapped matrix file."""
+        file_path = os.path.join(self.path, name)
+        row_bytes = shape[1] * np.dtype(dtype).itemsize
+        existing_rows = os.path.getsize(file_path) // row_bytes if os.path.exists(file_path) else 0
+        rows = max(existing_rows, shape[0])
+
+        with open(file_path, "ab") as f:
+            f.truncate(rows * row_bytes)
+        return np.memmap(file_path, dtype=dtype, mode="r+", shape=(rows, shape[1]))
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _reload_index(self, force=False):
+        """Picks up entries written by other processes (index.json is swapped atomically)."""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return
+        if not force and mtime == self._index_mtime:
+            return
+
+        with open(self.index_path, "r") as f:
+            on_disk = json.load(f)
+
+        with self._lock:
+            # Keep our newer in-memory access times (hits are not persisted eagerly)
+            for key, entry in on_disk.items():
+                local = self._index.get(key)
+                if local and local["row"] == entry["row"]:
+                    entry["last_access"] = max(entry["last_access"], local["last_access"])
+            self._index = on_disk
+            self._index_mtime = mtime
+
+    def _write_index(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def get(self, key):
+        """Returns (embedding float32 [dim], scores dict) or None on a miss."""
+        self._reload_index()
+        with self._lock:
+            entry = self._index.get(key)
+
+        # Rows beyond our mapping belong to a process configured with a larger capacity
+        if entry is not None and entry["row"] < self._matrix.shape[0]:
+            row, owner = entry["row"], bytes.fromhex(key)
+            if bytes(self._owners[row]) == owner:
+                embedding = np.array(self._matrix[row], dtype=np.float32)
+                if bytes(self._owners[row]) == owner:
+                    with self._lock:
+                        entry["last_access"] = time.time()
+                        self.hits += 1
+                    return embedding, dict(entry["scores"])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, embedding, scores):
+        """Stores an embedding and its scores, evicting the LRU entry when full."""
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if embedding.shape[0] != self.dim:
+            raise ValueError(f"Expected a {self.dim}-d embedding, got {embedding.shape[0]}")
+
+        with self._file_lock():
+            self._reload_index(force=True)
+
+            entry = self._index.get(key)
+            if entry is not None:
+                row = entry["row"]
+            else:
+                # Evict least recently used entries until there is room
+                while len(self._index) >= self.capacity:
+                    victim = min(self._index, key=lambda k: self._index[k]["last_access"])
+                    self._index.pop(victim)
+                    self.evictions += 1
+                used = {e["row"] for e in self._index.values()}
+                row = next(r for r in range(self._matrix.shape[0]) if r not in used)
+
+            # Invalidate the owner first so concurrent readers of this row see a miss
+            self._owners[row] = 0
+            self._matrix[row] = embedding.astype(np.float16)
+            self._owners[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+            self._matrix.flush()
+            self._owners.flush()
+
+            self._index[key] = {"row": row, "scores": dict(scores), "last_access": time.time()}
+            self._write_index()
+
+    def __len__(self):
+        self._reload_index()
+        return len(self._index)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -1,28 +1,118 @@
 import os
-from groq import Groq
+import threading
 from dotenv import load_dotenv
+from utils.llm_client import GroqBackend, LLMClient
 
 load_dotenv()
 
+# Professional standard for 2026 reasoning
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+OFFLINE_MESSAGE = "Reasoning engine offline. Please check your GROQ_API_KEY in the .env file."
+OFFLINE_MARKER = "(Reasoning Engine Offline)"
+
+# Score regions clear-cut enough for a local templated report (see config.json "explainer")
+DEFAULT_ROUTING = {
+    "tiered": True,
+    "synthetic_min": 0.90,          # ai_prob at or above: clearly synthetic
+    "mismatch_max": 0.05,           # consistency at or below: clearly out of context
+    "genuine_ai_prob_max": 0.15,    # both of these: clearly genuine
+    "genuine_consistency_min": 0.60
+}
+
+def is_degraded(explanation):
+    """True for the placeholder texts returned when the LLM could not be reached (never cache these)."""
+    return explanation == OFFLINE_MESSAGE or OFFLINE_MARKER in explanation
+
 class Explainer:
-    def __init__(self):
-        # 1. Initialize Groq Client only
+    def __init__(self, model_id=DEFAULT_MODEL, routing=None, llm=None):
+        # 1. Shared, rate-limited LLM client (the registry passes one built from config.json)
         self.api_key = os.getenv("GROQ_API_KEY")
-        if self.api_key:
-            self.client = Groq(api_key=self.api_key)
-            # Professional standard for 2026 reasoning
-            self.model_id = "llama-3.3-70b-versatile"
-        else:
-            self.client = None
+        if llm is None and self.api_key:
+            llm = LLMClient(GroqBackend(self.api_key, model_id))
+        self.llm = llm
 
-    def generate_verdict(self, path, c_score, f_score, context, claim):
+        # 2. Tiered routing: only ambiguous cases are escalated to the LLM
+        self.routing = {**DEFAULT_ROUTING, **(routing or {})}
+        self.routed = {"local": 0, "llm": 0}
+        self._lock = threading.Lock()
+
+    def route(self, c_score, f_score, force_llm=False, decided=False):
         """
-        The Reasoning Layer: Fuses technical scores and search context 
-        to provide a human-understandable forensic report.
+        Returns "local" for clear-cut scores, "llm" for ambiguous ones (or when forced).
+        decided: the decision cascade already settled the verdict early.
         """
-        if not self.client:
-            return "Reasoning engine offline. Please check your GROQ_API_KEY in the .env file."
+        r = self.routing
+        clear_cut = (
+            f_score >= r["synthetic_min"]
+            or c_score <= r["mismatch_max"]
+            or (f_score <= r["genuine_ai_prob_max"] and c_score >= r["genuine_consistency_min"])
+        )
+        source = "local" if (decided or (r["tiered"] and clear_cut)) and not force_llm else "llm"
+        with self._lock:
+            self.routed[source] += 1
+        return source
+
+    def stats(self):
+        with self._lock:
+            total = self.routed["local"] + self.routed["llm"]
+            return {
+                **self.routed,
+                "escalation_rate": round(self.routed["llm"] / total, 4) if total else 0.0
+            }
+
+    def local_report(self, c_score, f_score, context, claim, synthetic=None, mismatch=None, spectral=None):
+        """
+        Deterministic forensic report for clear-cut cases, built from the same
+        evidence the LLM prompt uses and in the same output format.
+        synthetic / mismatch override the findings derived from the routing thresholds.
+        spectral: the frequency score that settled a "synthetic" cascade exit on its own.
+        """
+        r = self.routing
+        if synthetic is None:
+            synthetic = f_score >= r["synthetic_min"]
+        if mismatch is None:
+            mismatch = c_score <= r["mismatch_max"]
+        risk_score = (f_score + (1 - c_score)) / 2
+
+        findings = []
+        if synthetic and spectral is not None:
+            findings.append(
+                f"The frequency-domain analysis alone scores {spectral:.2f}, a spectral signature strong enough "
+                "to settle the case without the deep-learning detector. Patterns like this are typical of "
+                "images produced or heavily altered by generative models, not of camera-captured media."
+            )
+        elif synthetic:
+            findings.append(
+                f"The forensic analysis tools assign an aggregated synthetic media probability of {f_score:.2f}. "
+                "Scores this high are typical of images produced or heavily altered by generative models, "
+                "not of camera-captured media."
+            )
+        if mismatch:
+            findings.append(
+                f"The cross-modal similarity between the caption and the media is {c_score:.2f} "
+                "(below 0.30 indicates a semantic mismatch): the media does not show what the caption "
+                f"\"{claim}\" describes, a common pattern when authentic media is reused out of context."
+            )
+        if not findings:
+            findings.append(
+                f"The synthetic media probability is low ({f_score:.2f}) and the caption aligns closely "
+                f"with the media (cross-modal similarity {c_score:.2f}). The forensic analysis tools found "
+                "no sign of generation or manipulation."
+            )
+
+        excerpt = " ".join(str(context).split())[:300]
+        findings.append(f"Context check: {excerpt}" if excerpt else "Context check: no web context was retrieved.")
+        findings.append(f"Final risk score: {risk_score:.2f}.")
 
+        verdict = "Misinformation" if synthetic or mismatch else "Likely Genuine"
+        body = "\n\n".join(findings)
+        return (
+            f"Verdict: {verdict}\n\nForensic Explanation:\n{body}\n\n"
+            "(Clear-cut sensor evidence: report generated locally without language-model review.)"
+        )
+
+    def build_prompt(self, c_score, f_score, context, claim):
         # Mapping internal scores to the User's requested Evidence format
         # We simulate additional granular scores based on the main signals to satisfy the prompt structure
         dire_score = min(f_score * 1.1, 0.99) if f_score > 0.5 else f_score * 0.8 # Simulated high-freq anomaly
@@ -83,19 +173,48 @@ Verdict: <Misinformation / Likely Genuine>
 Forensic Explanation:
 <detailed explanation citing the evidence>
 """
+        return prompt
+
+    def build_messages(self, prompt):
+        return [
+            {"role": "system", "content": "You are a professional forensic information auditor for ShieldAI."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _local_verdict(self, c_score, f_score):
+        verdict = "SAFE" if f_score < 0.50 and c_score > 0.25 else "RISK"
+        return f"[{verdict}] Analysis complete via local sensors. {OFFLINE_MARKER}."
+
+    def generate_verdict(self, path, c_score, f_score, context, claim):
+        """
+        The Reasoning Layer: Fuses technical scores and search context 
+        to provide a human-understandable forensic report.
+        """
+        if self.llm is None:
+            return OFFLINE_MESSAGE
 
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a professional forensic information auditor for ShieldAI."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model_id,
-                temperature=0.3 # Lower temperature for more analytical output
-            )
-            return chat_completion.choices[0].message.content
+            # Lower temperature for more analytical output; throttling is retried inside the client
+            messages = self.build_messages(self.build_prompt(c_score, f_score, context, claim))
+            return self.llm.complete(messages, temperature=0.3)
 
         except Exception as e:
             print(f"--- GROQ API ERROR: {e} ---")
-            verdict = "SAFE" if f_score < 0.50 and c_score > 0.25 else "RISK"
-            return f"[{verdict}] Analysis complete via local sensors. (Reasoning Engine Offline)."
+            return self._local_verdict(c_score, f_score)
+
+    def stream_verdict(self, path, c_score, f_score, context, claim):
+        """Same report as generate_verdict, yielded chunk by chunk as Groq streams it."""
+        if self.llm is None:
+            yield OFFLINE_MESSAGE
+            return
+
+        produced = False
+        try:
+            messages = self.build_messages(self.build_prompt(c_score, f_score, context, claim))
+            for chunk in self.llm.stream(messages, temperature=0.3):
+                produced = True
+                yield chunk
+        except Exception as e:
+            print(f"--- GROQ API ERROR: {e} ---")
+            # Mark a cut-off report as degraded too, so it never gets cached
+            yield f"\n\n{OFFLINE_MARKER}" if produced else self._local_verdict(c_score, f_score)
@@ -0,0 +1,136 @@
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+class JobCancelled(Exception):
+    """Raised inside a running job when its progress callback sees a cancellation."""
+
+class JobManager:
+    """
+    Long-running analyses as background jobs, persisted in SQLite.
+
+    `handlers` maps a job kind to fn(params, progress) -> JSON-serializable result,
+    where progress(fraction) records progress and raises JobCancelled if the job
+    was cancelled meanwhile. Queued jobs (and jobs interrupted mid-run) survive a
+    restart: call recover() at startup to put them back on the worker pool.
+    """
+
+    def __init__(self, db_path="jobs.sqlite", handlers=None, workers=1):
+        self.db_path = db_path
+        self.handlers = handlers or {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    params TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Short-lived connection per operation (safe across worker threads); commits on success."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _update(self, job_id, only_if=None, **fields):
+        """Updates a job row; with only_if, only when its status is one of those. Returns True if changed."""
+        fields["updated_at"] = time.time()
+        sets = ", ".join(f"{k} = ?" for k in fields)
+        query = f"UPDATE jobs SET {sets} WHERE id = ?"
+        values = list(fields.values()) + [job_id]
+        if only_if:
+            query += f" AND status IN ({', '.join('?' for _ in only_if)})"
+            values += list(only_if)
+        with self._lock, self._connect() as conn:
+            return conn.execute(query, values).rowcount > 0
+
+    def submit(self, kind, params=None):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, progress, params, created_at, updated_at) VALUES (?, ?, ?, 0, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params or {}), now, now)
+            )
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"]) if job["params"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job. Returns False if it had already finished."""
+        return self._update(job_id, only_if=(QUEUED, RUNNING), status=CANCELLED)
+
+    def recover(self):
+        """Re-queues work left over from a previous process (call once at startup)."""
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = ?, progress = 0 WHERE status = ?", (QUEUED, RUNNING))
+            pending = [r[0] for r in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,))]
+        for job_id in pending:
+            self._executor.submit(self._run, job_id)
+        return len(pending)
+
+    def pending_params(self, kind=None):
+        """Params of every queued or running job (optionally of one kind), e.g. the files they still need."""
+        query, values = "SELECT params FROM jobs WHERE status IN (?, ?)", [QUEUED, RUNNING]
+        if kind is not None:
+            query += " AND kind = ?"
+            values.append(kind)
+        with self._connect() as conn:
+            return [json.loads(r[0]) if r[0] else {} for r in conn.execute(query, values)]
+
+    def counts(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def _run(self, job_id):
+        # Claim the job; skip it if it was cancelled while queued
+        if not self._update(job_id, only_if=(QUEUED,), status=RUNNING):
+            return
+        job = self.get(job_id)
+
+        def progress(fraction):
+            if self.get(job_id)["status"] == CANCELLED:
+                raise JobCancelled(job_id)
+            self._update(job_id, only_if=(RUNNING,), progress=round(min(max(fraction, 0.0), 1.0), 4))
+
+        try:
+            result = self.handlers[job["kind"]](job["params"], progress)
+            self._update(job_id, only_if=(RUNNING,), status=DONE, progress=1.0,
+                         result=json.dumps(result, default=str))
+        except JobCancelled:
+            pass
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self._update(job_id, only_if=(RUNNING,), status=FAILED, error=str(e))
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from utils.cache import LRUCache, SingleFlight
+from utils.metrics import span
+
+# HTTP statuses worth retrying: throttling, timeouts and transient server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+class LLMThrottled(Exception):
+    """The local rate limiter could not grant a request slot in time."""
+
+class FakeAPIError(Exception):
+    """Error raised by FakeBackend; mimics the status_code of the Groq SDK errors."""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"Fake API error {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def is_retryable(error):
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS:
+        return True
+    return isinstance(error, (ConnectionError, TimeoutError)) or \
+        type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def retry_after_s(error):
+    """Server-requested delay (Retry-After) carried by an error, if any."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_s` sustained requests, bursts up to `burst`."""
+
+    def __init__(self, rate_per_s, burst=1):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Blocks until a token is available. Returns False if `timeout` expires first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate_per_s
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class GroqBackend:
+    """Chat completions over the Groq API."""
+
+    def __init__(self, api_key, model_id):
+        from groq import Groq
+        self.client = Groq(api_key=api_key)
+        self.model_id = model_id
+
+    def complete(self, messages, temperature):
+        completion = self.client.chat.completions.create(
+            messages=messages, model=self.model_id, temperature=temperature
+        )
+        return completion.choices[0].message.content
+
+    def stream(self, messages, temperature):
+        chunks = self.client.chat.completions.create(
+            messages=messages, model=self.model_id, temperature=temperature, stream=True
+        )
+        for chunk in chunks:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+class FakeBackend:
+    """
+    Offline stand-in for tests and benchmarks.
+    The first `fail_times` calls raise FakeAPIError(fail_status); every call
+    takes `latency_s`. Tracks call counts and the peak number of concurrent calls.
+    """
+
+    model_id = "fake"
+
+    def __init__(self, responder=None, latency_s=0.0, fail_times=0, fail_status=429, retry_after=None):
+        self.responder = responder or (lambda messages: (
+            "Verdict: Likely Genuine\n\nForensic Explanation:\n"
+            f"Offline completion for a {len(messages[-1]['content'])}-character prompt."
+        ))
+        self.latency_s = latency_s
+        self.fail_times = fail_times
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.calls = 0
+        self.active = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+
+    def complete(self, messages, temperature):
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.fail_times
+            self.active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.active)
+        try:
+            time.sleep(self.latency_s)
+            if failing:
+                raise FakeAPIError(self.fail_status, self.retry_after)
+            return self.responder(messages)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def stream(self, messages, temperature):
+        text = self.complete(messages, temperature)
+        for word in text.split(" "):
+            yield word + " "
+
+class LLMClient:
+    """
+    Shared, well-behaved access to a chat-completion backend.
+
+    - A token bucket caps the request rate and a semaphore caps concurrent calls.
+    - Retryable errors (429, 5xx, timeouts) are retried with exponential backoff
+      and full jitter, honouring Retry-After when the server sends one.
+    - Identical in-flight prompts share one call, and completed prompts are
+      served from an LRU prompt -> completion cache.
+    """
+
+    def __init__(self, backend, requests_per_minute=30, burst=5, max_concurrency=4, max_retries=4,
+                 backoff_base_s=0.5, backoff_max_s=8.0, acquire_timeout_s=60, cache_size=512):
+        self.backend = backend
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.acquire_timeout_s = acquire_timeout_s
+        self.cache = LRUCache(max_size=cache_size)
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "coalesced": 0}
+
+    def make_key(self, messages, temperature):
+        payload = json.dumps([self.backend.model_id, messages, temperature], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt))
+        return max(delay, retry_after_s(error) or 0.0)
+
+    def _with_retries(self, call):
+        """Runs call() under the rate limit and concurrency cap, retrying transient errors."""
+        for attempt in range(self.max_retries + 1):
+            if not self.bucket.acquire(timeout=self.acquire_timeout_s):
+                raise LLMThrottled(f"No request slot within {self.acquire_timeout_s}s")
+            self._count("requests")
+            try:
+                with self._slots, span("llm_call"):
+                    return call()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt, e))
+
+    def complete(self, messages, temperature=0.3):
+        key = self.make_key(messages, temperature)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def call():
+            text = self._with_retries(lambda: self.backend.complete(messages, temperature))
+            self.cache.put(key, text)
+            return text
+
+        text, shared = self._flights.do(key, call)
+        if shared:
+            self._count("coalesced")
+        return text
+
+    def stream(self, messages, temperature=0.3):
+        """
+        Yields completion chunks. Retries only happen before the first chunk;
+        cached prompts are replayed as a single chunk.
+        """
+        key = self.make_key(messages, temperature)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        for attempt in range(self.max_retries + 1):
+            if not self.bucket.acquire(timeout=self.acquire_timeout_s):
+                raise LLMThrottled(f"No request slot within {self.acquire_timeout_s}s")
+            self._count("requests")
+            try:
+                with self._slots, span("llm_call"):
+                    for chunk in self.backend.stream(messages, temperature):
+                        chunks.append(chunk)
+                        yield chunk
+                break
+            except Exception as e:
+                if chunks or attempt == self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt, e))
+        self.cache.put(key, "".join(chunks))
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {**counters, "max_concurrency": self.max_concurrency, "cache": self.cache.stats()}
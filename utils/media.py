@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+def decode_image(source):
+    """
+    Decodes media once per request into a BGR NumPy frame (OpenCV layout).
+    Accepts a file path, raw encoded bytes, a NumPy frame or a PIL image.
+    Returns None when the source cannot be decoded.
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, Image.Image):
+        return cv2.cvtColor(np.array(source.convert("RGB")), cv2.COLOR_RGB2BGR)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buffer = np.frombuffer(source, dtype=np.uint8)
+    else:
+        # np.fromfile + imdecode also copes with non-ASCII paths on Windows
+        try:
+            buffer = np.fromfile(source, dtype=np.uint8)
+        except OSError:
+            return None
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+def to_pil(image):
+    """PIL view of a path / BGR frame / PIL image (what CLIP's preprocess expects)."""
+    if isinstance(image, Image.Image):
+        return image
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return Image.fromarray(image)
+        code = cv2.COLOR_BGRA2RGB if image.shape[2] == 4 else cv2.COLOR_BGR2RGB
+        return Image.fromarray(cv2.cvtColor(image, code))
+    return Image.open(image)
+
+def to_gray(image):
+    """Single-channel uint8 frame of a path / BGR frame / PIL image, or None."""
+    if image is None:
+        return None
+    if isinstance(image, Image.Image):
+        return np.array(image.convert("L"))
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return image
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(image, code)
+    return cv2.imread(image, 0)
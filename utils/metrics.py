@@ -0,0 +1,134 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds: from single FFT calls up to a full LLM-backed analysis
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0)
+
+class Histogram:
+    """Cumulative Prometheus-style histogram (not thread-safe on its own; see Metrics)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+def _labels(labels):
+    return ",".join(f'{k}="{str(v)}"' for k, v in sorted(labels.items()))
+
+class Metrics:
+    """Process-wide latency histograms, keyed by metric name and label set."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}   # name -> {label tuple: Histogram}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, help_text="", **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(value)
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def snapshot(self):
+        """{name: {labels: {"count", "sum"}}} for JSON consumers (tests, benchmarks)."""
+        with self._lock:
+            return {
+                name: {_labels(dict(key)): {"count": h.count, "sum": round(h.sum, 6)} for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self, extra=()):
+        """
+        Prometheus text exposition (format 0.0.4) of every histogram, followed by
+        `extra` metrics: (name, type, help, [(labels dict, value), ...]) tuples,
+        type being "gauge" or "counter".
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(series.items()):
+                    labels = dict(key)
+                    for bound, count in zip(h.buckets, h.counts):
+                        lines.append(f"{name}_bucket{{{_labels({**labels, 'le': bound})}}} {count}")
+                    lines.append(f"{name}_bucket{{{_labels({**labels, 'le': '+Inf'})}}} {h.count}")
+                    lines.append(f"{name}_sum{{{_labels(labels)}}} {h.sum:.6f}")
+                    lines.append(f"{name}_count{{{_labels(labels)}}} {h.count}")
+        for name, kind, help_text, samples in extra:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{{{_labels(labels)}}} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics()
+
+STAGE_METRIC = "shieldai_stage_seconds"
+
+class Trace:
+    """Spans recorded while handling one request (start times relative to the trace start)."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, duration):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "start_s": round(start - self.origin, 4),
+                "duration_s": round(duration, 4)
+            })
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+
+@contextmanager
+def tracing():
+    """
+    Collects the spans of everything run in this context (stage-graph stages
+    and the search fan-out copy the context, so their spans are included).
+    """
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context (e.g. by the GC)
+            _current_trace.set(None)
+
+@contextmanager
+def span(name):
+    """Times a block into the stage histogram and, when tracing, the current trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        METRICS.observe(STAGE_METRIC, duration, "Duration of pipeline stages in seconds", stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, start, duration)
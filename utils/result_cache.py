@@ -0,0 +1,99 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from utils.cache import LRUCache, SQLiteCache, normalize_text
+
+# Config sections that change what analyze_post returns for the same input
+VERSIONED_SECTIONS = ("thresholds", "model_settings", "forensics", "explainer", "cascade", "video", "cache")
+
+def config_version(config):
+    """Short fingerprint of thresholds, model versions and sensor settings in config.json."""
+    relevant = {section: config.get(section) for section in VERSIONED_SECTIONS}
+    relevant["deepfake_model"] = config.get("deepfake", {}).get("model")
+    relevant["deepfake_enabled"] = config.get("deepfake", {}).get("enabled", True)
+    relevant["cache"] = (relevant["cache"] or {}).get("version")
+    payload = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+class ResultCache:
+    """
+    Whole-response cache for analyze_post, keyed by
+    (media content hash, normalized claim, defense flag, config version).
+
+    Two tiers: an in-memory LRU in front of a persistent SQLite table. Both honour
+    the TTL. When the config version changes, entries from older versions are
+    dropped from both tiers (they could never be hit again anyway).
+    """
+
+    def __init__(self, path="cache/results.sqlite", memory_entries=256, ttl_s=86400):
+        self.ttl_s = ttl_s
+        self.memory = LRUCache(max_size=memory_entries)
+        self.disk = SQLiteCache(path, default_ttl_s=ttl_s)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, media_hash, claim, use_defense, version):
+        payload = json.dumps([media_hash, normalize_text(claim), bool(use_defense), version])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def ensure_version(self, version):
+        """Explicit invalidation: purge every entry computed under another config version."""
+        with self._lock:
+            if version == self._version:
+                return 0
+            self._version = version
+        self.memory.clear()
+        removed = self.disk.invalidate_tags(keep=version)
+        if removed:
+            print(f"♻️ Result cache: dropped {removed} entries from older config versions")
+        return removed
+
+    def get(self, key):
+        """Returns (result, age_s) or None."""
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is not None and entry[2] >= now:
+            self._count(hit=True)
+            return entry[0], now - entry[1]
+
+        cached = self.disk.get_entry(key)
+        if cached is not None and cached["expires_at"] >= now:
+            self.memory.put(key, (cached["value"], cached["created_at"], cached["expires_at"]))
+            self._count(hit=True)
+            return cached["value"], now - cached["created_at"]
+
+        self._count(hit=False)
+        return None
+
+    def put(self, key, result):
+        now = time.time()
+        # A private copy: callers keep decorating their result (timings, media_url) after storing it
+        self.memory.put(key, (copy.deepcopy(result), now, now + self.ttl_s))
+        self.disk.put(key, result, tag=self._version, created_at=now)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory": self.memory.stats(),
+                "disk_entries": len(self.disk),
+                "config_version": self._version
+            }
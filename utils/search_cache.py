@@ -0,0 +1,112 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import LRUCache, SingleFlight, SQLiteCache, normalize_text
+
+class SearchCache:
+    """
+    Persistent cache for web-search snippets, keyed by search endpoint and normalized query.
+
+    - Fresh entries (younger than `ttl_s`) are served directly.
+    - Stale entries (up to `stale_ttl_s` past expiry) are served immediately while
+      one background refresh fetches a new copy (stale-while-revalidate).
+    - Concurrent misses for the same query share a single outbound call.
+
+    Only successful lookups are stored: the loader must raise on failure.
+    """
+
+    def __init__(self, path="cache/search.sqlite", memory_entries=1024, ttl_s=21600,
+                 stale_ttl_s=86400, refresh_workers=2):
+        self.ttl_s = ttl_s
+        self.stale_ttl_s = stale_ttl_s
+        self.memory = LRUCache(max_size=memory_entries)
+        self.disk = SQLiteCache(path, default_ttl_s=ttl_s)
+        self._flights = SingleFlight()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="search-refresh")
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+        self.purge()
+
+    def _lookup(self, key):
+        """Returns (value, created_at, expires_at) from memory or disk, expired or not."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+        cached = self.disk.get_entry(key)
+        if cached is None:
+            return None
+        entry = (cached["value"], cached["created_at"], cached["expires_at"])
+        self.memory.put(key, entry)
+        return entry
+
+    def _load(self, key, query, loader):
+        value = loader(query)
+        now = time.time()
+        self.memory.put(key, (value, now, now + self.ttl_s))
+        self.disk.put(key, value, created_at=now)
+        return value
+
+    def _refresh(self, key, query, loader):
+        try:
+            self._flights.do(key, lambda: self._load(key, query, loader))
+            self._count("refreshes")
+        except Exception as e:
+            self._count("errors")
+            print(f"Search cache refresh failed for '{query}': {e}")
+
+    def fetch(self, query, loader, endpoint=""):
+        """
+        Returns loader(query), served from cache when possible. `endpoint` is part of
+        the key, so a fake or benchmark backend never serves results for the real one.
+        """
+        key = f"{endpoint}|{normalize_text(query)}"
+        now = time.time()
+        entry = self._lookup(key)
+
+        if entry is not None:
+            value, _, expires_at = entry
+            if expires_at >= now:
+                self._count("hits")
+                return value
+            if expires_at + self.stale_ttl_s >= now:
+                self._count("stale_hits")
+                if not self._flights.in_flight(key):
+                    self._refresher.submit(self._refresh, key, query, loader)
+                return value
+
+        self._count("misses")
+        try:
+            value, shared = self._flights.do(key, lambda: self._load(key, query, loader))
+        except Exception:
+            self._count("errors")
+            raise
+        if shared:
+            self._count("coalesced")
+        return value
+
+    def close(self):
+        """Stops the background refresh threads."""
+        self._refresher.shutdown(wait=False)
+
+    def purge(self):
+        """Drops entries that are past their stale window. Returns the count."""
+        return self.disk.purge_expired(grace_s=self.stale_ttl_s)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        served = counters["hits"] + counters["stale_hits"]
+        return {
+            **counters,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            "disk_entries": len(self.disk)
+        }
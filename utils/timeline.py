@@ -0,0 +1,86 @@
+import numpy as np
+
+def trimmed_mean(values, proportion=0.1):
+    """Mean after dropping `proportion` of the values from each end (robust to outlier frames)."""
+    if not values:
+        return 0.0
+    ordered = np.sort(np.asarray(values, dtype=np.float64))
+    cut = int(len(ordered) * proportion)
+    kept = ordered[cut:len(ordered) - cut] if len(ordered) > 2 * cut else ordered
+    return float(kept.mean())
+
+def sustained_peak(values, min_frames=2):
+    """Highest level held for `min_frames` consecutive samples; a lone spike does not count."""
+    if len(values) < min_frames:
+        return 0.0
+    return max(min(values[i:i + min_frames]) for i in range(len(values) - min_frames + 1))
+
+def flagged_ranges(frames, threshold, min_frames=2, max_gap_s=None):
+    """
+    Time ranges where ai_prob stays above `threshold` for at least
+    `min_frames` consecutive samples. Samples further apart than `max_gap_s`
+    (e.g. across a dropped segment) break a range.
+    """
+    ranges, run = [], []
+
+    def close():
+        if len(run) >= min_frames:
+            ranges.append({
+                "start_s": run[0]["timestamp_s"],
+                "end_s": run[-1]["timestamp_s"],
+                "frames": len(run),
+                "peak": round(max(f["ai_prob"] for f in run), 4)
+            })
+
+    for frame in frames:
+        contiguous = not run or max_gap_s is None or frame["timestamp_s"] - run[-1]["timestamp_s"] <= max_gap_s
+        if frame["ai_prob"] > threshold and contiguous:
+            run.append(frame)
+            continue
+        close()
+        run = [frame] if frame["ai_prob"] > threshold else []
+    close()
+    return ranges
+
+def build_timeline(frames, segments, threshold, trim=0.1, min_frames=2, max_gap_s=None):
+    """
+    Aggregates per-frame scores of a long video into a per-segment timeline.
+
+    frames   - dicts with segment, timestamp_s, ai_prob, consistency (temporal order);
+               consistency is None for frames CLIP could not score
+    segments - dicts with start_s, end_s (index = segment number)
+
+    The video-level scores are robust instead of max/mean:
+      ai_prob     - the worse of the highest per-segment trimmed mean and the
+                    highest sustained peak, so one noisy frame cannot flag a
+                    video but a manipulated stretch still does
+      consistency - trimmed mean over all scored frames
+    """
+    def consistencies(members):
+        return [f["consistency"] for f in members if f["consistency"] is not None]
+
+    rows = []
+    for number, segment in enumerate(segments):
+        members = [f for f in frames if f["segment"] == number]
+        probs = [f["ai_prob"] for f in members]
+        scores = consistencies(members)
+        rows.append({
+            "start_s": segment["start_s"],
+            "end_s": segment["end_s"],
+            "frames": len(members),
+            "ai_prob_max": round(max(probs), 4) if probs else None,
+            "ai_prob_trimmed_mean": round(trimmed_mean(probs, trim), 4) if probs else None,
+            "consistency_trimmed_mean": round(trimmed_mean(scores, trim), 4) if scores else None
+        })
+
+    probs = [f["ai_prob"] for f in frames]
+    segment_means = [r["ai_prob_trimmed_mean"] for r in rows if r["ai_prob_trimmed_mean"] is not None]
+    return {
+        "segments": rows,
+        "flagged_ranges": flagged_ranges(frames, threshold, min_frames, max_gap_s),
+        "frames": len(frames),
+        "ai_prob": round(max(max(segment_means, default=0.0), sustained_peak(probs, min_frames)), 4),
+        "ai_prob_max": round(max(probs, default=0.0), 4),
+        "ai_prob_trimmed_mean": round(trimmed_mean(probs, trim), 4),
+        "consistency": round(trimmed_mean(consistencies(frames), trim), 4)
+    }
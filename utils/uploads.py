@@ -0,0 +1,124 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+StoredUpload = namedtuple("StoredUpload", ["path", "name", "sha256", "size", "filename", "deduplicated"])
+
+def file_sha256(path, chunk_bytes=1024 * 1024):
+    """SHA-256 of a file on disk, read in chunks (for callers without an upload hash)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class UploadTooLarge(Exception):
+    """The upload exceeded the configured maximum size (-> HTTP 413)."""
+
+class UploadStore:
+    """
+    Content-addressed upload storage.
+
+    Uploads are streamed in chunks through a SHA-256 hasher into a spooled buffer
+    (memory first, disk beyond `spool_bytes`), then stored as `<sha256><ext>`.
+    Identical uploads share one file, so two users sending different `image.jpg`
+    files no longer overwrite each other. Files untouched for `ttl_s` are garbage
+    collected (at most every `gc_interval_s`), except those `in_use()` still lists
+    (e.g. the inputs of queued background jobs, which may wait longer than the TTL).
+    """
+
+    def __init__(self, root="uploads", max_bytes=50 * 1024 * 1024, ttl_s=86400,
+                 chunk_bytes=1024 * 1024, spool_bytes=8 * 1024 * 1024, gc_interval_s=600, in_use=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.chunk_bytes = chunk_bytes
+        self.spool_bytes = spool_bytes
+        self.gc_interval_s = gc_interval_s
+        self.in_use = in_use
+        self._gc_lock = threading.Lock()
+        self._last_gc = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, fileobj, filename):
+        """Streams a file-like object into the store. Returns a StoredUpload."""
+        digest = hashlib.sha256()
+        size = 0
+
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_bytes) as spool:
+            # 1. Hash while buffering, enforcing the size cap as we go
+            while True:
+                chunk = fileobj.read(self.chunk_bytes)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+                digest.update(chunk)
+                spool.write(chunk)
+
+            # 2. Content address (keep the extension: the pipeline routes videos by it)
+            sha256 = digest.hexdigest()
+            ext = os.path.splitext(filename or "")[1].lower()
+            name = f"{sha256}{ext}"
+            path = os.path.join(self.root, name)
+
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                os.utime(path)  # Refresh its TTL
+            else:
+                # Write to a temp name and rename, so concurrent identical uploads are safe
+                spool.seek(0)
+                fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+                with os.fdopen(fd, "wb") as out:
+                    while True:
+                        chunk = spool.read(self.chunk_bytes)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                os.replace(tmp_path, path)
+
+        self.maybe_gc()
+        return StoredUpload(path, name, sha256, size, filename, deduplicated)
+
+    def gc(self):
+        """Deletes unreferenced stored uploads (and stray temp files) older than the TTL. Returns the count."""
+        cutoff = time.time() - self.ttl_s
+        try:
+            keep = {os.path.abspath(path) for path in self.in_use()} if self.in_use else set()
+        except Exception as e:
+            print(f"Upload GC skipped (could not list uploads in use): {e}")
+            return 0
+        removed = 0
+        for entry in os.scandir(self.root):
+            if os.path.abspath(entry.path) in keep:
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass  # Raced with another process / file in use
+        return removed
+
+    def maybe_gc(self):
+        with self._gc_lock:
+            if time.time() - self._last_gc < self.gc_interval_s:
+                return 0
+            self._last_gc = time.time()
+        return self.gc()
+
+def build_upload_store(settings, in_use=None):
+    """UploadStore from the config.json "uploads" section (shared by the API and the Streamlit app)."""
+    return UploadStore(
+        root=settings.get("dir", "uploads"),
+        max_bytes=settings.get("max_bytes", 50 * 1024 * 1024),
+        ttl_s=settings.get("ttl_s", 86400),
+        chunk_bytes=settings.get("chunk_bytes", 1024 * 1024),
+        spool_bytes=settings.get("spool_bytes", 8 * 1024 * 1024),
+        gc_interval_s=settings.get("gc_interval_s", 600),
+        in_use=in_use
+    )
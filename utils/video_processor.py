@@ -1,25 +1,160 @@
 import cv2
-import os
+from collections import deque, namedtuple
+
+import numpy as np
+
+Keyframe = namedtuple("Keyframe", ["index", "timestamp_s", "frame"])
+VideoInfo = namedtuple("VideoInfo", ["fps", "frame_count", "duration_s"])
+
+DEFAULT_FPS = 25.0  # Used when the container reports no frame rate
+
+def probe_video(video_path):
+    """Frame rate, frame count and duration from the container metadata (no decoding)."""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    total = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    cap.release()
+    return VideoInfo(fps, total, round(total / fps, 3))
+
+def iter_frames(video_path, every_n=None, every_s=None, count=None, max_frames=None,
+                start_frame=0, end_frame=None):
+    """
+    Lazily yields Keyframe(index, timestamp_s, frame) from a video, in memory.
+
+    Sampling (pick one; default is every frame):
+      every_n  - every n-th frame (count-based)
+      every_s  - one frame per `every_s` seconds of video time (time-based)
+      count    - `count` frames spread evenly over the whole video
+    Frames that are not wanted are skipped with grab(), which demuxes without
+    decoding pixels. Only the current frame is held, so memory use is constant
+    regardless of video length. A missing frame rate falls back to DEFAULT_FPS.
+    start_frame / end_frame restrict decoding to [start_frame, end_frame) (one seek).
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        if count is not None:
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            span = (end_frame or total) - start_frame
+            every_n = max(1, span // count) if span > 0 else 1
+            max_frames = min(max_frames or count, count)
+        every_n = max(1, int(every_n or 1))
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        index, yielded, next_t = start_frame, 0, start_frame / fps
+        while (max_frames is None or yielded < max_frames) and (end_frame is None or index < end_frame) \
+                and cap.grab():
+            timestamp = index / fps
+            if every_s is not None:
+                wanted = timestamp + 1e-9 >= next_t
+            else:
+                wanted = (index - start_frame) % every_n == 0
+            if wanted:
+                ok, frame = cap.retrieve()
+                if ok:
+                    if every_s is not None:
+                        next_t += every_s * (1 + int((timestamp - next_t) // every_s))
+                    yield Keyframe(index, round(timestamp, 3), frame)
+                    yielded += 1
+            index += 1
+    finally:
+        cap.release()
 
 def process_video(video_path, sample_rate=10):
     """
-    Extracts frames from a video file for multi-modal analysis.
+    Yields frames from a video file for multi-modal analysis, in memory.
     sample_rate=10 means we analyze every 10th frame.
     """
-    frames = []
+    for keyframe in iter_frames(video_path, every_n=sample_rate):
+        yield keyframe.frame
+
+def _thumbnail(frame, size):
+    """Tiny grayscale copy used for cheap scene-change and sharpness measurements."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+def sample_keyframes(video_path, frame_budget=8, max_probes=300, probe_size=(64, 36), scene_threshold=0.12):
+    """
+    Scene-aware keyframe sampling in a single sequential pass.
+
+    - Only every `probe_stride`-th frame is decoded (see iter_frames); all
+      others are skipped with grab(), which demuxes without decoding pixels.
+    - Probes are compared as tiny grayscale thumbnails: a mean absolute
+      difference above `scene_threshold` (0-1) starts a new scene. Long scenes
+      are also split every total/frame_budget frames so no stretch goes unsampled.
+    - Each segment keeps its sharpest probe (Laplacian variance of the
+      thumbnail). Beyond `frame_budget` segments, the shortest one is merged
+      away, so at most `frame_budget` full-resolution frames are ever held.
+
+    Returns a list of Keyframe(index, timestamp_s, frame) in temporal order.
+    """
     cap = cv2.VideoCapture(video_path)
-    count = 0
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if count % sample_rate == 0:
-            # Save frame temporarily to reuse your existing image logic
-            frame_path = f"uploads/frame_{count}.jpg"
-            cv2.imwrite(frame_path, frame)
-            frames.append(frame_path)
-        count += 1
-    
+    fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     cap.release()
-    return frames
\ No newline at end of file
+    probe_stride = max(1, total // max_probes) if total > 0 else 1
+    segment_frames = max(1, total // frame_budget) if total > 0 else int(fps * 10)
+
+    segments = []    # [start_index, sharpness, Keyframe]; a segment ends where the next starts
+    previous = None
+
+    for probe in iter_frames(video_path, every_n=probe_stride):
+        thumb = _thumbnail(probe.frame, probe_size)
+        sharpness = float(cv2.Laplacian(thumb, cv2.CV_32F).var())
+        cut = previous is not None and float(np.abs(thumb - previous).mean()) / 255.0 > scene_threshold
+        if not segments or cut or probe.index - segments[-1][0] >= segment_frames:
+            segments.append([probe.index, -1.0, None])
+        current = segments[-1]
+        if sharpness > current[1]:
+            current[1] = sharpness
+            current[2] = probe
+        previous = thumb
+
+        # Keep memory bounded: merge away the shortest finished segment
+        if len(segments) > frame_budget:
+            lengths = [segments[i + 1][0] - segments[i][0] for i in range(len(segments) - 1)]
+            shortest = lengths.index(min(lengths))
+            if shortest == 0:
+                segments[1][0] = segments[0][0]  # The next segment absorbs it
+            del segments[shortest]
+
+    return [segment[2] for segment in segments if segment[2] is not None]
+
+def _fit(frame, max_side):
+    """Downscales so the longer side is at most `max_side` (the engines work at 224 px anyway)."""
+    if not max_side or max(frame.shape[:2]) <= max_side:
+        return frame
+    scale = max_side / max(frame.shape[:2])
+    return cv2.resize(frame, (round(frame.shape[1] * scale), round(frame.shape[0] * scale)),
+                      interpolation=cv2.INTER_AREA)
+
+def decode_segment(video_path, start_frame, end_frame, every_s, max_side=None):
+    """Samples one time segment with its own capture (safe to run in a worker process)."""
+    return [
+        Keyframe(k.index, k.timestamp_s, _fit(k.frame, max_side))
+        for k in iter_frames(video_path, every_s=every_s, start_frame=start_frame, end_frame=end_frame)
+    ]
+
+def decode_segments(video_path, executor, segment_s=60, every_s=2.0, max_side=448, max_pending=None):
+    """
+    Long-video decoding: splits the file into `segment_s` time segments and
+    decodes them concurrently on `executor` (a process pool scales with cores).
+    Yields (start_s, end_s, keyframes) per segment in temporal order; at most
+    `max_pending` segments are decoded ahead, which bounds memory.
+    """
+    info = probe_video(video_path)
+    segment_frames = max(1, int(segment_s * info.fps))
+    bounds = [(start, min(start + segment_frames, info.frame_count))
+              for start in range(0, info.frame_count, segment_frames)]
+    max_pending = max_pending or 2 * (getattr(executor, "_max_workers", None) or 2)
+
+    pending = deque()
+    for start, end in bounds:
+        pending.append((start, end, executor.submit(decode_segment, video_path, start, end, every_s, max_side)))
+        if len(pending) >= max_pending:
+            start_, end_, future = pending.popleft()
+            yield round(start_ / info.fps, 3), round(end_ / info.fps, 3), future.result()
+    while pending:
+        start_, end_, future = pending.popleft()
+        yield round(start_ / info.fps, 3), round(end_ / info.fps, 3), future.result()
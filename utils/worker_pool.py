@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the wait queue is full (-> HTTP 429)."""
+
+class QueueTimeout(Exception):
+    """The job waited too long for a free worker (-> HTTP 503)."""
+
+class RequestTimeout(Exception):
+    """The job started but did not finish in time (-> HTTP 504)."""
+
+class BoundedWorkerPool:
+    """
+    Runs blocking work (model inference, HTTP calls) off the asyncio event loop.
+
+    - At most `max_concurrency` jobs execute at once.
+    - At most `max_queue` more may wait; beyond that submissions are rejected.
+    - A job waiting longer than `queue_timeout_s` is dropped before it starts.
+    - A running job that exceeds `request_timeout_s` is reported as timed out.
+      Threads cannot be killed, so its slot stays busy until it really ends,
+      which keeps the backpressure honest.
+    """
+
+    def __init__(self, max_concurrency=2, max_queue=8, queue_timeout_s=30, request_timeout_s=120):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.request_timeout_s = request_timeout_s
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="analysis")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self.in_flight + self.queued >= self.max_concurrency + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.in_flight} running, {self.queued} queued")
+            self.queued += 1
+
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def job():
+            with self._lock:
+                self.queued -= 1
+                self.in_flight += 1
+            loop.call_soon_threadsafe(started.set)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                    self.completed += 1
+
+        future = self._executor.submit(job)
+
+        # 1. Wait for a worker (bounded)
+        try:
+            await asyncio.wait_for(started.wait(), timeout=self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+                    self.timeouts += 1
+                raise QueueTimeout(f"No worker free within {self.queue_timeout_s}s")
+
+        # 2. Wait for the result (bounded)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.request_timeout_s)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise RequestTimeout(f"Analysis exceeded {self.request_timeout_s}s")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queue_depth": self.queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts
+            }